@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+
+"""
+Asyncio API for S3 Vectors
+
+This module provides :class:`AsyncBucket` and :class:`AsyncIndex`, the asyncio
+counterparts of :class:`~s3vectorm.bucket.Bucket` and
+:class:`~s3vectorm.index.Index`. They work with an async S3 Vectors client,
+such as the one created by `aioboto3 <https://github.com/terrycain/aioboto3>`_
+or `aiobotocore <https://github.com/aio-libs/aiobotocore>`_, so thousands of
+requests can be in flight in a single event loop without a thread per request.
+
+The request building logic and the output classes
+(:class:`~s3vectorm.index.QueryVectorsOutput`,
+:class:`~s3vectorm.index.ListVectorsOutput`) are shared with the synchronous API.
+
+Example:
+    >>> import aioboto3
+    >>> session = aioboto3.Session()
+    >>> async with session.client("s3vectors") as client:
+    ...     index = await AsyncIndex.get(client, "my-bucket", index_name="documents")
+    ...     res = await index.query_vectors(client, data=embedding, top_k=5)
+    ...     docs = res.as_vector_objects(DocChunk)
+"""
+
+import typing as T
+import asyncio
+
+import boto3_dataclass_s3vectors.type_defs
+import botocore.exceptions
+from func_args.api import OPT
+
+from .bucket import BaseBucket
+from .constants import DEFAULT_MAX_WORKERS
+from .metrics import MetricsRegistry
+from .index import (
+    BaseIndex,
+    QueryVectorsOutput,
+    ListVectorsOutput,
+    GetVectorsOutput,
+)
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from types_aiobotocore_s3vectors import S3VectorsClient as AsyncS3VectorsClient
+    from mypy_boto3_s3vectors.type_defs import MetadataConfigurationTypeDef
+    from boto3_dataclass_s3vectors.type_defs import EncryptionConfiguration
+
+    from .vector import Vector
+    from .predicate import FilterLike
+
+
+class AsyncBucket(BaseBucket):
+    """
+    Asyncio counterpart of :class:`~s3vectorm.bucket.Bucket`.
+
+    Attributes:
+        name: The name of the vector bucket
+
+    Example:
+        >>> bucket = AsyncBucket(name="my-vector-bucket")
+        >>> result = await bucket.create(async_s3_vectors_client)
+    """
+
+    async def _acall(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        operation: str,
+        kwargs: dict[str, T.Any],
+    ) -> dict[str, T.Any]:
+        """
+        Await an API operation, recording the call if metrics are enabled.
+        """
+        method = getattr(s3_vectors_client, operation)
+        if self.metrics is None:
+            return await method(**kwargs)
+        return await self.metrics.acall(operation, method, kwargs)
+
+    async def create(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        encryption_configuration: "EncryptionConfiguration" = OPT,
+    ) -> dict[str, T.Any] | None:
+        """
+        See :meth:`s3vectorm.bucket.Bucket.create`.
+        """
+        try:
+            return await self._acall(
+                s3_vectors_client,
+                "create_vector_bucket",
+                self._get_create_kwargs(
+                    encryption_configuration=encryption_configuration,
+                ),
+            )
+        except botocore.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] == "ConflictException":
+                return None
+            raise
+
+    async def delete(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        vector_bucket_arn: str = OPT,
+    ):
+        """
+        See :meth:`s3vectorm.bucket.Bucket.delete`.
+        """
+        return await self._acall(
+            s3_vectors_client,
+            "delete_vector_bucket",
+            self._get_delete_kwargs(vector_bucket_arn=vector_bucket_arn),
+        )
+
+    async def list_index(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        vector_bucket_arn: str = OPT,
+        prefix: str = OPT,
+        page_size: int = 100,
+        max_items: int = 9999,
+    ) -> T.AsyncGenerator[
+        boto3_dataclass_s3vectors.type_defs.ListIndexesOutput,
+        None,
+    ]:
+        """
+        See :meth:`s3vectorm.bucket.Bucket.list_index`.
+
+        Example:
+            >>> async for res in bucket.list_index(async_s3_vectors_client):
+            ...     for index_summary in res.indexes:
+            ...         print(index_summary)
+        """
+        kwargs = self._get_list_index_kwargs(
+            vector_bucket_arn=vector_bucket_arn,
+            prefix=prefix,
+            page_size=page_size,
+            max_items=max_items,
+        )
+        paginator = s3_vectors_client.get_paginator("list_indexes")
+        pages = paginator.paginate(**kwargs)
+        if self.metrics is not None:
+            pages = self.metrics.aiter_pages(
+                "list_indexes", kwargs, pages, s3_vectors_client
+            )
+        async for res in pages:
+            yield boto3_dataclass_s3vectors.type_defs.ListIndexesOutput(res)
+
+
+class AsyncIndex(BaseIndex):
+    """
+    Asyncio counterpart of :class:`~s3vectorm.index.Index`.
+
+    :param bucket_name: Name of the S3 vector bucket containing the index
+    :param index_name: Unique name for the vector index
+    :param data_type: Data type for vector embeddings (e.g., "float32")
+    :param dimension: Dimensionality of the vectors (e.g., 768 for many LLM embeddings)
+    :param distance_metric: Distance metric for similarity calculations (e.g., "cosine", "euclidean")
+
+    Example:
+        >>> index = AsyncIndex(
+        ...     bucket_name="my-vectors",
+        ...     index_name="documents",
+        ...     data_type="float32",
+        ...     dimension=768,
+        ...     distance_metric="cosine"
+        ... )
+        >>> await index.put_vectors(async_s3_vectors_client, vectors)
+        >>> results = await asyncio.gather(*[
+        ...     index.query_vectors(async_s3_vectors_client, data=embedding)
+        ...     for embedding in embeddings
+        ... ])
+    """
+
+    async def _acall(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        operation: str,
+        kwargs: dict[str, T.Any],
+    ) -> dict[str, T.Any]:
+        """
+        Await an API operation, recording the call if metrics are enabled.
+        """
+        method = getattr(s3_vectors_client, operation)
+        if self.metrics is None:
+            return await method(**kwargs)
+        return await self.metrics.acall(operation, method, kwargs)
+
+    async def create(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        vector_bucket_arn: str = OPT,
+        metadata_configuration: "MetadataConfigurationTypeDef" = OPT,
+    ) -> dict[str, T.Any] | None:
+        """
+        See :meth:`s3vectorm.index.Index.create`.
+        """
+        try:
+            return await self._acall(
+                s3_vectors_client,
+                "create_index",
+                self._get_create_kwargs(
+                    vector_bucket_arn=vector_bucket_arn,
+                    metadata_configuration=metadata_configuration,
+                ),
+            )
+        except botocore.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] == "ConflictException":
+                return None
+            raise
+
+    async def delete(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        index_arn: str = OPT,
+    ):
+        """
+        See :meth:`s3vectorm.index.Index.delete`.
+        """
+        await self._acall(
+            s3_vectors_client,
+            "delete_index",
+            self._get_delete_kwargs(index_arn=index_arn),
+        )
+
+    @classmethod
+    async def get(
+        cls,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        vector_bucket_name: str,
+        index_name: str = OPT,
+        index_arn: str = OPT,
+        metrics: T.Optional[MetricsRegistry] = None,
+    ):
+        """
+        See :meth:`s3vectorm.index.Index.get`.
+        """
+        kwargs = cls._get_get_index_kwargs(
+            vector_bucket_name=vector_bucket_name,
+            index_name=index_name,
+            index_arn=index_arn,
+        )
+        try:
+            if metrics is None:
+                res = await s3_vectors_client.get_index(**kwargs)
+            else:
+                res = await metrics.acall(
+                    "get_index", s3_vectors_client.get_index, kwargs
+                )
+        except botocore.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] == "NotFoundException":
+                return None
+            raise
+
+        return cls._from_get_index_response(
+            vector_bucket_name=vector_bucket_name,
+            response=res,
+            metrics=metrics,
+        )
+
+    async def put_vectors(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        vectors: list["Vector"],
+    ):
+        """
+        See :meth:`s3vectorm.index.Index.put_vectors`.
+        """
+        try:
+            await self._acall(
+                s3_vectors_client,
+                "put_vectors",
+                self._get_put_vectors_kwargs(
+                    [
+                        vector.to_put_vectors_dict(data_type=self.data_type)
+                        for vector in vectors
+                    ]
+                ),
+            )
+        finally:
+            self._invalidate_query_cache(s3_vectors_client)
+
+    async def query_vectors(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        data: list[float],
+        top_k: int = 10,
+        filter: T.Optional["FilterLike"] = None,
+        return_metadata: bool = False,
+        return_distance: bool = False,
+        use_cache: bool = True,
+    ) -> "QueryVectorsOutput":
+        """
+        See :meth:`s3vectorm.index.Index.query_vectors`.
+        """
+        cache = self.query_cache if use_cache else None
+        if cache is not None:
+            cache_key = self._get_query_cache_key(
+                data=data,
+                top_k=top_k,
+                filter=filter,
+                return_metadata=return_metadata,
+                return_distance=return_distance,
+            )
+            cache_namespace = self._get_query_cache_namespace(s3_vectors_client)
+            # read before the call, a write during the call makes the result stale
+            cache_generation = cache.generation(cache_namespace)
+            output = cache.get(cache_namespace, cache_key, generation=cache_generation)
+            if output is not None:
+                return output
+
+        res = await self._acall(
+            s3_vectors_client,
+            "query_vectors",
+            self._get_query_vectors_kwargs(
+                data=data,
+                top_k=top_k,
+                filter=filter,
+                return_metadata=return_metadata,
+                return_distance=return_distance,
+            ),
+        )
+        output = QueryVectorsOutput(
+            boto3_raw_data=res,
+            data_type=self.data_type,
+        )
+        if cache is not None:
+            cache.set(cache_namespace, cache_key, output, generation=cache_generation)
+        return output
+
+    async def query_vectors_many(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        data_list: T.Sequence[list[float]],
+        top_k: int = 10,
+        filter: T.Optional[
+            T.Union[
+                "FilterLike",
+                T.Sequence[T.Optional["FilterLike"]],
+            ]
+        ] = None,
+        return_metadata: bool = False,
+        return_distance: bool = False,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        return_exceptions: bool = True,
+    ) -> list[T.Union["QueryVectorsOutput", Exception]]:
+        """
+        See :meth:`s3vectorm.index.Index.query_vectors_many`.
+
+        :param max_concurrency: Maximum number of queries in flight at the same time
+        """
+        filters = self._expand_filters(len(data_list), filter)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def query(data, filter_):
+            async with semaphore:
+                return await self.query_vectors(
+                    s3_vectors_client=s3_vectors_client,
+                    data=data,
+                    top_k=top_k,
+                    filter=filter_,
+                    return_metadata=return_metadata,
+                    return_distance=return_distance,
+                )
+
+        return await asyncio.gather(
+            *[query(data, filter_) for data, filter_ in zip(data_list, filters)],
+            return_exceptions=return_exceptions,
+        )
+
+    async def list_vectors(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        index_arn: str = OPT,
+        segment_count: int = OPT,
+        segment_index: int = OPT,
+        return_data: bool = OPT,
+        return_metadata: bool = OPT,
+        page_size: int = 100,
+        max_items: int | None = 9999,
+        starting_token: str = OPT,
+    ) -> T.AsyncGenerator["ListVectorsOutput", None]:
+        """
+        See :meth:`s3vectorm.index.Index.list_vectors`.
+
+        Example:
+            >>> async for page in index.list_vectors(
+            ...     async_s3_vectors_client,
+            ...     return_metadata=True,
+            ... ):
+            ...     vectors = page.as_vector_objects(Vector)
+        """
+        kwargs = self._get_list_vectors_kwargs(
+            index_arn=index_arn,
+            segment_count=segment_count,
+            segment_index=segment_index,
+            return_data=return_data,
+            return_metadata=return_metadata,
+            page_size=page_size,
+            max_items=max_items,
+            starting_token=starting_token,
+        )
+        paginator = s3_vectors_client.get_paginator("list_vectors")
+        pages = paginator.paginate(**kwargs)
+        if self.metrics is not None:
+            pages = self.metrics.aiter_pages(
+                "list_vectors", kwargs, pages, s3_vectors_client
+            )
+        async for response in pages:
+            yield ListVectorsOutput(
+                boto3_raw_data=response,
+                data_type=self.data_type,
+            )
+
+    async def get_vectors(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        keys: list[str],
+        return_data: bool = OPT,
+        return_metadata: bool = OPT,
+        index_arn: str = OPT,
+    ) -> "GetVectorsOutput":
+        """
+        See :meth:`s3vectorm.index.Index.get_vectors`.
+        """
+        res = await self._acall(
+            s3_vectors_client,
+            "get_vectors",
+            self._get_get_vectors_kwargs(
+                keys=keys,
+                return_data=return_data,
+                return_metadata=return_metadata,
+                index_arn=index_arn,
+            ),
+        )
+        return GetVectorsOutput(
+            boto3_raw_data=res,
+            data_type=self.data_type,
+        )
+
+    async def delete_vectors(
+        self,
+        s3_vectors_client: "AsyncS3VectorsClient",
+        keys: list[str],
+        index_arn: str = OPT,
+    ):
+        """
+        See :meth:`s3vectorm.index.Index.delete_vectors`.
+        """
+        try:
+            await self._acall(
+                s3_vectors_client,
+                "delete_vectors",
+                self._get_delete_vectors_kwargs(keys=keys, index_arn=index_arn),
+            )
+        finally:
+            self._invalidate_query_cache(s3_vectors_client)
@@ -2,7 +2,12 @@
 
 from .bucket import Bucket
 from .index import Index
+from .aio import AsyncBucket
+from .aio import AsyncIndex
 from .vector import Vector
 from .metadata import OperatorEnum
 from .metadata import MetaKey
 from .metadata import BaseMetadata
+from .metadata import Param
+from .metadata import PreparedFilter
+from .bulk import BulkWriteResult
@@ -19,17 +19,85 @@ import typing as T
 
 import boto3_dataclass_s3vectors.type_defs
 import botocore.exceptions
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from func_args.api import OPT, remove_optional
 
+from .metrics import MetricsRegistry
+
 
 if T.TYPE_CHECKING:  # pragma: no cover
     from mypy_boto3_s3vectors import S3VectorsClient
     from boto3_dataclass_s3vectors.type_defs import EncryptionConfiguration
 
 
-class Bucket(BaseModel):
+class BaseBucket(BaseModel):
+    """
+    Base class of :class:`Bucket` and :class:`~s3vectorm.aio.AsyncBucket`.
+
+    It holds the bucket configuration and builds the request arguments of the
+    AWS S3 Vectors API calls, so the synchronous and asynchronous
+    implementations share the exact same request building logic.
+
+    Attributes:
+        name: The name of the vector bucket
+        metrics: Optional :class:`~s3vectorm.metrics.MetricsRegistry` that
+            records the API calls made through this bucket. It is not part of
+            the serialized bucket.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str = Field()
+    metrics: T.Optional[MetricsRegistry] = Field(default=None, exclude=True, repr=False)
+
+    def _get_create_kwargs(
+        self,
+        encryption_configuration: "EncryptionConfiguration" = OPT,
+    ) -> dict[str, T.Any]:
+        return dict(
+            vectorBucketName=self.name,
+            **remove_optional(
+                encryptionConfiguration=encryption_configuration,
+            ),
+        )
+
+    def _get_delete_kwargs(
+        self,
+        vector_bucket_arn: str = OPT,
+    ) -> dict[str, T.Any]:
+        kwargs = {
+            "vectorBucketName": self.name,
+            "vectorBucketArn": vector_bucket_arn,
+        }
+        kwargs = remove_optional(**kwargs)
+        if "vectorBucketArn" in kwargs:
+            kwargs.pop("vectorBucketName")
+        return kwargs
+
+    def _get_list_index_kwargs(
+        self,
+        vector_bucket_arn: str = OPT,
+        prefix: str = OPT,
+        page_size: int = 100,
+        max_items: int = 9999,
+    ) -> dict[str, T.Any]:
+        kwargs = {
+            "vectorBucketName": self.name,
+            "vectorBucketArn": vector_bucket_arn,
+            "prefix": prefix,
+            "PaginationConfig": {
+                "MaxItems": max_items,
+                "PageSize": page_size,
+            },
+        }
+        kwargs = remove_optional(**kwargs)
+        if "vectorBucketArn" in kwargs:
+            kwargs.pop("vectorBucketName")
+        return kwargs
+
+
+class Bucket(BaseBucket):
     """
     Represents an S3 vector bucket for storing and managing vector data.
 
@@ -49,7 +117,19 @@ class Bucket(BaseModel):
         ...     print("Bucket already exists")
     """
 
-    name: str = Field()
+    def _call(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        operation: str,
+        kwargs: dict[str, T.Any],
+    ) -> dict[str, T.Any]:
+        """
+        Call an API operation, recording the call if metrics are enabled.
+        """
+        method = getattr(s3_vectors_client, operation)
+        if self.metrics is None:
+            return method(**kwargs)
+        return self.metrics.call(operation, method, kwargs)
 
     def create(
         self,
@@ -88,10 +168,11 @@ class Bucket(BaseModel):
             https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/create_vector_bucket.html
         """
         try:
-            return s3_vectors_client.create_vector_bucket(
-                vectorBucketName=self.name,
-                **remove_optional(
-                    encryptionConfiguration=encryption_configuration,
+            return self._call(
+                s3_vectors_client,
+                "create_vector_bucket",
+                self._get_create_kwargs(
+                    encryption_configuration=encryption_configuration,
                 ),
             )
         except botocore.exceptions.ClientError as e:
@@ -112,14 +193,11 @@ class Bucket(BaseModel):
         Reference:
             https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/delete_vector_bucket.html
         """
-        kwargs = {
-            "vectorBucketName": self.name,
-            "vectorBucketArn": vector_bucket_arn,
-        }
-        kwargs = remove_optional(**kwargs)
-        if "vectorBucketArn" in kwargs:
-            kwargs.pop("vectorBucketName")
-        return s3_vectors_client.delete_vector_bucket(**kwargs)
+        return self._call(
+            s3_vectors_client,
+            "delete_vector_bucket",
+            self._get_delete_kwargs(vector_bucket_arn=vector_bucket_arn),
+        )
 
     def list_index(
         self,
@@ -159,19 +237,18 @@ class Bucket(BaseModel):
         Reference:
             https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/paginator/ListIndexes.html
         """
-        kwargs = {
-            "vectorBucketName": self.name,
-            "vectorBucketArn": vector_bucket_arn,
-            "prefix": prefix,
-            "PaginationConfig": {
-                "MaxItems": max_items,
-                "PageSize": page_size,
-            },
-        }
-        kwargs = remove_optional(**kwargs)
-        if "vectorBucketArn" in kwargs:
-            kwargs.pop("vectorBucketName")
+        kwargs = self._get_list_index_kwargs(
+            vector_bucket_arn=vector_bucket_arn,
+            prefix=prefix,
+            page_size=page_size,
+            max_items=max_items,
+        )
         paginator = s3_vectors_client.get_paginator("list_indexes")
-        for res in paginator.paginate(**kwargs):
+        pages = paginator.paginate(**kwargs)
+        if self.metrics is not None:
+            pages = self.metrics.iter_pages(
+                "list_indexes", kwargs, pages, s3_vectors_client
+            )
+        for res in pages:
             res = boto3_dataclass_s3vectors.type_defs.ListIndexesOutput(res)
             yield res
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+"""
+Bulk Operation Utilities
+
+This module provides the building blocks used by the bulk APIs on
+:class:`~s3vectorm.index.Index`:
+
+- Splitting an arbitrary (possibly very large) stream of items into batches
+  that fit the service's per-call limits on item count and payload size.
+- Running those batches through a bounded thread pool, so that memory usage
+  stays flat no matter how long the input stream is.
+- Summarizing the outcome of a bulk operation (:class:`BulkWriteResult`).
+
+Example:
+    >>> result = index.put_vectors_bulk(s3_vectors_client, vectors)
+    >>> print(result.n_succeeded, result.n_failed)
+"""
+
+import typing as T
+import json
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+
+from .constants import (
+    MAX_VECTORS_PER_PUT,
+    MAX_PUT_PAYLOAD_BYTES,
+    BYTES_PER_FLOAT,
+    DEFAULT_MAX_WORKERS,
+)
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3vectors.type_defs import PutInputVectorTypeDef
+
+ItemT = T.TypeVar("ItemT")
+
+# braces, quotes and field names of a single put vector document
+_BYTES_PER_VECTOR_OVERHEAD = 64
+
+
+def estimate_put_vector_size(dct: "PutInputVectorTypeDef") -> int:
+    """
+    Estimate the serialized size in bytes of a single ``put_vectors`` item.
+
+    The estimation is conservative (it tends to over-estimate), it is used to
+    make sure a batch never exceeds :data:`~s3vectorm.constants.MAX_PUT_PAYLOAD_BYTES`
+    without paying the cost of actually serializing the request.
+
+    :param dct: A vector in the ``put_vectors`` format, usually created by
+        :meth:`s3vectorm.vector.Vector.to_put_vectors_dict`
+
+    :returns: The estimated size in bytes
+    """
+    size = _BYTES_PER_VECTOR_OVERHEAD + len(dct["key"])
+    for values in dct.get("data", {}).values():
+        size += BYTES_PER_FLOAT * len(values)
+    metadata = dct.get("metadata")
+    if metadata:
+        size += len(json.dumps(metadata, default=str))
+    return size
+
+
+def iter_put_batches(
+    dcts: T.Iterable["PutInputVectorTypeDef"],
+    max_vectors: int = MAX_VECTORS_PER_PUT,
+    max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+) -> T.Iterator[list["PutInputVectorTypeDef"]]:
+    """
+    Split a stream of ``put_vectors`` items into batches that fit the
+    service's per-call limits.
+
+    A new batch is started whenever adding the next item would exceed either
+    ``max_vectors`` or ``max_payload_bytes``. An item that is larger than
+    ``max_payload_bytes`` on its own is yielded as a single-item batch, so the
+    service can report the error for that item only.
+
+    :param dcts: Stream of vectors in the ``put_vectors`` format
+    :param max_vectors: Maximum number of vectors per batch
+    :param max_payload_bytes: Maximum estimated payload size per batch
+
+    :yields: Lists of ``put_vectors`` items
+    """
+    batch = []
+    batch_size = 0
+    for dct in dcts:
+        size = estimate_put_vector_size(dct)
+        if batch and (
+            len(batch) >= max_vectors or batch_size + size > max_payload_bytes
+        ):
+            yield batch
+            batch = []
+            batch_size = 0
+        batch.append(dct)
+        batch_size += size
+    if batch:
+        yield batch
+
+
+def iter_batches(
+    items: T.Iterable[ItemT],
+    size: int,
+) -> T.Iterator[list[ItemT]]:
+    """
+    Split a stream of items into lists of at most ``size`` items.
+
+    :param items: Stream of items
+    :param size: Maximum number of items per batch
+
+    :yields: Lists of items
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchFailure:
+    """
+    A batch that failed during a bulk operation.
+
+    :param keys: Keys of the vectors in the failed batch
+    :param error: The exception raised when sending the batch
+    """
+
+    keys: list[str] = dataclasses.field()
+    error: Exception = dataclasses.field()
+
+
+@dataclasses.dataclass
+class BulkWriteResult:
+    """
+    Summary of a bulk write (put or delete) operation.
+
+    :param n_batches: Number of API calls made
+    :param n_succeeded: Number of vectors written successfully
+    :param n_failed: Number of vectors in failed batches
+    :param failures: Details of each failed batch
+    :param n_skipped: Number of vectors that were not sent because they did
+        not change, see :meth:`~s3vectorm.index.Index.upsert_vectors`
+
+    Example:
+        >>> result = index.put_vectors_bulk(s3_vectors_client, vectors)
+        >>> if not result.ok:
+        ...     for failure in result.failures:
+        ...         print(failure.keys, failure.error)
+    """
+
+    n_batches: int = dataclasses.field(default=0)
+    n_succeeded: int = dataclasses.field(default=0)
+    n_failed: int = dataclasses.field(default=0)
+    failures: list[BatchFailure] = dataclasses.field(default_factory=list)
+    n_skipped: int = dataclasses.field(default=0)
+
+    @property
+    def n_total(self) -> int:
+        """Total number of vectors processed."""
+        return self.n_succeeded + self.n_failed + self.n_skipped
+
+    @property
+    def ok(self) -> bool:
+        """Whether all batches succeeded."""
+        return self.n_failed == 0
+
+    def merge(self, other: "BulkWriteResult") -> "BulkWriteResult":
+        """
+        Add the counts and failures of another result to this one (in place).
+
+        :returns: This result object
+        """
+        self.n_batches += other.n_batches
+        self.n_succeeded += other.n_succeeded
+        self.n_failed += other.n_failed
+        self.failures.extend(other.failures)
+        self.n_skipped += other.n_skipped
+        return self
+
+
+def run_batches(
+    batches: T.Iterable[list[ItemT]],
+    func: T.Callable[[list[ItemT]], T.Any],
+    get_key: T.Callable[[ItemT], str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_in_flight: int | None = None,
+    on_batch_done: T.Callable[[list[ItemT], Exception | None], None] | None = None,
+) -> BulkWriteResult:
+    """
+    Send batches through a bounded thread pool and summarize the outcome.
+
+    The input stream is consumed lazily, at most ``max_in_flight`` batches are
+    pending (submitted but not finished) at any time, which keeps memory usage
+    bounded regardless of the size of the input.
+
+    :param batches: Stream of batches
+    :param func: The function that sends one batch, e.g. a ``put_vectors`` call
+    :param get_key: Function that returns the vector key of an item, used to
+        report the keys of failed batches
+    :param max_workers: Number of worker threads
+    :param max_in_flight: Maximum number of pending batches,
+        default to ``2 * max_workers``
+    :param on_batch_done: Optional callback invoked in the calling thread after
+        each batch finishes, with the batch and the exception (or ``None``)
+
+    :returns: A :class:`BulkWriteResult` summarizing the operation
+    """
+    if max_in_flight is None:
+        max_in_flight = 2 * max_workers
+    max_in_flight = max(max_in_flight, 1)
+    result = BulkWriteResult()
+
+    def collect(future: Future, batch: list[ItemT]):
+        error = future.exception()
+        result.n_batches += 1
+        if error is None:
+            result.n_succeeded += len(batch)
+        else:
+            result.n_failed += len(batch)
+            result.failures.append(
+                BatchFailure(
+                    keys=[get_key(item) for item in batch],
+                    error=error,
+                )
+            )
+        if on_batch_done is not None:
+            on_batch_done(batch, error)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: dict[Future, list[ItemT]] = {}
+        for batch in batches:
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future, pending.pop(future))
+            pending[executor.submit(func, batch)] = batch
+        for future in list(pending):
+            future.exception()  # wait for it
+            collect(future, pending.pop(future))
+    return result
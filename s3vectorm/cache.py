@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+
+"""
+In-Process Query Result Cache
+
+This module provides :class:`QueryCache`, a thread-safe LRU cache with
+time-to-live (TTL) expiration for ``query_vectors`` results. Attach it to an
+:class:`~s3vectorm.index.Index` to serve repeated queries (same embedding, same
+filter, same ``top_k`` and return flags) from memory:
+
+Example:
+    >>> index.query_cache = QueryCache(max_size=10_000, ttl=300)
+    >>> res = index.query_vectors(s3_vectors_client, data=faq_embedding)  # miss
+    >>> res = index.query_vectors(s3_vectors_client, data=faq_embedding)  # hit
+    >>> index.query_cache.hits, index.query_cache.misses
+    (1, 1)
+
+Writes (``put_vectors``, ``delete_vectors`` and everything built on them) made
+through the same index invalidate its cached results. Writes made by other
+processes are not visible until the entries expire, choose the ``ttl``
+accordingly.
+
+The results of an index are grouped by the region and endpoint of the client,
+the bucket name and the index name. Indexes of different regions can share a
+cache, but the client does not tell the AWS account: give each account its
+own cache.
+"""
+
+import typing as T
+import json
+import time
+import array
+import itertools
+import threading
+import collections
+
+from .vector import to_float_list
+
+_MISSING = object()
+
+
+def make_query_key(
+    data: T.Sequence[float],
+    top_k: int,
+    filter_doc: T.Optional[dict[str, T.Any]],
+    return_metadata: bool,
+    return_distance: bool,
+) -> tuple:
+    """
+    Build the cache key of a ``query_vectors`` call.
+
+    The embedding is packed into float32 bytes (the precision the service
+    works with), and the filter document is serialized with sorted keys, so
+    equivalent queries share the same key.
+    """
+    return (
+        array.array("f", to_float_list(data)).tobytes(),
+        None if filter_doc is None else json.dumps(filter_doc, sort_keys=True),
+        top_k,
+        return_metadata,
+        return_distance,
+    )
+
+
+class QueryCache:
+    """
+    A thread-safe LRU cache with TTL expiration.
+
+    Entries are grouped by namespace (the index they belong to), invalidating a
+    namespace is O(1): it bumps the namespace's generation number, which is
+    part of every key, so the stale entries are never hit again and are evicted
+    by the LRU policy.
+
+    A namespace's generation is only stored while the cache holds entries of
+    the namespace, so the memory usage is bounded by ``max_size`` however
+    many namespaces are used. The namespaces without entries share one
+    generation, and generation numbers are never reused, so a value computed
+    before an invalidation is never stored after it.
+
+    :param max_size: Maximum number of cached results
+    :param ttl: Time-to-live of a cached result in seconds, ``None`` means
+        the entries never expire
+
+    Attributes:
+        hits: Number of lookups that found a fresh entry
+        misses: Number of lookups that did not
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float | None = 300,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: collections.OrderedDict[T.Hashable, tuple[float, T.Any]] = (
+            collections.OrderedDict()
+        )
+        # generation and number of entries of the namespaces with entries
+        self._generations: dict[str, int] = {}
+        self._n_entries: collections.Counter[str] = collections.Counter()
+        # generation of the namespaces without entries
+        self._default_generation = 0
+        self._next_generation = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were hits, 0.0 if there was no lookup."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def generation(self, namespace: str) -> int:
+        """
+        Get the current generation of a namespace, it changes on every
+        :meth:`invalidate` of the namespace.
+
+        Read it before computing a value to cache, and pass it to :meth:`set`:
+        if the namespace is invalidated while the value is computed, the
+        value is not stored.
+
+        Example:
+            >>> generation = cache.generation(namespace)
+            >>> value = cache.get(namespace, key, generation=generation)
+            >>> if value is None:
+            ...     value = compute()
+            ...     cache.set(namespace, key, value, generation=generation)
+        """
+        with self._lock:
+            return self._current_generation(namespace)
+
+    def _current_generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, self._default_generation)
+
+    def _full_key(
+        self,
+        namespace: str,
+        key: T.Hashable,
+        generation: int | None = None,
+    ) -> T.Hashable:
+        if generation is None:
+            generation = self._current_generation(namespace)
+        return (namespace, generation, key)
+
+    def _remove(self, full_key: T.Hashable):
+        """
+        Remove an entry, and the generation of its namespace if it was the
+        last entry of the namespace. The caller must hold the lock.
+        """
+        del self._data[full_key]
+        namespace = full_key[0]
+        self._n_entries[namespace] -= 1
+        if self._n_entries[namespace] == 0:
+            del self._n_entries[namespace]
+            if self._generations.pop(namespace) != self._default_generation:
+                # the namespace was invalidated, move the namespaces without
+                # entries to a new generation so that the ones computed
+                # before the invalidation can not be stored
+                self._default_generation = next(self._next_generation)
+
+    def get(
+        self,
+        namespace: str,
+        key: T.Hashable,
+        default: T.Any = None,
+        generation: int | None = None,
+    ) -> T.Any:
+        """
+        Look up a cached value.
+
+        :param namespace: The namespace of the entry, e.g. the index ARN
+        :param key: The key of the entry within the namespace
+        :param default: The value to return on a miss
+        :param generation: Optional generation of the namespace, from
+            :meth:`generation`, default to the current one
+        """
+        with self._lock:
+            full_key = self._full_key(namespace, key, generation)
+            expire_at, value = self._data.get(full_key, (None, _MISSING))
+            if value is not _MISSING:
+                if expire_at is None or expire_at > time.monotonic():
+                    self._data.move_to_end(full_key)
+                    self.hits += 1
+                    return value
+                self._remove(full_key)
+            self.misses += 1
+            return default
+
+    def set(
+        self,
+        namespace: str,
+        key: T.Hashable,
+        value: T.Any,
+        generation: int | None = None,
+    ):
+        """
+        Store a value, evicting the least recently used entries if the cache is full.
+
+        :param namespace: The namespace of the entry, e.g. the index ARN
+        :param key: The key of the entry within the namespace
+        :param value: The value to cache
+        :param generation: Optional generation of the namespace read before
+            the value was computed, see :meth:`generation`. If the namespace
+            was invalidated since, the value may be stale and is not stored.
+        """
+        expire_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self._current_generation(
+                namespace
+            ):
+                return
+            full_key = self._full_key(namespace, key)
+            if full_key not in self._data:
+                self._generations.setdefault(namespace, full_key[1])
+                self._n_entries[namespace] += 1
+            self._data[full_key] = (expire_at, value)
+            self._data.move_to_end(full_key)
+            while len(self._data) > self.max_size:
+                self._remove(next(iter(self._data)))
+
+    def invalidate(
+        self,
+        namespace: str | None = None,
+    ):
+        """
+        Invalidate the cached values of a namespace, or of all namespaces.
+
+        :param namespace: The namespace to invalidate, ``None`` means clear
+            the whole cache
+        """
+        with self._lock:
+            if namespace is None:
+                self._data.clear()
+                self._generations.clear()
+                self._n_entries.clear()
+                self._default_generation = next(self._next_generation)
+            elif namespace in self._generations:
+                self._generations[namespace] = next(self._next_generation)
+            else:
+                # the namespace has no entries, only the values being
+                # computed need to be discarded
+                self._default_generation = next(self._next_generation)
+
+    def reset_stats(self):
+        """Reset the hit / miss counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local Content Hash Catalog
+
+This module provides :class:`HashCatalog`, a local, persistent mapping from
+vector key to :meth:`~s3vectorm.vector.Vector.content_hash`. It records what
+was last written to an index, so that
+:meth:`~s3vectorm.index.Index.upsert_vectors` can skip the vectors that did
+not change without reading anything back from the service.
+
+The catalog is a SQLite database (from the standard library), it handles
+millions of keys with a small memory footprint.
+
+Example:
+    >>> with HashCatalog("documents.hashes.sqlite") as catalog:
+    ...     result = index.upsert_vectors(s3_vectors_client, vectors, catalog=catalog)
+    >>> print(f"{result.n_succeeded} written, {result.n_skipped} unchanged")
+
+.. note::
+
+    The catalog only knows about the writes made through it. If vectors are
+    deleted or overwritten by other means, remove their keys with
+    :meth:`HashCatalog.delete_many` (or use a new catalog), otherwise they
+    are considered unchanged and skipped.
+"""
+
+import typing as T
+import sqlite3
+import threading
+
+_SQLITE_MAX_VARIABLES = 500
+
+
+class HashCatalog:
+    """
+    A thread-safe, SQLite backed mapping from vector key to content hash.
+
+    Use one catalog (one file) per index.
+
+    :param path: Path of the SQLite database file, ``":memory:"`` (default)
+        keeps the catalog in memory for the lifetime of the object
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+    ):
+        self.path = str(path)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "key TEXT PRIMARY KEY NOT NULL, "
+            "hash TEXT NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "HashCatalog":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    def get_many(
+        self,
+        keys: T.Iterable[str],
+    ) -> dict[str, str]:
+        """
+        Look up the hashes of many keys.
+
+        :returns: Mapping from key to hash, for the keys that are in the catalog
+        """
+        keys = list(keys)
+        result = {}
+        with self._lock:
+            for i in range(0, len(keys), _SQLITE_MAX_VARIABLES):
+                chunk = keys[i : i + _SQLITE_MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                result.update(
+                    self._conn.execute(
+                        f"SELECT key, hash FROM hashes WHERE key IN ({placeholders})",
+                        chunk,
+                    )
+                )
+        return result
+
+    def set_many(
+        self,
+        items: T.Iterable[tuple[str, str]],
+    ):
+        """
+        Insert or replace the hashes of many keys.
+
+        :param items: ``(key, hash)`` pairs
+        """
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hashes (key, hash) VALUES (?, ?)",
+                items,
+            )
+            self._conn.commit()
+
+    def delete_many(
+        self,
+        keys: T.Iterable[str],
+    ):
+        """
+        Remove many keys from the catalog, unknown keys are ignored.
+        """
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM hashes WHERE key = ?",
+                ((key,) for key in keys),
+            )
+            self._conn.commit()
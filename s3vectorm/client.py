@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+"""
+S3 Vectors Client Factory
+
+Every method of :class:`~s3vectorm.index.Index` takes an ``s3_vectors_client``.
+The bulk, scan, copy and multi-query features call it from many threads at
+once, but a default boto3 client keeps at most 10 HTTP connections: beyond
+that, the extra threads wait for a connection (and botocore logs
+"Connection pool is full") instead of adding throughput.
+
+This module builds clients whose connection pool matches the concurrency of
+this library:
+
+- :func:`recommended_max_pool_connections` computes the pool size from the
+  number of workers and scan segments in use.
+- :func:`make_client_config` returns a ``botocore.config.Config`` with that
+  pool size, TCP keep-alive and explicit timeouts.
+- :class:`ClientRegistry` (and :func:`get_client`, backed by a process-wide
+  registry) creates each client once and shares it, boto3 clients are
+  thread safe once created.
+- :func:`prewarm_connections` opens the connections up front, so the first
+  bulk call does not pay for the TLS handshakes.
+
+Example:
+    >>> s3_vectors_client = get_client(region_name="us-east-1", max_workers=16, prewarm=True)
+    >>> index.put_vectors_bulk(s3_vectors_client, vectors, max_workers=16)
+"""
+
+import typing as T
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import botocore.exceptions
+from botocore.config import Config
+
+from .constants import DEFAULT_MAX_WORKERS, MAX_SEGMENT_COUNT
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3vectors import S3VectorsClient
+
+DEFAULT_CONNECT_TIMEOUT = 10
+"""Default seconds to wait for a connection to be established."""
+
+DEFAULT_READ_TIMEOUT = 60
+"""Default seconds to wait for a response on an established connection."""
+
+DEFAULT_MAX_ATTEMPTS = 5
+"""Default number of attempts of a call, including the first one."""
+
+
+def recommended_max_pool_connections(
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    segment_count: int = MAX_SEGMENT_COUNT,
+) -> int:
+    """
+    Get the connection pool size for a client shared by the features of this
+    library.
+
+    The busiest case is a scan (``segment_count`` threads) running at the
+    same time as concurrent writes (``max_workers`` threads), e.g.
+    :meth:`~s3vectorm.index.Index.copy_to` or
+    :meth:`~s3vectorm.index.Index.sync_vectors`.
+
+    :param max_workers: The largest ``max_workers`` / ``put_workers`` in use
+    :param segment_count: The largest ``segment_count`` of a scan in use
+    """
+    return max_workers + segment_count
+
+
+def make_client_config(
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    segment_count: int = MAX_SEGMENT_COUNT,
+    max_pool_connections: int | None = None,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    read_timeout: float = DEFAULT_READ_TIMEOUT,
+    tcp_keepalive: bool = True,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    retry_mode: str = "standard",
+) -> Config:
+    """
+    Create a botocore client configuration sized for concurrent use.
+
+    :param max_workers: The largest ``max_workers`` / ``put_workers`` in use
+    :param segment_count: The largest ``segment_count`` of a scan in use
+    :param max_pool_connections: The connection pool size, default to
+        :func:`recommended_max_pool_connections`
+    :param connect_timeout: Seconds to wait for a connection (default: 10)
+    :param read_timeout: Seconds to wait for a response (default: 60)
+    :param tcp_keepalive: Whether to enable TCP keep-alive on the connections,
+        so that idle pooled connections are not silently dropped
+    :param max_attempts: Number of attempts of a call, including the first one
+    :param retry_mode: botocore retry mode, ``"standard"`` (default),
+        ``"adaptive"`` or ``"legacy"``
+    """
+    if max_pool_connections is None:
+        max_pool_connections = recommended_max_pool_connections(
+            max_workers=max_workers,
+            segment_count=segment_count,
+        )
+    return Config(
+        max_pool_connections=max_pool_connections,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        tcp_keepalive=tcp_keepalive,
+        retries={"mode": retry_mode, "max_attempts": max_attempts},
+    )
+
+
+def prewarm_connections(
+    s3_vectors_client: "S3VectorsClient",
+    n_connections: int,
+) -> int:
+    """
+    Open up to ``n_connections`` pooled connections by sending that many
+    cheap ``list_vector_buckets`` calls at the same time.
+
+    A call that fails with a service error (e.g. access denied) still opens
+    its connection, only connection errors are not counted.
+
+    :returns: The number of calls that reached the service, ``0`` if
+        ``n_connections`` is not positive
+    """
+    if n_connections <= 0:
+        return 0
+    barrier = threading.Barrier(n_connections)
+
+    def call() -> bool:
+        try:
+            barrier.wait(timeout=DEFAULT_CONNECT_TIMEOUT)
+        except threading.BrokenBarrierError:  # pragma: no cover
+            pass
+        try:
+            s3_vectors_client.list_vector_buckets(maxResults=1)
+        except botocore.exceptions.ClientError:
+            return True
+        except Exception:
+            return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=n_connections) as executor:
+        futures = [executor.submit(call) for _ in range(n_connections)]
+        return sum(future.result() for future in futures)
+
+
+class ClientRegistry:
+    """
+    A thread-safe cache of S3 Vectors clients, one per distinct set of
+    parameters.
+
+    Creating a client is slow (it loads the service model) and
+    ``boto3.session.Session`` is not thread safe, the registry creates each
+    client once, under a lock, and returns the same client afterward.
+
+    Example:
+        >>> registry = ClientRegistry()
+        >>> client = registry.get_client(region_name="us-east-1", max_workers=16)
+        >>> client is registry.get_client(region_name="us-east-1", max_workers=16)
+        True
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: dict[tuple, "S3VectorsClient"] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def get_client(
+        self,
+        boto_session: T.Optional[boto3.session.Session] = None,
+        region_name: str | None = None,
+        endpoint_url: str | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        segment_count: int = MAX_SEGMENT_COUNT,
+        max_pool_connections: int | None = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        tcp_keepalive: bool = True,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_mode: str = "standard",
+        prewarm: bool = False,
+    ) -> "S3VectorsClient":
+        """
+        Get the shared client for these parameters, create it on first use.
+
+        :param boto_session: Optional boto3 session (credentials, profile and
+            default region), default to a new default session
+        :param region_name: Optional AWS region, default to the session's region
+        :param endpoint_url: Optional endpoint URL
+        :param prewarm: Whether to open the pooled connections when the
+            client is created, see :func:`prewarm_connections`
+
+        The other parameters are passed to :func:`make_client_config`.
+        """
+        if max_pool_connections is None:
+            max_pool_connections = recommended_max_pool_connections(
+                max_workers=max_workers,
+                segment_count=segment_count,
+            )
+        key = (
+            boto_session,
+            region_name,
+            endpoint_url,
+            max_pool_connections,
+            connect_timeout,
+            read_timeout,
+            tcp_keepalive,
+            max_attempts,
+            retry_mode,
+        )
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                return client
+            session = boto_session or boto3.session.Session()
+            client = session.client(
+                "s3vectors",
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                config=make_client_config(
+                    max_pool_connections=max_pool_connections,
+                    connect_timeout=connect_timeout,
+                    read_timeout=read_timeout,
+                    tcp_keepalive=tcp_keepalive,
+                    max_attempts=max_attempts,
+                    retry_mode=retry_mode,
+                ),
+            )
+            self._clients[key] = client
+        if prewarm:
+            prewarm_connections(client, max_pool_connections)
+        return client
+
+    def clear(self):
+        """
+        Forget all clients, and close their connections.
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+_registry = ClientRegistry()
+
+
+def get_client(
+    boto_session: T.Optional[boto3.session.Session] = None,
+    region_name: str | None = None,
+    endpoint_url: str | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    segment_count: int = MAX_SEGMENT_COUNT,
+    max_pool_connections: int | None = None,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    read_timeout: float = DEFAULT_READ_TIMEOUT,
+    tcp_keepalive: bool = True,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    retry_mode: str = "standard",
+    prewarm: bool = False,
+) -> "S3VectorsClient":
+    """
+    Get a shared S3 Vectors client from the process-wide
+    :class:`ClientRegistry`, see :meth:`ClientRegistry.get_client` for the
+    parameters.
+    """
+    return _registry.get_client(
+        boto_session=boto_session,
+        region_name=region_name,
+        endpoint_url=endpoint_url,
+        max_workers=max_workers,
+        segment_count=segment_count,
+        max_pool_connections=max_pool_connections,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        tcp_keepalive=tcp_keepalive,
+        max_attempts=max_attempts,
+        retry_mode=retry_mode,
+        prewarm=prewarm,
+    )
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+"""
+Columnar Vector Results
+
+This module provides :class:`VectorBatch`, a columnar (struct of arrays) view of
+the vectors returned by ``query_vectors`` and ``list_vectors``:
+
+- ``keys``: a 1-D object array of vector keys
+- ``data``: a ``(n, dimension)`` float32 matrix
+- ``distances``: a 1-D float32 array
+- ``metadata``: one 1-D array per metadata key
+
+Compared to :meth:`~s3vectorm.index.VectorsOutputMixin.as_vector_objects`, which
+builds one pydantic object per row, this layout lets reranking, deduplication
+and statistics run as vectorized NumPy operations.
+
+.. note::
+
+    This module requires ``numpy``, install it with ``pip install "s3vectorm[numpy]"``.
+
+Example:
+    >>> res = index.query_vectors(s3_vectors_client, data=embedding, top_k=30,
+    ...     return_distance=True, return_metadata=True)
+    >>> batch = res.as_vector_batch()
+    >>> batch.keys[batch.distances < 0.2]
+
+    >>> batch = VectorBatch.from_outputs(
+    ...     index.scan_vectors(s3_vectors_client, return_data=True)
+    ... )
+    >>> centroid = batch.data.mean(axis=0)
+"""
+
+import typing as T
+import dataclasses
+
+import numpy as np
+
+from .predicate import filter_mask
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3vectors.literals import DataTypeType
+
+    from .index import VectorsOutputMixin
+    from .predicate import FilterLike
+
+
+def to_column(values: list[T.Any]) -> np.ndarray:
+    """
+    Convert a list of metadata values into a column, as used by
+    :attr:`VectorBatch.metadata`.
+
+    Columns of booleans, or of numbers, without missing values become bool or
+    numeric arrays, anything else (strings, lists, missing values, booleans
+    mixed with numbers) becomes an object array, so that no value is upcast.
+    """
+    if values:
+        if all(isinstance(value, bool) for value in values):
+            return np.asarray(values, dtype=bool)
+        if all(
+            isinstance(value, (int, float)) and not isinstance(value, bool)
+            for value in values
+        ):
+            column = np.asarray(values)
+            if column.dtype.kind in "iuf":
+                return column
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+@dataclasses.dataclass(frozen=True)
+class VectorBatch:
+    """
+    A columnar batch of vectors.
+
+    :param keys: 1-D object array of vector keys
+    :param data: ``(n, dimension)`` float32 matrix, ``None`` if the vector data
+        was not returned. Rows without data are filled with ``NaN``.
+    :param distances: 1-D float32 array of distances, ``None`` if the distances
+        were not returned. Missing distances are ``NaN``.
+    :param metadata: Mapping from metadata key to a 1-D array of values.
+        A vector without the metadata key has ``None`` in that column.
+    """
+
+    keys: np.ndarray = dataclasses.field()
+    data: np.ndarray | None = dataclasses.field(default=None)
+    distances: np.ndarray | None = dataclasses.field(default=None)
+    metadata: dict[str, np.ndarray] = dataclasses.field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def from_raw_vectors(
+        cls,
+        vectors: list[dict[str, T.Any]],
+        data_type: "DataTypeType",
+    ) -> "VectorBatch":
+        """
+        Create a batch from the ``vectors`` list of a raw ``query_vectors``
+        or ``list_vectors`` response.
+
+        :param vectors: The raw vector dictionaries
+        :param data_type: The data type of the vectors in the response
+        """
+        n = len(vectors)
+        keys = np.empty(n, dtype=object)
+        keys[:] = [dct["key"] for dct in vectors]
+
+        data = None
+        rows = [dct.get("data", {}).get(data_type) for dct in vectors]
+        if any(row is not None for row in rows):
+            if all(row is not None for row in rows):
+                data = np.asarray(rows, dtype=np.float32)
+            else:
+                dimension = len(next(row for row in rows if row is not None))
+                data = np.full((n, dimension), np.nan, dtype=np.float32)
+                for i, row in enumerate(rows):
+                    if row is not None:
+                        data[i] = row
+
+        distances = None
+        if any("distance" in dct for dct in vectors):
+            distances = np.asarray(
+                [dct.get("distance", np.nan) for dct in vectors],
+                dtype=np.float32,
+            )
+
+        fields = {}
+        for dct in vectors:
+            for field in dct.get("metadata", {}):
+                fields[field] = None
+        metadata = {
+            field: to_column([dct.get("metadata", {}).get(field) for dct in vectors])
+            for field in fields
+        }
+        return cls(keys=keys, data=data, distances=distances, metadata=metadata)
+
+    @classmethod
+    def concat(
+        cls,
+        batches: T.Iterable["VectorBatch"],
+    ) -> "VectorBatch":
+        """
+        Join many batches into one.
+
+        A column that is missing from some batches (e.g. a metadata key that
+        only some pages have) is filled with ``None`` (metadata) or ``NaN``
+        (data, distances) for the rows of those batches.
+
+        :param batches: The batches to join
+        """
+        batches = [batch for batch in batches if len(batch)]
+        if len(batches) == 0:
+            return cls(keys=np.empty(0, dtype=object))
+        if len(batches) == 1:
+            return batches[0]
+
+        keys = np.concatenate([batch.keys for batch in batches])
+
+        data = None
+        if any(batch.data is not None for batch in batches):
+            dimension = next(
+                batch.data.shape[1] for batch in batches if batch.data is not None
+            )
+            data = np.concatenate(
+                [
+                    (
+                        batch.data
+                        if batch.data is not None
+                        else np.full((len(batch), dimension), np.nan, np.float32)
+                    )
+                    for batch in batches
+                ]
+            )
+
+        distances = None
+        if any(batch.distances is not None for batch in batches):
+            distances = np.concatenate(
+                [
+                    (
+                        batch.distances
+                        if batch.distances is not None
+                        else np.full(len(batch), np.nan, np.float32)
+                    )
+                    for batch in batches
+                ]
+            )
+
+        fields = {}
+        for batch in batches:
+            for field in batch.metadata:
+                fields[field] = None
+        metadata = {}
+        for field in fields:
+            columns = []
+            for batch in batches:
+                if field in batch.metadata:
+                    columns.append(batch.metadata[field])
+                else:
+                    columns.append(np.full(len(batch), None, dtype=object))
+            kinds = {column.dtype.kind for column in columns}
+            if "b" in kinds and len(kinds) > 1:
+                # numpy would turn the booleans into numbers
+                columns = [column.astype(object) for column in columns]
+            metadata[field] = np.concatenate(columns)
+        return cls(keys=keys, data=data, distances=distances, metadata=metadata)
+
+    @classmethod
+    def from_outputs(
+        cls,
+        outputs: T.Iterable["VectorsOutputMixin"],
+    ) -> "VectorBatch":
+        """
+        Join many ``query_vectors`` / ``list_vectors`` outputs into one batch.
+
+        :param outputs: Iterable of :class:`~s3vectorm.index.QueryVectorsOutput`
+            or :class:`~s3vectorm.index.ListVectorsOutput`, e.g. the pages
+            yielded by :meth:`~s3vectorm.index.Index.scan_vectors`
+        """
+        return cls.concat(output.as_vector_batch() for output in outputs)
+
+    def take(
+        self,
+        indices: T.Union[np.ndarray, T.Sequence[int]],
+    ) -> "VectorBatch":
+        """
+        Select rows by integer indices or a boolean mask.
+
+        Example:
+            >>> order = np.argsort(batch.distances)[:10]
+            >>> top10 = batch.take(order)
+            >>> _, first = np.unique(batch.metadata["document_id"], return_index=True)
+            >>> deduped = batch.take(np.sort(first))
+        """
+        indices = np.asarray(indices)
+        return VectorBatch(
+            keys=self.keys[indices],
+            data=None if self.data is None else self.data[indices],
+            distances=None if self.distances is None else self.distances[indices],
+            metadata={
+                field: column[indices] for field, column in self.metadata.items()
+            },
+        )
+
+    def filter(
+        self,
+        filter: "FilterLike",
+    ) -> "VectorBatch":
+        """
+        Select the rows whose metadata matches a filter, evaluated with
+        :func:`~s3vectorm.predicate.filter_mask`.
+
+        Example:
+            >>> recent = batch.filter(DocMeta.year.gte(2024))
+        """
+        return self.take(filter_mask(filter, self.metadata, len(self)))
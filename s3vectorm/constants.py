@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+AWS S3 Vectors Service Limits and Library Defaults
+
+This module centralizes the per-call limits enforced by the AWS S3 Vectors
+service and the default concurrency settings used by the bulk / parallel
+features of this library, so that every feature (and the client factory that
+sizes the connection pool) agrees on the same numbers.
+
+Reference:
+    https://docs.aws.amazon.com/AmazonS3/latest/userguide/s3-vectors-limitations.html
+"""
+
+# ------------------------------------------------------------------------------
+# Service limits
+# ------------------------------------------------------------------------------
+MAX_VECTORS_PER_PUT = 500
+"""Maximum number of vectors in a single ``put_vectors`` call."""
+
+MAX_PUT_PAYLOAD_BYTES = 20 * 1024 * 1024
+"""Maximum request payload size of a single ``put_vectors`` call (20 MiB)."""
+
+MAX_KEYS_PER_DELETE = 500
+"""Maximum number of keys in a single ``delete_vectors`` call."""
+
+MAX_KEYS_PER_GET = 100
+"""Maximum number of keys in a single ``get_vectors`` call."""
+
+MAX_LIST_PAGE_SIZE = 1000
+"""Maximum ``maxResults`` of a single ``list_vectors`` call."""
+
+MAX_SEGMENT_COUNT = 16
+"""Maximum ``segmentCount`` of a ``list_vectors`` call."""
+
+# ------------------------------------------------------------------------------
+# Payload size estimation
+# ------------------------------------------------------------------------------
+BYTES_PER_FLOAT = 26
+"""
+Upper bound of the size of one float of a vector in a JSON request payload.
+The JSON serializer in botocore renders a float with ``repr``, a float32
+value converted to a Python float takes at most ~24 characters, plus the
+``", "`` separator.
+"""
+
+# ------------------------------------------------------------------------------
+# Library defaults
+# ------------------------------------------------------------------------------
+DEFAULT_MAX_WORKERS = 8
+"""Default number of worker threads used by bulk / parallel operations."""
+
+# ------------------------------------------------------------------------------
+# Error codes
+# ------------------------------------------------------------------------------
+THROTTLING_ERROR_CODES = frozenset(
+    {
+        "ThrottlingException",
+        "TooManyRequestsException",
+        "RequestLimitExceeded",
+        "SlowDown",
+        "ServiceUnavailableException",
+    }
+)
+"""Error codes of the ``ClientError`` raised when a call is throttled."""
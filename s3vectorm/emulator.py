@@ -0,0 +1,754 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local In-Memory S3 Vectors Emulator
+
+This module provides :class:`LocalS3VectorsClient`, an in-process stand-in for
+the boto3 ``s3vectors`` client. It implements the API calls this library uses,
+with the same request arguments, response shapes and error codes, so
+:class:`~s3vectorm.bucket.Bucket` and :class:`~s3vectorm.index.Index` run
+against it unchanged:
+
+- ``create_vector_bucket``, ``get_vector_bucket``, ``list_vector_buckets``,
+  ``delete_vector_bucket``
+- ``create_index``, ``get_index``, ``list_indexes``, ``delete_index``
+- ``put_vectors``, ``get_vectors``, ``delete_vectors``
+- ``query_vectors`` (exact k-NN, with metadata filters)
+- ``list_vectors`` (with segments)
+- ``get_paginator("list_vector_buckets" | "list_indexes" | "list_vectors")``
+
+Vectors are stored in a NumPy float32 matrix per index, queries compute the
+exact distances to every stored vector. All calls are thread safe.
+
+It is meant for unit tests, CI and client-side throughput benchmarks, it does
+not model the service's latency, throttling or approximate search.
+
+.. note::
+
+    This module requires ``numpy``, install it with ``pip install "s3vectorm[numpy]"``.
+
+Example:
+    >>> client = LocalS3VectorsClient()
+    >>> Bucket(name="my-bucket").create(client)
+    >>> index = Index(bucket_name="my-bucket", index_name="documents",
+    ...     data_type="float32", dimension=3, distance_metric="cosine")
+    >>> index.create(client)
+    >>> index.put_vectors(client, [Vector(key="doc-1", data=[0.1, 0.2, 0.3])])
+    >>> index.query_vectors(client, data=[0.1, 0.2, 0.3], top_k=1).vectors[0].key
+    'doc-1'
+"""
+
+import typing as T
+import bisect
+import copy
+import zlib
+import threading
+import dataclasses
+from datetime import datetime, timezone
+
+import numpy as np
+import botocore.exceptions
+
+from .constants import (
+    MAX_VECTORS_PER_PUT,
+    MAX_KEYS_PER_DELETE,
+    MAX_KEYS_PER_GET,
+    MAX_LIST_PAGE_SIZE,
+    MAX_SEGMENT_COUNT,
+)
+from .predicate import compile_filter
+
+
+def _response(**kwargs) -> dict[str, T.Any]:
+    return {
+        "ResponseMetadata": {
+            "HTTPStatusCode": 200,
+            "HTTPHeaders": {},
+            "RetryAttempts": 0,
+        },
+        **kwargs,
+    }
+
+
+def _client_error(
+    code: str,
+    message: str,
+    operation_name: str,
+) -> botocore.exceptions.ClientError:
+    return botocore.exceptions.ClientError(
+        error_response={
+            "Error": {"Code": code, "Message": message},
+            "ResponseMetadata": {"HTTPStatusCode": 400},
+        },
+        operation_name=operation_name,
+    )
+
+
+def get_segment_index(key: str, segment_count: int) -> int:
+    """
+    Get the segment a vector key belongs to when the index is listed with
+    ``segment_count`` segments. The assignment is stable across calls.
+    """
+    return zlib.crc32(key.encode("utf-8")) % segment_count
+
+
+@dataclasses.dataclass
+class _LocalIndex:
+    """
+    The storage of one index.
+
+    Vectors live in the first ``n`` rows of ``data``, which grows by doubling.
+    Deleting a vector moves the last row into the freed slot.
+    """
+
+    bucket_name: str
+    index_name: str
+    arn: str
+    data_type: str
+    dimension: int
+    distance_metric: str
+    creation_time: datetime
+    metadata_configuration: dict[str, T.Any] | None = None
+    data: np.ndarray = None
+    keys: list[str] = dataclasses.field(default_factory=list)
+    metadata: list[dict[str, T.Any]] = dataclasses.field(default_factory=list)
+    rows: dict[str, int] = dataclasses.field(default_factory=dict)
+    # sorted snapshot of the keys, used for listing, rebuilt lazily after inserts
+    sorted_keys: list[str] | None = None
+
+    def __post_init__(self):
+        if self.data is None:
+            self.data = np.empty((16, self.dimension), dtype=np.float32)
+
+    @property
+    def n(self) -> int:
+        return len(self.keys)
+
+    def put(self, key: str, data: np.ndarray, metadata: dict[str, T.Any]):
+        row = self.rows.get(key)
+        if row is None:
+            row = self.n
+            if row == len(self.data):
+                data_ = np.empty((2 * len(self.data), self.dimension), np.float32)
+                data_[:row] = self.data[:row]
+                self.data = data_
+            self.rows[key] = row
+            self.keys.append(key)
+            self.metadata.append(metadata)
+            self.sorted_keys = None
+        else:
+            self.metadata[row] = metadata
+        self.data[row] = data
+
+    def delete(self, key: str):
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        last = self.n - 1
+        if row != last:
+            last_key = self.keys[last]
+            self.keys[row] = last_key
+            self.metadata[row] = self.metadata[last]
+            self.data[row] = self.data[last]
+            self.rows[last_key] = row
+        self.keys.pop()
+        self.metadata.pop()
+
+    def get_sorted_keys(self) -> list[str]:
+        if self.sorted_keys is None:
+            self.sorted_keys = sorted(self.keys)
+        return self.sorted_keys
+
+    def to_vector_dict(
+        self,
+        row: int,
+        return_data: bool,
+        return_metadata: bool,
+    ) -> dict[str, T.Any]:
+        dct = {"key": self.keys[row]}
+        if return_data:
+            dct["data"] = {self.data_type: self.data[row].tolist()}
+        if return_metadata:
+            dct["metadata"] = copy.deepcopy(self.metadata[row])
+        return dct
+
+    def distances(self, query: np.ndarray) -> np.ndarray:
+        data = self.data[: self.n]
+        if self.distance_metric == "cosine":
+            norms = np.linalg.norm(data, axis=1) * np.linalg.norm(query)
+            norms[norms == 0] = 1.0
+            return 1.0 - (data @ query) / norms
+        return np.linalg.norm(data - query, axis=1)
+
+
+@dataclasses.dataclass
+class _LocalBucket:
+    name: str
+    arn: str
+    creation_time: datetime
+    encryption_configuration: dict[str, T.Any] | None = None
+    indexes: dict[str, _LocalIndex] = dataclasses.field(default_factory=dict)
+
+
+class LocalPaginator:
+    """
+    Paginator for :class:`LocalS3VectorsClient`, it supports the same
+    ``PaginationConfig`` (``MaxItems``, ``PageSize``, ``StartingToken``)
+    as the boto3 paginators.
+    """
+
+    def __init__(
+        self,
+        method: T.Callable[..., dict[str, T.Any]],
+        result_key: str,
+    ):
+        self._method = method
+        self._result_key = result_key
+
+    def paginate(
+        self,
+        PaginationConfig: dict[str, T.Any] | None = None,
+        **kwargs,
+    ) -> T.Iterator[dict[str, T.Any]]:
+        config = PaginationConfig or {}
+        max_items = config.get("MaxItems")
+        page_size = config.get("PageSize")
+        next_token = config.get("StartingToken")
+        n_items = 0
+        while True:
+            if page_size is not None:
+                kwargs["maxResults"] = page_size
+            if max_items is not None:
+                kwargs["maxResults"] = min(
+                    kwargs.get("maxResults", MAX_LIST_PAGE_SIZE),
+                    max_items - n_items,
+                )
+            if next_token is not None:
+                kwargs["nextToken"] = next_token
+            response = self._method(**kwargs)
+            n_items += len(response[self._result_key])
+            yield response
+            next_token = response.get("nextToken")
+            if next_token is None:
+                return
+            if max_items is not None and n_items >= max_items:
+                return
+
+
+class LocalS3VectorsClient:
+    """
+    An in-memory, thread-safe emulator of the boto3 ``s3vectors`` client.
+
+    :param region_name: The region used in the ARNs
+    :param account_id: The AWS account id used in the ARNs
+    """
+
+    def __init__(
+        self,
+        region_name: str = "us-east-1",
+        account_id: str = "123456789012",
+    ):
+        self.region_name = region_name
+        self.account_id = account_id
+        self._buckets: dict[str, _LocalBucket] = {}
+        self._lock = threading.RLock()
+
+    # --------------------------------------------------------------------------
+    # Helpers
+    # --------------------------------------------------------------------------
+    def _get_bucket(
+        self,
+        operation_name: str,
+        vectorBucketName: str | None = None,
+        vectorBucketArn: str | None = None,
+    ) -> _LocalBucket:
+        if vectorBucketArn is not None:
+            vectorBucketName = vectorBucketArn.split(":bucket/", 1)[-1]
+        bucket = self._buckets.get(vectorBucketName)
+        if bucket is None:
+            raise _client_error(
+                "NotFoundException",
+                f"The specified vector bucket could not be found: {vectorBucketName}",
+                operation_name,
+            )
+        return bucket
+
+    def _get_index(
+        self,
+        operation_name: str,
+        vectorBucketName: str | None = None,
+        indexName: str | None = None,
+        indexArn: str | None = None,
+    ) -> _LocalIndex:
+        if indexArn is not None:
+            vectorBucketName, indexName = indexArn.split(":bucket/", 1)[-1].split(
+                "/index/", 1
+            )
+        bucket = self._get_bucket(operation_name, vectorBucketName=vectorBucketName)
+        index = bucket.indexes.get(indexName)
+        if index is None:
+            raise _client_error(
+                "NotFoundException",
+                f"The specified index could not be found: {indexName}",
+                operation_name,
+            )
+        return index
+
+    def _to_array(
+        self,
+        index: _LocalIndex,
+        data: dict[str, T.Any],
+        operation_name: str,
+    ) -> np.ndarray:
+        if index.data_type not in data:
+            raise _client_error(
+                "ValidationException",
+                f"Vector data must be of type {index.data_type}",
+                operation_name,
+            )
+        array = np.asarray(data[index.data_type], dtype=np.float32)
+        if array.shape != (index.dimension,):
+            raise _client_error(
+                "ValidationException",
+                f"Invalid vector dimension, expected {index.dimension}, "
+                f"got {array.shape}",
+                operation_name,
+            )
+        return array
+
+    @staticmethod
+    def _paginate_names(
+        names: T.Iterable[str],
+        maxResults: int | None,
+        nextToken: str | None,
+        prefix: str | None,
+    ) -> tuple[list[str], str | None]:
+        names = sorted(names)
+        if prefix is not None:
+            names = [name for name in names if name.startswith(prefix)]
+        start = 0 if nextToken is None else bisect.bisect_right(names, nextToken)
+        end = start + (maxResults or MAX_LIST_PAGE_SIZE)
+        page = names[start:end]
+        next_token = page[-1] if end < len(names) else None
+        return page, next_token
+
+    def get_paginator(self, operation_name: str) -> LocalPaginator:
+        """
+        Get a paginator for ``list_vector_buckets``, ``list_indexes`` or
+        ``list_vectors``.
+        """
+        result_keys = {
+            "list_vector_buckets": "vectorBuckets",
+            "list_indexes": "indexes",
+            "list_vectors": "vectors",
+        }
+        if operation_name not in result_keys:
+            raise ValueError(f"operation {operation_name!r} cannot be paginated")
+        return LocalPaginator(
+            method=getattr(self, operation_name),
+            result_key=result_keys[operation_name],
+        )
+
+    # --------------------------------------------------------------------------
+    # Vector Bucket
+    # --------------------------------------------------------------------------
+    def create_vector_bucket(
+        self,
+        vectorBucketName: str,
+        encryptionConfiguration: dict[str, T.Any] | None = None,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            if vectorBucketName in self._buckets:
+                raise _client_error(
+                    "ConflictException",
+                    f"The vector bucket already exists: {vectorBucketName}",
+                    "CreateVectorBucket",
+                )
+            self._buckets[vectorBucketName] = _LocalBucket(
+                name=vectorBucketName,
+                arn=(
+                    f"arn:aws:s3vectors:{self.region_name}:{self.account_id}"
+                    f":bucket/{vectorBucketName}"
+                ),
+                creation_time=datetime.now(timezone.utc),
+                encryption_configuration=encryptionConfiguration,
+            )
+            return _response()
+
+    def get_vector_bucket(
+        self,
+        vectorBucketName: str | None = None,
+        vectorBucketArn: str | None = None,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            bucket = self._get_bucket(
+                "GetVectorBucket",
+                vectorBucketName=vectorBucketName,
+                vectorBucketArn=vectorBucketArn,
+            )
+            return _response(
+                vectorBucket={
+                    "vectorBucketName": bucket.name,
+                    "vectorBucketArn": bucket.arn,
+                    "creationTime": bucket.creation_time,
+                }
+            )
+
+    def list_vector_buckets(
+        self,
+        maxResults: int | None = None,
+        nextToken: str | None = None,
+        prefix: str | None = None,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            names, next_token = self._paginate_names(
+                self._buckets, maxResults, nextToken, prefix
+            )
+            response = _response(
+                vectorBuckets=[
+                    {
+                        "vectorBucketName": name,
+                        "vectorBucketArn": self._buckets[name].arn,
+                        "creationTime": self._buckets[name].creation_time,
+                    }
+                    for name in names
+                ]
+            )
+            if next_token is not None:
+                response["nextToken"] = next_token
+            return response
+
+    def delete_vector_bucket(
+        self,
+        vectorBucketName: str | None = None,
+        vectorBucketArn: str | None = None,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            bucket = self._get_bucket(
+                "DeleteVectorBucket",
+                vectorBucketName=vectorBucketName,
+                vectorBucketArn=vectorBucketArn,
+            )
+            if bucket.indexes:
+                raise _client_error(
+                    "ConflictException",
+                    f"The vector bucket is not empty: {bucket.name}",
+                    "DeleteVectorBucket",
+                )
+            del self._buckets[bucket.name]
+            return _response()
+
+    # --------------------------------------------------------------------------
+    # Index
+    # --------------------------------------------------------------------------
+    def create_index(
+        self,
+        dataType: str,
+        dimension: int,
+        distanceMetric: str,
+        indexName: str,
+        vectorBucketName: str | None = None,
+        vectorBucketArn: str | None = None,
+        metadataConfiguration: dict[str, T.Any] | None = None,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            bucket = self._get_bucket(
+                "CreateIndex",
+                vectorBucketName=vectorBucketName,
+                vectorBucketArn=vectorBucketArn,
+            )
+            if indexName in bucket.indexes:
+                raise _client_error(
+                    "ConflictException",
+                    f"The index already exists: {indexName}",
+                    "CreateIndex",
+                )
+            bucket.indexes[indexName] = _LocalIndex(
+                bucket_name=bucket.name,
+                index_name=indexName,
+                arn=f"{bucket.arn}/index/{indexName}",
+                data_type=dataType,
+                dimension=dimension,
+                distance_metric=distanceMetric,
+                creation_time=datetime.now(timezone.utc),
+                metadata_configuration=metadataConfiguration,
+            )
+            return _response()
+
+    def get_index(
+        self,
+        vectorBucketName: str | None = None,
+        indexName: str | None = None,
+        indexArn: str | None = None,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            index = self._get_index(
+                "GetIndex",
+                vectorBucketName=vectorBucketName,
+                indexName=indexName,
+                indexArn=indexArn,
+            )
+            dct = {
+                "vectorBucketName": index.bucket_name,
+                "indexName": index.index_name,
+                "indexArn": index.arn,
+                "creationTime": index.creation_time,
+                "dataType": index.data_type,
+                "dimension": index.dimension,
+                "distanceMetric": index.distance_metric,
+            }
+            if index.metadata_configuration is not None:
+                dct["metadataConfiguration"] = index.metadata_configuration
+            return _response(index=dct)
+
+    def list_indexes(
+        self,
+        vectorBucketName: str | None = None,
+        vectorBucketArn: str | None = None,
+        maxResults: int | None = None,
+        nextToken: str | None = None,
+        prefix: str | None = None,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            bucket = self._get_bucket(
+                "ListIndexes",
+                vectorBucketName=vectorBucketName,
+                vectorBucketArn=vectorBucketArn,
+            )
+            names, next_token = self._paginate_names(
+                bucket.indexes, maxResults, nextToken, prefix
+            )
+            response = _response(
+                indexes=[
+                    {
+                        "vectorBucketName": bucket.name,
+                        "indexName": name,
+                        "indexArn": bucket.indexes[name].arn,
+                        "creationTime": bucket.indexes[name].creation_time,
+                    }
+                    for name in names
+                ]
+            )
+            if next_token is not None:
+                response["nextToken"] = next_token
+            return response
+
+    def delete_index(
+        self,
+        vectorBucketName: str | None = None,
+        indexName: str | None = None,
+        indexArn: str | None = None,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            index = self._get_index(
+                "DeleteIndex",
+                vectorBucketName=vectorBucketName,
+                indexName=indexName,
+                indexArn=indexArn,
+            )
+            del self._buckets[index.bucket_name].indexes[index.index_name]
+            return _response()
+
+    # --------------------------------------------------------------------------
+    # Vectors
+    # --------------------------------------------------------------------------
+    def put_vectors(
+        self,
+        vectors: list[dict[str, T.Any]],
+        vectorBucketName: str | None = None,
+        indexName: str | None = None,
+        indexArn: str | None = None,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            index = self._get_index(
+                "PutVectors",
+                vectorBucketName=vectorBucketName,
+                indexName=indexName,
+                indexArn=indexArn,
+            )
+            if not (1 <= len(vectors) <= MAX_VECTORS_PER_PUT):
+                raise _client_error(
+                    "ValidationException",
+                    f"The number of vectors must be between 1 and "
+                    f"{MAX_VECTORS_PER_PUT}, got {len(vectors)}",
+                    "PutVectors",
+                )
+            # validate the whole request before writing anything
+            arrays = [
+                self._to_array(index, dct["data"], "PutVectors") for dct in vectors
+            ]
+            for dct, array in zip(vectors, arrays):
+                index.put(
+                    key=dct["key"],
+                    data=array,
+                    metadata=copy.deepcopy(dct.get("metadata", {})),
+                )
+            return _response()
+
+    def get_vectors(
+        self,
+        keys: list[str],
+        vectorBucketName: str | None = None,
+        indexName: str | None = None,
+        indexArn: str | None = None,
+        returnData: bool = False,
+        returnMetadata: bool = False,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            index = self._get_index(
+                "GetVectors",
+                vectorBucketName=vectorBucketName,
+                indexName=indexName,
+                indexArn=indexArn,
+            )
+            if len(keys) > MAX_KEYS_PER_GET:
+                raise _client_error(
+                    "ValidationException",
+                    f"At most {MAX_KEYS_PER_GET} keys can be requested, "
+                    f"got {len(keys)}",
+                    "GetVectors",
+                )
+            return _response(
+                vectors=[
+                    index.to_vector_dict(index.rows[key], returnData, returnMetadata)
+                    for key in keys
+                    if key in index.rows
+                ]
+            )
+
+    def query_vectors(
+        self,
+        topK: int,
+        queryVector: dict[str, T.Any],
+        vectorBucketName: str | None = None,
+        indexName: str | None = None,
+        indexArn: str | None = None,
+        filter: dict[str, T.Any] | None = None,
+        returnMetadata: bool = False,
+        returnDistance: bool = False,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            index = self._get_index(
+                "QueryVectors",
+                vectorBucketName=vectorBucketName,
+                indexName=indexName,
+                indexArn=indexArn,
+            )
+            query = self._to_array(index, queryVector, "QueryVectors")
+            distances = index.distances(query)
+            if filter is not None:
+                try:
+                    predicate = compile_filter(filter)
+                except ValueError as e:
+                    raise _client_error("ValidationException", str(e), "QueryVectors")
+                mask = np.fromiter(
+                    map(predicate, index.metadata),
+                    dtype=bool,
+                    count=index.n,
+                )
+                candidates = np.flatnonzero(mask)
+            else:
+                candidates = np.arange(index.n)
+            if topK < len(candidates):
+                top = np.argpartition(distances[candidates], topK)[:topK]
+                candidates = candidates[top]
+            rows = candidates[np.argsort(distances[candidates], kind="stable")]
+
+            vectors = []
+            for row in rows.tolist():
+                dct = index.to_vector_dict(row, False, returnMetadata)
+                if returnDistance:
+                    dct["distance"] = float(distances[row])
+                vectors.append(dct)
+            return _response(
+                vectors=vectors,
+                distanceMetric=index.distance_metric,
+            )
+
+    def list_vectors(
+        self,
+        vectorBucketName: str | None = None,
+        indexName: str | None = None,
+        indexArn: str | None = None,
+        maxResults: int | None = None,
+        nextToken: str | None = None,
+        segmentCount: int | None = None,
+        segmentIndex: int | None = None,
+        returnData: bool = False,
+        returnMetadata: bool = False,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            index = self._get_index(
+                "ListVectors",
+                vectorBucketName=vectorBucketName,
+                indexName=indexName,
+                indexArn=indexArn,
+            )
+            if (segmentCount is None) != (segmentIndex is None):
+                raise _client_error(
+                    "ValidationException",
+                    "segmentCount and segmentIndex must be used together",
+                    "ListVectors",
+                )
+            if segmentCount is not None and not (
+                1 <= segmentCount <= MAX_SEGMENT_COUNT
+                and 0 <= segmentIndex < segmentCount
+            ):
+                raise _client_error(
+                    "ValidationException",
+                    f"Invalid segment {segmentIndex} of {segmentCount}",
+                    "ListVectors",
+                )
+            max_results = maxResults or MAX_LIST_PAGE_SIZE
+
+            # the token is the last key of the previous page, so deleting the
+            # vectors of a page while listing does not skip any vector
+            sorted_keys = index.get_sorted_keys()
+            start = (
+                0 if nextToken is None else bisect.bisect_right(sorted_keys, nextToken)
+            )
+            vectors = []
+            next_token = None
+            for key in sorted_keys[start:]:
+                row = index.rows.get(key)
+                if row is None:
+                    continue
+                if (
+                    segmentCount is not None
+                    and get_segment_index(key, segmentCount) != segmentIndex
+                ):
+                    continue
+                if len(vectors) == max_results:
+                    next_token = vectors[-1]["key"]
+                    break
+                vectors.append(index.to_vector_dict(row, returnData, returnMetadata))
+
+            response = _response(vectors=vectors)
+            if next_token is not None:
+                response["nextToken"] = next_token
+            return response
+
+    def delete_vectors(
+        self,
+        keys: list[str],
+        vectorBucketName: str | None = None,
+        indexName: str | None = None,
+        indexArn: str | None = None,
+    ) -> dict[str, T.Any]:
+        with self._lock:
+            index = self._get_index(
+                "DeleteVectors",
+                vectorBucketName=vectorBucketName,
+                indexName=indexName,
+                indexArn=indexArn,
+            )
+            if not (1 <= len(keys) <= MAX_KEYS_PER_DELETE):
+                raise _client_error(
+                    "ValidationException",
+                    f"The number of keys must be between 1 and "
+                    f"{MAX_KEYS_PER_DELETE}, got {len(keys)}",
+                    "DeleteVectors",
+                )
+            for key in keys:
+                index.delete(key)
+            return _response()
@@ -18,27 +18,74 @@ data format conversions, and error handling.
 """
 
 import typing as T
+import functools
 import dataclasses
+from concurrent.futures import ThreadPoolExecutor
 
 import botocore.exceptions
 from func_args.api import OPT, remove_optional
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 from mypy_boto3_s3vectors.literals import DataTypeType, DistanceMetricType
 from boto3_dataclass_s3vectors import s3vectors_caster
 import boto3_dataclass_s3vectors.type_defs
 
+from .constants import (
+    MAX_VECTORS_PER_PUT,
+    MAX_PUT_PAYLOAD_BYTES,
+    MAX_KEYS_PER_DELETE,
+    MAX_KEYS_PER_GET,
+    MAX_LIST_PAGE_SIZE,
+    MAX_SEGMENT_COUNT,
+    DEFAULT_MAX_WORKERS,
+)
+from .vector import to_float_list
+from .bulk import BulkWriteResult, iter_put_batches, iter_batches, run_batches
+from .scan import iter_segment_pages
+from .cache import QueryCache, make_query_key
+from .metrics import MetricsRegistry
+from .ratelimit import AdaptiveRateLimiter
+from .predicate import to_filter_doc, compile_filter
+
 
 if T.TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
+
     from mypy_boto3_s3vectors import S3VectorsClient
     from mypy_boto3_s3vectors.type_defs import MetadataConfigurationTypeDef
+    from mypy_boto3_s3vectors.type_defs import PutInputVectorTypeDef
 
     from .vector import Vector
-    from .metadata import Expr, CompoundExpr
+    from .columnar import VectorBatch
+    from .catalog import HashCatalog
+    from .sync import SyncResult, DesiredItem
+    from .migrate import VectorTransform, BatchTransform
+    from .writer import BufferedWriter
+    from .pipeline import EmbedFunction, ToVectorFunction, IngestResult
+    from .predicate import FilterLike, Predicate
 
 # TypeVar for preserving Vector subclass types
 VectorT = T.TypeVar("VectorT", bound="Vector")
 
 
+def _missing_metadata_error(field_name: str) -> ValueError:
+    return ValueError(
+        f"Metadata field '{field_name}' is missing in the response,"
+        f"you may need to set 'return_metadata = True' in query_vectors(...) method"
+    )
+
+
+@functools.cache
+def _get_required_metadata_fields(vector_class: T.Type["Vector"]) -> tuple[str, ...]:
+    """
+    Get the names of the required metadata fields of a Vector class.
+    """
+    return tuple(
+        name
+        for name, field in vector_class.model_fields.items()
+        if field.is_required() and name not in ("key", "data", "distance")
+    )
+
+
 @dataclasses.dataclass(frozen=True)
 class VectorsOutputMixin:
     """
@@ -64,6 +111,8 @@ class VectorsOutputMixin:
     def as_vector_objects(
         self,
         vector_class: T.Type[VectorT],
+        trusted: bool = False,
+        check_metadata: bool = False,
     ) -> list[VectorT]:
         """
         Convert query results into Vector objects.
@@ -74,6 +123,14 @@ class VectorsOutputMixin:
         metadata fields.
 
         :param vector_class: The Vector class to use for creating vector objects
+        :param trusted: If True, the response is trusted to match ``vector_class``
+            (which is the case for a response coming straight from the service),
+            and the objects are created with ``model_construct`` without any
+            validation. This is several times faster, especially when the
+            vector data is returned.
+        :param check_metadata: Only used when ``trusted`` is True. If True,
+            check that all required metadata fields of ``vector_class`` are in
+            the response, and raise the same helpful error as the validated path.
 
         :returns: A list of Vector objects created from the query results.
             Returns an empty list if no vectors were found.
@@ -103,30 +160,125 @@ class VectorsOutputMixin:
         Reference:
             https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/query_vectors.html
         """
-        if self.boto3_raw_data.get("vectors", []):
-            vectors = []
-            for dct in self.boto3_raw_data.get("vectors", []):
-                try:
-                    vector = vector_class(
-                        key=dct["key"],
-                        data=dct.get("data", {}).get(self.data_type),
-                        **dct.get("metadata", {}),
-                        distance=dct.get("distance", None),
-                    )
-                    vectors.append(vector)
-                except ValidationError as e:
-                    for error in e.errors():
-                        if error["type"] == "missing":
-                            field_name = error["loc"][0]
-                            if field_name not in ("key", "data", "distance"):
-                                raise ValueError(
-                                    f"Metadata field '{field_name}' is missing in the response,"
-                                    f"you may need to set 'return_metadata = True' in query_vectors(...) method"
-                                )
-                    raise  # pragma: no cover
-            return vectors
-        else:
-            return []
+        return list(
+            self.iter_vector_objects(
+                vector_class=vector_class,
+                trusted=trusted,
+                check_metadata=check_metadata,
+            )
+        )
+
+    def iter_vector_objects(
+        self,
+        vector_class: T.Type[VectorT],
+        trusted: bool = False,
+        check_metadata: bool = False,
+    ) -> T.Iterator[VectorT]:
+        """
+        Same as :meth:`as_vector_objects`, but create the Vector objects lazily,
+        one at a time.
+
+        Example:
+            >>> for vector in output.iter_vector_objects(DocChunk):
+            ...     print(vector.key)
+        """
+        if trusted:
+            yield from self._construct_vector_objects(
+                vector_class=vector_class,
+                check_metadata=check_metadata,
+            )
+            return
+        data_type = self.data_type
+        for dct in self.boto3_raw_data.get("vectors", []):
+            try:
+                vector = vector_class(
+                    key=dct["key"],
+                    data=dct.get("data", {}).get(data_type),
+                    **dct.get("metadata", {}),
+                    distance=dct.get("distance", None),
+                )
+            except ValidationError as e:
+                for error in e.errors():
+                    if error["type"] == "missing":
+                        field_name = error["loc"][0]
+                        if field_name not in ("key", "data", "distance"):
+                            raise _missing_metadata_error(field_name)
+                raise  # pragma: no cover
+            yield vector
+
+    def _construct_vector_objects(
+        self,
+        vector_class: T.Type[VectorT],
+        check_metadata: bool = False,
+    ) -> T.Iterator[VectorT]:
+        """
+        The trusted fast path of :meth:`iter_vector_objects`.
+        """
+        data_type = self.data_type
+        construct = vector_class.model_construct
+        if check_metadata:
+            required = _get_required_metadata_fields(vector_class)
+        for dct in self.boto3_raw_data.get("vectors", []):
+            metadata = dct.get("metadata", {})
+            if check_metadata:
+                for field_name in required:
+                    if field_name not in metadata:
+                        raise _missing_metadata_error(field_name)
+            data = dct.get("data")
+            yield construct(
+                key=dct["key"],
+                data=None if data is None else data.get(data_type),
+                distance=dct.get("distance"),
+                **metadata,
+            )
+
+    def filter_vectors(
+        self,
+        filter: T.Union["FilterLike", "Predicate"],
+    ):
+        """
+        Return a copy of this output that only keeps the vectors whose metadata
+        matches the filter, evaluated locally (see :mod:`s3vectorm.predicate`).
+        The output must contain the metadata (``return_metadata=True``).
+
+        :param filter: A filter expression, a filter document, or a predicate
+            compiled by :func:`~s3vectorm.predicate.compile_filter`
+
+        Example:
+            >>> page = page.filter_vectors(DocMeta.status.eq("archived"))
+        """
+        predicate = filter if callable(filter) else compile_filter(filter)
+        vectors = [
+            dct
+            for dct in self.boto3_raw_data.get("vectors", [])
+            if predicate(dct.get("metadata", {}))
+        ]
+        return dataclasses.replace(
+            self,
+            boto3_raw_data={**self.boto3_raw_data, "vectors": vectors},
+        )
+
+    def as_vector_batch(self) -> "VectorBatch":
+        """
+        Convert the results into a columnar :class:`~s3vectorm.columnar.VectorBatch`
+        (keys array, ``(n, dimension)`` float32 matrix, distances array and one
+        array per metadata key), so post-processing can use vectorized NumPy
+        operations instead of Python loops over vector objects.
+
+        .. note::
+
+            This method requires ``numpy``.
+
+        Example:
+            >>> batch = output.as_vector_batch()
+            >>> batch.keys[np.argsort(batch.distances)]
+        """
+        from .columnar import VectorBatch
+
+        return VectorBatch.from_raw_vectors(
+            self.boto3_raw_data.get("vectors", []),
+            data_type=self.data_type,
+        )
 
 
 @dataclasses.dataclass(frozen=True)
@@ -157,194 +309,50 @@ class ListVectorsOutput(
     """
 
 
-class Index(BaseModel):
+@dataclasses.dataclass(frozen=True)
+class GetVectorsOutput(
+    boto3_dataclass_s3vectors.type_defs.GetVectorsOutput,
+    VectorsOutputMixin,
+):
     """
-    Represents a vector index in AWS S3 Vectors service.
+    Get vectors operation output.
 
-    This class provides a Pythonic interface for managing vector indexes,
-    including creation, vector storage, and similarity search operations.
-    It handles the complexities of AWS API interactions and data format
-    conversions.
+    .. seealso::
+
+        :class:`VectorsOutputMixin`
+    """
+
+
+class BaseIndex(BaseModel):
+    """
+    Base class of :class:`Index` and :class:`~s3vectorm.aio.AsyncIndex`.
+
+    It holds the index configuration and builds the request arguments of the
+    AWS S3 Vectors API calls, so the synchronous and asynchronous
+    implementations share the exact same request building logic.
 
     :param bucket_name: Name of the S3 vector bucket containing the index
     :param index_name: Unique name for the vector index
     :param data_type: Data type for vector embeddings (e.g., "float32")
     :param dimension: Dimensionality of the vectors (e.g., 768 for many LLM embeddings)
     :param distance_metric: Distance metric for similarity calculations (e.g., "cosine", "euclidean")
-
-    Example:
-        >>> index = Index(
-        ...     bucket_name="my-vectors",
-        ...     index_name="documents",
-        ...     data_type="float32",
-        ...     dimension=768,
-        ...     distance_metric="cosine"
-        ... )
-        >>> # Create the index
-        >>> result = index.create(s3_vectors_client)
-        >>> # Store vectors
-        >>> vectors = [Vector(key="doc1", data=[0.1, 0.2, 0.3])]
-        >>> index.put_vectors(s3_vectors_client, vectors)
-        >>> # Query similar vectors
-        >>> results = index.query_vectors(s3_vectors_client, [0.1, 0.2, 0.3])
+    :param query_cache: Optional :class:`~s3vectorm.cache.QueryCache` that
+        serves repeated ``query_vectors`` calls from memory. It is not part of
+        the serialized index.
+    :param metrics: Optional :class:`~s3vectorm.metrics.MetricsRegistry` that
+        records the latency, payload size and retries of every API call made
+        through this index. It is not part of the serialized index.
     """
 
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     bucket_name: str = Field()
     index_name: str = Field()
     data_type: "DataTypeType" = Field()
     dimension: int = Field()
     distance_metric: "DistanceMetricType" = Field()
-
-    def create(
-        self,
-        s3_vectors_client: "S3VectorsClient",
-        vector_bucket_arn: str = OPT,
-        metadata_configuration: "MetadataConfigurationTypeDef" = OPT,
-    ) -> dict[str, T.Any] | None:
-        """
-        Create the vector index in AWS S3 Vectors service.
-
-        This method creates a new vector index with the specified configuration.
-        It handles the common case where an index with the same name already
-        exists by returning None instead of raising an exception.
-
-        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
-        :param vector_bucket_arn: Optional ARN of the vector bucket. If provided,
-            takes precedence over bucket_name
-        :param metadata_configuration: Optional configuration for metadata fields
-                that can be used for filtering
-
-        :returns: A dictionary containing the AWS response if the index was created
-            successfully, or None if the index already exists.
-
-        Raises:
-            botocore.exceptions.ClientError: For AWS errors other than index
-                name conflicts (e.g., permission errors, invalid parameters).
-
-        Example:
-            >>> index = Index(
-            ...     bucket_name="my-bucket",
-            ...     index_name="documents",
-            ...     data_type="float32",
-            ...     dimension=768,
-            ...     distance_metric="cosine"
-            ... )
-            >>> result = index.create(s3_vectors_client)
-            >>> if result:
-            ...     print("Index created successfully")
-            ... else:
-            ...     print("Index already exists")
-
-        Reference:
-            https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/create_index.html
-        """
-        try:
-            kwargs = {
-                "vectorBucketName": self.bucket_name,
-                "vectorBucketArn": vector_bucket_arn,
-                "metadataConfiguration": metadata_configuration,
-            }
-            kwargs = remove_optional(**kwargs)
-            if "vectorBucketArn" in kwargs:
-                kwargs.pop("vectorBucketName")
-            return s3_vectors_client.create_index(
-                indexName=self.index_name,
-                dataType=self.data_type,
-                dimension=self.dimension,
-                distanceMetric=self.distance_metric,
-                **kwargs,
-            )
-
-        except botocore.exceptions.ClientError as e:
-            if e.response["Error"]["Code"] == "ConflictException":
-                return None
-            raise
-
-    def delete(
-        self,
-        s3_vectors_client: "S3VectorsClient",
-        index_arn: str = OPT,
-    ):
-        """
-        Delete the vector index.
-
-        .. note::
-
-            Delete index will also delete all vectors in the index. You don't
-            need to delete vectors one by one before deleting the index.
-
-        Reference:
-            https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/delete_index.html
-        """
-        kwargs = {
-            "indexName": self.index_name,
-            "indexArn": index_arn,
-        }
-        kwargs = remove_optional(**kwargs)
-        if "indexArn" in kwargs:
-            kwargs.pop("indexName")
-        s3_vectors_client.delete_index(
-            vectorBucketName=self.bucket_name,
-            **kwargs,
-        )
-
-    @classmethod
-    def get(
-        cls,
-        s3_vectors_client: "S3VectorsClient",
-        vector_bucket_name: str,
-        index_name: str = OPT,
-        index_arn: str = OPT,
-    ):
-        """
-        Retrieve an existing vector index from AWS S3 Vectors service.
-
-        This method fetches the index configuration and metadata from AWS,
-        allowing you to reconstruct an `Index` object for further operations.
-        You can specify either the index name or the index ARN to identify
-        the index.
-
-        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
-        :param vector_bucket_name: Name of the S3 vector bucket containing the index
-        :param index_name: Optional name of the vector index to retrieve
-        :param index_arn: Optional ARN of the vector index to retrieve
-
-        :returns: An `Index` object representing the retrieved index
-
-        :raises botocore.exceptions.ClientError: If the index does not exist or AWS returns an error
-
-        Example:
-            >>> index = Index.get(
-            ...     s3_vectors_client,
-            ...     vector_bucket_name="my-vectors",
-            ...     index_name="documents"
-            ... )
-            >>> print(index.dimension)  # Prints the index dimension
-
-        Reference:
-            https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/get_index.html
-        """
-        try:
-            res = s3_vectors_client.get_index(
-                **remove_optional(
-                    vectorBucketName=vector_bucket_name,
-                    indexName=index_name,
-                    indexArn=index_arn,
-                )
-            )
-            res = s3vectors_caster.get_index(res)
-        except botocore.exceptions.ClientError as e:
-            if e.response["Error"]["Code"] == "NotFoundException":
-                return None
-            raise
-
-        return cls(
-            bucket_name=vector_bucket_name,
-            index_name=res.index.indexName,
-            data_type=res.index.dataType,
-            dimension=res.index.dimension,
-            distance_metric=res.index.distanceMetric,
-        )
+    query_cache: T.Optional[QueryCache] = Field(default=None, exclude=True, repr=False)
+    metrics: T.Optional[MetricsRegistry] = Field(default=None, exclude=True, repr=False)
 
     @classmethod
     def new_for_delete(
@@ -394,63 +402,1036 @@ class Index(BaseModel):
             for index_summary in indexes
         ]
 
-    def put_vectors(
+    def _get_create_kwargs(
         self,
-        s3_vectors_client: "S3VectorsClient",
-        vectors: list["Vector"],
-    ):
-        """
-        Store vectors in the index.
-
-        This method uploads a list of vectors to the S3 Vectors index,
-        automatically converting each vector to the appropriate format
-        required by the AWS API.
-
-        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
-        :param vectors: List of Vector objects to store in the index
-
-        Example:
-            >>> vectors = [
-            ...     Vector(key="doc1", data=[0.1, 0.2, 0.3], category="documents"),
-            ...     Vector(key="doc2", data=[0.4, 0.5, 0.6], category="documents")
-            ... ]
-            >>> index.put_vectors(s3_vectors_client, vectors)
-
-        Reference:
-            https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/put_vectors.html
-        """
-        s3_vectors_client.put_vectors(
-            vectorBucketName=self.bucket_name,
+        vector_bucket_arn: str = OPT,
+        metadata_configuration: "MetadataConfigurationTypeDef" = OPT,
+    ) -> dict[str, T.Any]:
+        kwargs = {
+            "vectorBucketName": self.bucket_name,
+            "vectorBucketArn": vector_bucket_arn,
+            "metadataConfiguration": metadata_configuration,
+        }
+        kwargs = remove_optional(**kwargs)
+        if "vectorBucketArn" in kwargs:
+            kwargs.pop("vectorBucketName")
+        return dict(
             indexName=self.index_name,
-            vectors=[
-                vector.to_put_vectors_dict(data_type=self.data_type)
-                for vector in vectors
-            ],
+            dataType=self.data_type,
+            dimension=self.dimension,
+            distanceMetric=self.distance_metric,
+            **kwargs,
         )
 
-    def query_vectors(
+    def _get_delete_kwargs(
         self,
-        s3_vectors_client: "S3VectorsClient",
-        data: list[float],
-        top_k: int = 10,
-        filter: T.Optional[T.Union["Expr", "CompoundExpr"]] = None,
-        return_metadata: bool = False,
-        return_distance: bool = False,
-    ) -> "QueryVectorsOutput":
-        """
-        Query the index for vectors similar to the provided query vector.
-
+        index_arn: str = OPT,
+    ) -> dict[str, T.Any]:
+        kwargs = {
+            "indexName": self.index_name,
+            "indexArn": index_arn,
+        }
+        kwargs = remove_optional(**kwargs)
+        if "indexArn" in kwargs:
+            kwargs.pop("indexName")
+        return dict(
+            vectorBucketName=self.bucket_name,
+            **kwargs,
+        )
+
+    @classmethod
+    def _get_get_index_kwargs(
+        cls,
+        vector_bucket_name: str,
+        index_name: str = OPT,
+        index_arn: str = OPT,
+    ) -> dict[str, T.Any]:
+        return remove_optional(
+            vectorBucketName=vector_bucket_name,
+            indexName=index_name,
+            indexArn=index_arn,
+        )
+
+    @classmethod
+    def _from_get_index_response(
+        cls,
+        vector_bucket_name: str,
+        response: dict[str, T.Any],
+        metrics: T.Optional[MetricsRegistry] = None,
+    ):
+        res = s3vectors_caster.get_index(response)
+        return cls(
+            bucket_name=vector_bucket_name,
+            index_name=res.index.indexName,
+            data_type=res.index.dataType,
+            dimension=res.index.dimension,
+            distance_metric=res.index.distanceMetric,
+            metrics=metrics,
+        )
+
+    def _get_put_vectors_kwargs(
+        self,
+        dcts: list["PutInputVectorTypeDef"],
+    ) -> dict[str, T.Any]:
+        return dict(
+            vectorBucketName=self.bucket_name,
+            indexName=self.index_name,
+            vectors=dcts,
+        )
+
+    def _get_query_vectors_kwargs(
+        self,
+        data: list[float],
+        top_k: int = 10,
+        filter: T.Optional["FilterLike"] = None,
+        return_metadata: bool = False,
+        return_distance: bool = False,
+    ) -> dict[str, T.Any]:
+        if filter is None:
+            kwargs = {}
+        else:
+            kwargs = {"filter": to_filter_doc(filter)}
+        return dict(
+            vectorBucketName=self.bucket_name,
+            indexName=self.index_name,
+            topK=top_k,
+            queryVector={
+                self.data_type: to_float_list(data),
+            },
+            returnMetadata=return_metadata,
+            returnDistance=return_distance,
+            **kwargs,
+        )
+
+    def _get_query_cache_namespace(self, s3_vectors_client) -> str:
+        """
+        Get the namespace of this index in :attr:`query_cache`.
+
+        The namespace includes the region and endpoint of the client, so
+        same-named indexes in different regions can share a cache.
+        """
+        meta = getattr(s3_vectors_client, "meta", None)
+        region_name = getattr(meta, "region_name", None)
+        endpoint_url = getattr(meta, "endpoint_url", None)
+        return f"{region_name}|{endpoint_url}|{self.bucket_name}/{self.index_name}"
+
+    def _get_query_cache_key(
+        self,
+        data: list[float],
+        top_k: int = 10,
+        filter: T.Optional["FilterLike"] = None,
+        return_metadata: bool = False,
+        return_distance: bool = False,
+    ) -> tuple:
+        return make_query_key(
+            data=data,
+            top_k=top_k,
+            filter_doc=None if filter is None else to_filter_doc(filter),
+            return_metadata=return_metadata,
+            return_distance=return_distance,
+        )
+
+    def _invalidate_query_cache(self, s3_vectors_client):
+        if self.query_cache is not None:
+            self.query_cache.invalidate(
+                self._get_query_cache_namespace(s3_vectors_client)
+            )
+
+    def _call(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        operation: str,
+        kwargs: dict[str, T.Any],
+    ) -> dict[str, T.Any]:
+        """
+        Call an API operation, recording the call if metrics are enabled.
+        """
+        method = getattr(s3_vectors_client, operation)
+        if self.metrics is None:
+            return method(**kwargs)
+        return self.metrics.call(operation, method, kwargs)
+
+    @staticmethod
+    def _expand_filters(
+        n: int,
+        filter: T.Optional[
+            T.Union[
+                "FilterLike",
+                T.Sequence[T.Optional["FilterLike"]],
+            ]
+        ] = None,
+    ) -> list[T.Optional["FilterLike"]]:
+        """
+        Turn the ``filter`` argument of ``query_vectors_many`` into one filter per query.
+        """
+        if isinstance(filter, (list, tuple)):
+            if len(filter) != n:
+                raise ValueError(
+                    f"got {n} query vectors but {len(filter)} filters, "
+                    f"they must have the same length"
+                )
+            return list(filter)
+        return [filter] * n
+
+    def _get_list_vectors_kwargs(
+        self,
+        index_arn: str = OPT,
+        segment_count: int = OPT,
+        segment_index: int = OPT,
+        return_data: bool = OPT,
+        return_metadata: bool = OPT,
+        page_size: int = 100,
+        max_items: int | None = 9999,
+        starting_token: str = OPT,
+    ) -> dict[str, T.Any]:
+        pagination_config = {
+            "MaxItems": max_items,
+            "PageSize": page_size,
+        }
+        if starting_token is not OPT:
+            pagination_config["StartingToken"] = starting_token
+        kwargs = {
+            "vectorBucketName": self.bucket_name,
+            "indexName": self.index_name,
+            "indexArn": index_arn,
+            "segmentCount": segment_count,
+            "segmentIndex": segment_index,
+            "returnData": return_data,
+            "returnMetadata": return_metadata,
+            "PaginationConfig": pagination_config,
+        }
+        kwargs = remove_optional(**kwargs)
+        if "indexArn" in kwargs:
+            kwargs.pop("indexName")
+        return kwargs
+
+    def _get_get_vectors_kwargs(
+        self,
+        keys: list[str],
+        return_data: bool = OPT,
+        return_metadata: bool = OPT,
+        index_arn: str = OPT,
+    ) -> dict[str, T.Any]:
+        kwargs = {
+            "indexName": self.index_name,
+            "indexArn": index_arn,
+            "returnData": return_data,
+            "returnMetadata": return_metadata,
+        }
+        kwargs = remove_optional(**kwargs)
+        if "indexArn" in kwargs:
+            kwargs.pop("indexName")
+        return dict(
+            vectorBucketName=self.bucket_name,
+            keys=keys,
+            **kwargs,
+        )
+
+    def _get_delete_vectors_kwargs(
+        self,
+        keys: list[str],
+        index_arn: str = OPT,
+    ) -> dict[str, T.Any]:
+        kwargs = {
+            "indexName": self.index_name,
+            "indexArn": index_arn,
+        }
+        kwargs = remove_optional(**kwargs)
+        if "indexArn" in kwargs:
+            kwargs.pop("indexName")
+        return dict(
+            vectorBucketName=self.bucket_name,
+            keys=keys,
+            **kwargs,
+        )
+
+
+class Index(BaseIndex):
+    """
+    Represents a vector index in AWS S3 Vectors service.
+
+    This class provides a Pythonic interface for managing vector indexes,
+    including creation, vector storage, and similarity search operations.
+    It handles the complexities of AWS API interactions and data format
+    conversions.
+
+    :param bucket_name: Name of the S3 vector bucket containing the index
+    :param index_name: Unique name for the vector index
+    :param data_type: Data type for vector embeddings (e.g., "float32")
+    :param dimension: Dimensionality of the vectors (e.g., 768 for many LLM embeddings)
+    :param distance_metric: Distance metric for similarity calculations (e.g., "cosine", "euclidean")
+    :param rate_limiter: Optional :class:`~s3vectorm.ratelimit.AdaptiveRateLimiter`
+        that paces the ``put_vectors`` and ``delete_vectors`` calls (including
+        the bulk methods) and retries throttled calls with backoff. Share one
+        limiter between the indexes written concurrently. It is not part of
+        the serialized index.
+
+    Example:
+        >>> index = Index(
+        ...     bucket_name="my-vectors",
+        ...     index_name="documents",
+        ...     data_type="float32",
+        ...     dimension=768,
+        ...     distance_metric="cosine"
+        ... )
+        >>> # Create the index
+        >>> result = index.create(s3_vectors_client)
+        >>> # Store vectors
+        >>> vectors = [Vector(key="doc1", data=[0.1, 0.2, 0.3])]
+        >>> index.put_vectors(s3_vectors_client, vectors)
+        >>> # Query similar vectors
+        >>> results = index.query_vectors(s3_vectors_client, [0.1, 0.2, 0.3])
+    """
+
+    rate_limiter: T.Optional[AdaptiveRateLimiter] = Field(
+        default=None, exclude=True, repr=False
+    )
+
+    def _write(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        operation: str,
+        kwargs: dict[str, T.Any],
+    ) -> dict[str, T.Any]:
+        """
+        Call a write API operation, through the rate limiter if there is one.
+        """
+        if self.rate_limiter is None:
+            return self._call(s3_vectors_client, operation, kwargs)
+        return self.rate_limiter.call(self._call, s3_vectors_client, operation, kwargs)
+
+    def create(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        vector_bucket_arn: str = OPT,
+        metadata_configuration: "MetadataConfigurationTypeDef" = OPT,
+    ) -> dict[str, T.Any] | None:
+        """
+        Create the vector index in AWS S3 Vectors service.
+
+        This method creates a new vector index with the specified configuration.
+        It handles the common case where an index with the same name already
+        exists by returning None instead of raising an exception.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param vector_bucket_arn: Optional ARN of the vector bucket. If provided,
+            takes precedence over bucket_name
+        :param metadata_configuration: Optional configuration for metadata fields
+                that can be used for filtering
+
+        :returns: A dictionary containing the AWS response if the index was created
+            successfully, or None if the index already exists.
+
+        Raises:
+            botocore.exceptions.ClientError: For AWS errors other than index
+                name conflicts (e.g., permission errors, invalid parameters).
+
+        Example:
+            >>> index = Index(
+            ...     bucket_name="my-bucket",
+            ...     index_name="documents",
+            ...     data_type="float32",
+            ...     dimension=768,
+            ...     distance_metric="cosine"
+            ... )
+            >>> result = index.create(s3_vectors_client)
+            >>> if result:
+            ...     print("Index created successfully")
+            ... else:
+            ...     print("Index already exists")
+
+        Reference:
+            https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/create_index.html
+        """
+        try:
+            return self._call(
+                s3_vectors_client,
+                "create_index",
+                self._get_create_kwargs(
+                    vector_bucket_arn=vector_bucket_arn,
+                    metadata_configuration=metadata_configuration,
+                ),
+            )
+        except botocore.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] == "ConflictException":
+                return None
+            raise
+
+    def delete(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        index_arn: str = OPT,
+    ):
+        """
+        Delete the vector index.
+
+        .. note::
+
+            Delete index will also delete all vectors in the index. You don't
+            need to delete vectors one by one before deleting the index.
+
+        Reference:
+            https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/delete_index.html
+        """
+        self._call(
+            s3_vectors_client,
+            "delete_index",
+            self._get_delete_kwargs(index_arn=index_arn),
+        )
+
+    @classmethod
+    def get(
+        cls,
+        s3_vectors_client: "S3VectorsClient",
+        vector_bucket_name: str,
+        index_name: str = OPT,
+        index_arn: str = OPT,
+        metrics: T.Optional[MetricsRegistry] = None,
+    ):
+        """
+        Retrieve an existing vector index from AWS S3 Vectors service.
+
+        This method fetches the index configuration and metadata from AWS,
+        allowing you to reconstruct an `Index` object for further operations.
+        You can specify either the index name or the index ARN to identify
+        the index.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param vector_bucket_name: Name of the S3 vector bucket containing the index
+        :param index_name: Optional name of the vector index to retrieve
+        :param index_arn: Optional ARN of the vector index to retrieve
+        :param metrics: Optional :class:`~s3vectorm.metrics.MetricsRegistry`
+            that records the ``get_index`` call, it is attached to the
+            returned index
+
+        :returns: An `Index` object representing the retrieved index
+
+        :raises botocore.exceptions.ClientError: If the index does not exist or AWS returns an error
+
+        Example:
+            >>> index = Index.get(
+            ...     s3_vectors_client,
+            ...     vector_bucket_name="my-vectors",
+            ...     index_name="documents"
+            ... )
+            >>> print(index.dimension)  # Prints the index dimension
+
+        Reference:
+            https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/get_index.html
+        """
+        kwargs = cls._get_get_index_kwargs(
+            vector_bucket_name=vector_bucket_name,
+            index_name=index_name,
+            index_arn=index_arn,
+        )
+        try:
+            if metrics is None:
+                res = s3_vectors_client.get_index(**kwargs)
+            else:
+                res = metrics.call("get_index", s3_vectors_client.get_index, kwargs)
+        except botocore.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] == "NotFoundException":
+                return None
+            raise
+
+        return cls._from_get_index_response(
+            vector_bucket_name=vector_bucket_name,
+            response=res,
+            metrics=metrics,
+        )
+
+    def put_vectors(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        vectors: list["Vector"],
+    ):
+        """
+        Store vectors in the index.
+
+        This method uploads a list of vectors to the S3 Vectors index,
+        automatically converting each vector to the appropriate format
+        required by the AWS API.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param vectors: List of Vector objects to store in the index
+
+        Example:
+            >>> vectors = [
+            ...     Vector(key="doc1", data=[0.1, 0.2, 0.3], category="documents"),
+            ...     Vector(key="doc2", data=[0.4, 0.5, 0.6], category="documents")
+            ... ]
+            >>> index.put_vectors(s3_vectors_client, vectors)
+
+        Reference:
+            https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/put_vectors.html
+        """
+        self._put_vector_dicts(
+            s3_vectors_client=s3_vectors_client,
+            dcts=[
+                vector.to_put_vectors_dict(data_type=self.data_type)
+                for vector in vectors
+            ],
+        )
+
+    def _put_vector_dicts(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        dcts: list["PutInputVectorTypeDef"],
+    ):
+        """
+        Send vectors that are already in the ``put_vectors`` format in one API call.
+        """
+        try:
+            self._write(
+                s3_vectors_client,
+                "put_vectors",
+                self._get_put_vectors_kwargs(dcts),
+            )
+        finally:
+            self._invalidate_query_cache(s3_vectors_client)
+
+    def put_vectors_bulk(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        vectors: T.Iterable["Vector"],
+        batch_size: int = MAX_VECTORS_PER_PUT,
+        max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> BulkWriteResult:
+        """
+        Store any number of vectors in the index using concurrent batched calls.
+
+        Unlike :meth:`put_vectors`, which sends the given list in a single API
+        call, this method accepts any iterable (e.g. a generator over millions
+        of vectors), splits it into batches that fit the service's per-call
+        limits on vector count and payload size, and sends the batches through
+        a bounded thread pool. The input is consumed lazily, so memory usage
+        stays flat regardless of the total number of vectors.
+
+        A failed batch does not stop the operation, it is recorded in the
+        returned summary instead.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation.
+            botocore clients are thread safe, the same client is shared by all workers.
+        :param vectors: Iterable of Vector objects to store in the index
+        :param batch_size: Maximum number of vectors per API call (default: 500)
+        :param max_payload_bytes: Maximum estimated payload size per API call
+            (default: 20 MiB)
+        :param max_workers: Number of concurrent API calls (default: 8)
+
+        :returns: A :class:`~s3vectorm.bulk.BulkWriteResult` with the number of
+            batches, succeeded and failed vectors, and the failed batches.
+
+        Example:
+            >>> result = index.put_vectors_bulk(
+            ...     s3_vectors_client,
+            ...     (Vector(key=f"doc-{i}", data=embed(i)) for i in range(1_000_000)),
+            ...     max_workers=16,
+            ... )
+            >>> print(f"{result.n_succeeded} succeeded, {result.n_failed} failed")
+
+        Reference:
+            https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/put_vectors.html
+        """
+        dcts = (
+            vector.to_put_vectors_dict(data_type=self.data_type) for vector in vectors
+        )
+        return run_batches(
+            batches=iter_put_batches(
+                dcts,
+                max_vectors=batch_size,
+                max_payload_bytes=max_payload_bytes,
+            ),
+            func=lambda batch: self._put_vector_dicts(
+                s3_vectors_client=s3_vectors_client,
+                dcts=batch,
+            ),
+            get_key=lambda dct: dct["key"],
+            max_workers=max_workers,
+        )
+
+    def upsert_vectors(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        vectors: T.Iterable["Vector"],
+        catalog: T.Optional["HashCatalog"] = None,
+        hash_key: str | None = None,
+        batch_size: int = MAX_VECTORS_PER_PUT,
+        max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> BulkWriteResult:
+        """
+        Store the vectors whose content changed, skip the others.
+
+        The :meth:`~s3vectorm.vector.Vector.content_hash` of each vector (data
+        plus metadata) is compared with the hash of what was last written:
+
+        - with a ``catalog``, the hashes are looked up in the local
+          :class:`~s3vectorm.catalog.HashCatalog`, no read request is made.
+          The catalog is updated after each successful batch.
+        - with a ``hash_key`` only, the hashes are read from that metadata
+          field of the stored vectors with ``get_vectors`` calls (one per
+          100 vectors, much smaller than the writes they save).
+
+        With a ``hash_key``, the hash of every written vector is stored in
+        that metadata field. Declare it as a non-filterable metadata key of
+        the index, it is never used in queries.
+
+        The changed vectors are sent like :meth:`put_vectors_bulk` does.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param vectors: Iterable of Vector objects to upsert
+        :param catalog: Optional local catalog of the hashes of the stored vectors
+        :param hash_key: Optional metadata field that stores the hash in the index
+        :param batch_size: Maximum number of vectors per API call (default: 500)
+        :param max_payload_bytes: Maximum estimated payload size per API call
+            (default: 20 MiB)
+        :param max_workers: Number of concurrent API calls (default: 8)
+
+        :returns: A :class:`~s3vectorm.bulk.BulkWriteResult`, ``n_skipped`` is
+            the number of unchanged vectors
+
+        Example:
+            >>> with HashCatalog("documents.hashes.sqlite") as catalog:
+            ...     result = index.upsert_vectors(
+            ...         s3_vectors_client,
+            ...         iter_document_chunks(),
+            ...         catalog=catalog,
+            ...     )
+            >>> print(f"{result.n_succeeded} written, {result.n_skipped} unchanged")
+        """
+        if catalog is None and hash_key is None:
+            raise ValueError("upsert_vectors requires a catalog or a hash_key")
+        exclude = () if hash_key is None else (hash_key,)
+        sent_hashes: dict[str, str] = {}
+        n_skipped = 0
+
+        def iter_changed() -> T.Iterator["PutInputVectorTypeDef"]:
+            nonlocal n_skipped
+            for chunk in iter_batches(vectors, MAX_KEYS_PER_GET):
+                pairs = [
+                    (vector, vector.content_hash(exclude=exclude)) for vector in chunk
+                ]
+                keys = list(dict.fromkeys(vector.key for vector in chunk))
+                if catalog is not None:
+                    stored_hashes = catalog.get_many(keys)
+                else:
+                    res = self.get_vectors(
+                        s3_vectors_client=s3_vectors_client,
+                        keys=keys,
+                        return_metadata=True,
+                    )
+                    stored_hashes = {
+                        dct["key"]: dct.get("metadata", {}).get(hash_key)
+                        for dct in res.boto3_raw_data.get("vectors", [])
+                    }
+                for vector, content_hash in pairs:
+                    if stored_hashes.get(vector.key) == content_hash:
+                        n_skipped += 1
+                        continue
+                    dct = vector.to_put_vectors_dict(data_type=self.data_type)
+                    if hash_key is not None:
+                        dct["metadata"][hash_key] = content_hash
+                    sent_hashes[vector.key] = content_hash
+                    yield dct
+
+        def on_batch_done(batch: list["PutInputVectorTypeDef"], error):
+            items = [
+                (dct["key"], sent_hashes.pop(dct["key"]))
+                for dct in batch
+                if dct["key"] in sent_hashes
+            ]
+            if catalog is not None and error is None:
+                catalog.set_many(items)
+
+        result = run_batches(
+            batches=iter_put_batches(
+                iter_changed(),
+                max_vectors=batch_size,
+                max_payload_bytes=max_payload_bytes,
+            ),
+            func=lambda batch: self._put_vector_dicts(
+                s3_vectors_client=s3_vectors_client,
+                dcts=batch,
+            ),
+            get_key=lambda dct: dct["key"],
+            max_workers=max_workers,
+            on_batch_done=on_batch_done,
+        )
+        result.n_skipped = n_skipped
+        return result
+
+    def sync_vectors(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        desired: T.Iterable["DesiredItem"],
+        hash_key: str | None = None,
+        catalog: T.Optional["HashCatalog"] = None,
+        load_vectors: T.Optional[T.Callable[[list[str]], T.Iterable["Vector"]]] = None,
+        delete_stale: bool = True,
+        dry_run: bool = False,
+        batch_size: int = MAX_VECTORS_PER_PUT,
+        max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        segment_count: int = MAX_SEGMENT_COUNT,
+    ) -> "SyncResult":
+        """
+        Make the index match a source of truth, sending only the differences.
+
+        The keys of the index are listed first (see :mod:`s3vectorm.sync`),
+        then the desired items are streamed: the new and changed vectors are
+        put with concurrent batched calls, and at the end the vectors of the
+        index that are not desired are deleted.
+
+        A vector is changed if its hash differs from the stored hash, which is
+        read from the ``hash_key`` metadata field, or else from the
+        ``catalog``. Without either, every desired vector that already exists
+        is considered changed and is sent again.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param desired: The complete set of vectors the index should contain,
+            as Vector objects, whose hash is
+            :meth:`~s3vectorm.vector.Vector.content_hash`, or as ``(key, hash)``
+            pairs (e.g. the primary key and a row version), whose vectors are
+            loaded with ``load_vectors`` only if they need to be sent. A key
+            must appear only once, a duplicate raises a ``ValueError``
+        :param hash_key: Optional metadata field that stores the hash in the
+            index, it is written with every put vector
+        :param catalog: Optional :class:`~s3vectorm.catalog.HashCatalog`, it is
+            updated after every successful put and delete batch
+        :param load_vectors: Function that takes a list of keys and returns
+            their Vector objects, required if ``desired`` has ``(key, hash)`` pairs
+        :param delete_stale: Whether to delete the vectors that are not desired
+        :param dry_run: If True, only compute what would change, the keys are
+            reported in the result and nothing is written
+        :param batch_size: Maximum number of vectors per put call (default: 500)
+        :param max_payload_bytes: Maximum estimated payload size per put call
+            (default: 20 MiB)
+        :param max_workers: Number of concurrent put / delete calls (default: 8)
+        :param segment_count: Number of segments to list in parallel (1 - 16, default: 16)
+
+        :returns: A :class:`~s3vectorm.sync.SyncResult`
+
+        Example:
+            >>> plan = index.sync_vectors(
+            ...     s3_vectors_client,
+            ...     desired=((row.chunk_id, row.version) for row in rows),
+            ...     hash_key="version",
+            ...     load_vectors=load_chunks_by_id,
+            ...     dry_run=True,
+            ... )
+            >>> print(plan.added_keys, plan.changed_keys, plan.stale_keys)
+        """
+        from .sync import sync_vectors
+
+        return sync_vectors(
+            index=self,
+            s3_vectors_client=s3_vectors_client,
+            desired=desired,
+            hash_key=hash_key,
+            catalog=catalog,
+            load_vectors=load_vectors,
+            delete_stale=delete_stale,
+            dry_run=dry_run,
+            batch_size=batch_size,
+            max_payload_bytes=max_payload_bytes,
+            max_workers=max_workers,
+            segment_count=segment_count,
+        )
+
+    def export_snapshot(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        path: T.Union[str, "Path"],
+        segment_count: int = MAX_SEGMENT_COUNT,
+        page_size: int = MAX_LIST_PAGE_SIZE,
+        resume: bool = True,
+    ) -> dict[str, T.Any]:
+        """
+        Export all vectors of the index (keys, data and metadata) to a local
+        snapshot directory, see :mod:`s3vectorm.snapshot` for the format.
+
+        The vectors are listed with a segment-parallel scan and appended to
+        the files page by page, with a checkpoint after each page.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param path: The snapshot directory, created if it does not exist
+        :param segment_count: Number of segments to list in parallel (1 - 16, default: 16)
+        :param page_size: Number of vectors per list page (default: 1000)
+        :param resume: If True (default) and the directory has an unfinished
+            export, continue it from its last checkpoint (with its original
+            ``segment_count``), if it has a finished export, return at once.
+            If False, start over.
+
+        :returns: The manifest of the snapshot, ``n_vectors`` is the number
+            of exported vectors
+
+        Example:
+            >>> manifest = index.export_snapshot(s3_vectors_client, "backup/documents")
+        """
+        from .snapshot import export_snapshot
+
+        return export_snapshot(
+            index=self,
+            s3_vectors_client=s3_vectors_client,
+            path=path,
+            segment_count=segment_count,
+            page_size=page_size,
+            resume=resume,
+        )
+
+    def import_snapshot(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        path: T.Union[str, "Path"],
+        checkpoint_path: T.Optional[T.Union[str, "Path"]] = None,
+        batch_size: int = MAX_VECTORS_PER_PUT,
+        max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> BulkWriteResult:
+        """
+        Put all vectors of a snapshot (see :meth:`export_snapshot`) into the index.
+
+        The snapshot files are streamed into concurrent batched ``put_vectors``
+        calls, like :meth:`put_vectors_bulk` does. The index must have the
+        same dimension as the exported index.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param path: The snapshot directory
+        :param checkpoint_path: Optional JSON file that records the number of
+            leading vectors already imported, it is updated as batches finish.
+            If it exists, these vectors are skipped, so an interrupted (or
+            partially failed) import can be run again.
+        :param batch_size: Maximum number of vectors per API call (default: 500)
+        :param max_payload_bytes: Maximum estimated payload size per API call
+            (default: 20 MiB)
+        :param max_workers: Number of concurrent API calls (default: 8)
+
+        :returns: A :class:`~s3vectorm.bulk.BulkWriteResult`, ``n_skipped`` is
+            the number of vectors skipped thanks to the checkpoint
+
+        Example:
+            >>> result = index.import_snapshot(
+            ...     s3_vectors_client,
+            ...     "backup/documents",
+            ...     checkpoint_path="backup/documents.import.json",
+            ... )
+        """
+        from .snapshot import import_snapshot
+
+        return import_snapshot(
+            index=self,
+            s3_vectors_client=s3_vectors_client,
+            path=path,
+            checkpoint_path=checkpoint_path,
+            batch_size=batch_size,
+            max_payload_bytes=max_payload_bytes,
+            max_workers=max_workers,
+        )
+
+    def copy_to(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        target: "Index",
+        target_s3_vectors_client: T.Optional["S3VectorsClient"] = None,
+        transform: T.Optional["VectorTransform"] = None,
+        batch_transform: T.Optional["BatchTransform"] = None,
+        checkpoint_path: T.Optional[T.Union[str, "Path"]] = None,
+        segment_count: int = MAX_SEGMENT_COUNT,
+        page_size: int = MAX_LIST_PAGE_SIZE,
+        batch_size: int = MAX_VECTORS_PER_PUT,
+        max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> BulkWriteResult:
+        """
+        Copy all vectors of this index into another (existing) index, see
+        :mod:`s3vectorm.migrate`.
+
+        The vectors are read with a segment-parallel scan and written with
+        concurrent batched ``put_vectors`` calls while the scan goes on.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to read this index
+        :param target: The index to write to
+        :param target_s3_vectors_client: The client to write the target index,
+            e.g. for another region or account, default to ``s3_vectors_client``
+        :param transform: Optional function applied to each vector (in the
+            ``put_vectors`` format), it returns the vector to write or ``None``
+            to leave it out
+        :param batch_transform: Optional function applied to the list of
+            vectors of each page (after ``transform``), it returns the list
+            of vectors to write
+        :param checkpoint_path: Optional JSON file that records the progress
+            of each segment. If it exists, the copy resumes from there; if it
+            records a finished copy, nothing is done.
+        :param segment_count: Number of segments to list in parallel (1 - 16, default: 16)
+        :param page_size: Number of vectors per list page (default: 1000)
+        :param batch_size: Maximum number of vectors per API call (default: 500)
+        :param max_payload_bytes: Maximum estimated payload size per API call
+            (default: 20 MiB)
+        :param max_workers: Number of concurrent ``put_vectors`` calls (default: 8)
+
+        :returns: A :class:`~s3vectorm.bulk.BulkWriteResult`, ``n_skipped`` is
+            the number of vectors copied by the previous runs of a resumed copy
+
+        Example:
+            >>> new_index = Index(**{**index.model_dump(), "index_name": "documents-v2",
+            ...     "distance_metric": "euclidean"})
+            >>> new_index.create(s3_vectors_client)
+            >>> result = index.copy_to(s3_vectors_client, new_index,
+            ...     checkpoint_path="copy-documents.json")
+        """
+        from .migrate import copy_index
+
+        if target_s3_vectors_client is None:
+            target_s3_vectors_client = s3_vectors_client
+        return copy_index(
+            source=self,
+            source_s3_vectors_client=s3_vectors_client,
+            target=target,
+            target_s3_vectors_client=target_s3_vectors_client,
+            transform=transform,
+            batch_transform=batch_transform,
+            checkpoint_path=checkpoint_path,
+            segment_count=segment_count,
+            page_size=page_size,
+            batch_size=batch_size,
+            max_payload_bytes=max_payload_bytes,
+            max_workers=max_workers,
+        )
+
+    def buffered_writer(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        max_vectors: int = MAX_VECTORS_PER_PUT,
+        max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+        flush_interval: float = 1.0,
+        max_pending: int | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> "BufferedWriter":
+        """
+        Create a :class:`~s3vectorm.writer.BufferedWriter` that collects single
+        puts and deletes and sends them in batches from a background thread.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param max_vectors: Flush when this many keys are buffered (default: 500)
+        :param max_payload_bytes: Flush when the estimated put payload of the
+            buffer reaches this size (default: 20 MiB)
+        :param flush_interval: Flush when the oldest buffered write is this
+            many seconds old (default: 1.0)
+        :param max_pending: Maximum number of buffered keys before the
+            producers wait, default to ``4 * max_vectors``
+        :param max_workers: Number of concurrent API calls of a flush (default: 8)
+
+        Example:
+            >>> with index.buffered_writer(s3_vectors_client) as writer:
+            ...     writer.put(vector)
+            ...     writer.delete("doc-2")
+        """
+        from .writer import BufferedWriter
+
+        return BufferedWriter(
+            index=self,
+            s3_vectors_client=s3_vectors_client,
+            max_vectors=max_vectors,
+            max_payload_bytes=max_payload_bytes,
+            flush_interval=flush_interval,
+            max_pending=max_pending,
+            max_workers=max_workers,
+        )
+
+    def ingest(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        rows: T.Iterable[T.Any],
+        embed: "EmbedFunction",
+        to_vector: "ToVectorFunction",
+        embed_batch_size: int = 64,
+        embed_workers: int = 1,
+        max_pending_embeds: int | None = None,
+        put_batch_size: int = MAX_VECTORS_PER_PUT,
+        max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+        put_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> "IngestResult":
+        """
+        Embed rows with a batch embedding function and put them into the
+        index, the embedding of the next batches and the upload of the
+        previous ones run at the same time, see :mod:`s3vectorm.pipeline`.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param rows: Any iterable of rows (e.g. text chunks), it is consumed lazily
+        :param embed: Function that takes a list of rows and returns one
+            embedding per row, in the same order
+        :param to_vector: Function that takes a row and its embedding and
+            returns a :class:`~s3vectorm.vector.Vector`
+        :param embed_batch_size: Number of rows per ``embed`` call (default: 64)
+        :param embed_workers: Number of concurrent ``embed`` calls (default: 1)
+        :param max_pending_embeds: Maximum number of embedding batches in
+            flight, default to ``2 * embed_workers``
+        :param put_batch_size: Maximum number of vectors per ``put_vectors``
+            call (default: 500)
+        :param max_payload_bytes: Maximum estimated payload size per API call
+            (default: 20 MiB)
+        :param put_workers: Number of concurrent ``put_vectors`` calls (default: 8)
+
+        :returns: A :class:`~s3vectorm.pipeline.IngestResult`, the failed
+            embedding batches, ``to_vector`` calls and put batches are
+            reported, not raised
+
+        Example:
+            >>> result = index.ingest(
+            ...     s3_vectors_client,
+            ...     rows=chunks,
+            ...     embed=lambda rows: model.encode([row.text for row in rows]),
+            ...     to_vector=lambda row, emb: Vector(key=row.id, data=list(emb)),
+            ... )
+        """
+        from .pipeline import ingest
+
+        return ingest(
+            index=self,
+            s3_vectors_client=s3_vectors_client,
+            rows=rows,
+            embed=embed,
+            to_vector=to_vector,
+            embed_batch_size=embed_batch_size,
+            embed_workers=embed_workers,
+            max_pending_embeds=max_pending_embeds,
+            put_batch_size=put_batch_size,
+            max_payload_bytes=max_payload_bytes,
+            put_workers=put_workers,
+        )
+
+    def query_vectors(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        data: list[float],
+        top_k: int = 10,
+        filter: T.Optional["FilterLike"] = None,
+        return_metadata: bool = False,
+        return_distance: bool = False,
+        use_cache: bool = True,
+    ) -> "QueryVectorsOutput":
+        """
+        Query the index for vectors similar to the provided query vector.
+
         This method performs a similarity search in the vector index, returning
         the most similar vectors based on the configured distance metric.
         It supports filtering by metadata and optional return of metadata
         and distance values.
 
         :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
-        :param data: Query vector as a list of float values
+        :param data: Query vector as a list of float values, or a 1-D
+            ``numpy.ndarray`` / ``array.array`` / ``memoryview``
         :param top_k: Maximum number of similar vectors to return (default: 10)
-        :param filter: Optional filter expression for metadata-based filtering
+        :param filter: Optional filter for metadata-based filtering, an
+            expression (sent as its canonical document, see
+            :meth:`~s3vectorm.metadata.CompoundExpr.to_canonical_doc`) or a
+            filter document, e.g. from :meth:`~s3vectorm.metadata.PreparedFilter.bind`
         :param return_metadata: Whether to include metadata in the results (default: False)
         :param return_distance: Whether to include distance values in the results (default: False)
+        :param use_cache: Whether to use :attr:`query_cache` if it is set
+            (default: True). Cached outputs are shared between callers,
+            do not mutate them.
 
         :returns: A QueryVectorsOutput object containing the search results
 
@@ -477,25 +1458,120 @@ class Index(BaseModel):
         Reference:
             https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/query_vectors.html
         """
-        if filter is None:
-            kwargs = {}
-        else:
-            kwargs = {"filter": filter.to_doc()}
-        res = s3_vectors_client.query_vectors(
-            vectorBucketName=self.bucket_name,
-            indexName=self.index_name,
-            topK=top_k,
-            queryVector={
-                self.data_type: data,
-            },
-            returnMetadata=return_metadata,
-            returnDistance=return_distance,
-            **kwargs,
+        cache = self.query_cache if use_cache else None
+        if cache is not None:
+            cache_key = self._get_query_cache_key(
+                data=data,
+                top_k=top_k,
+                filter=filter,
+                return_metadata=return_metadata,
+                return_distance=return_distance,
+            )
+            cache_namespace = self._get_query_cache_namespace(s3_vectors_client)
+            # read before the call, a write during the call makes the result stale
+            cache_generation = cache.generation(cache_namespace)
+            output = cache.get(cache_namespace, cache_key, generation=cache_generation)
+            if output is not None:
+                return output
+
+        res = self._call(
+            s3_vectors_client,
+            "query_vectors",
+            self._get_query_vectors_kwargs(
+                data=data,
+                top_k=top_k,
+                filter=filter,
+                return_metadata=return_metadata,
+                return_distance=return_distance,
+            ),
         )
-        return QueryVectorsOutput(
+        output = QueryVectorsOutput(
             boto3_raw_data=res,
             data_type=self.data_type,
         )
+        if cache is not None:
+            cache.set(cache_namespace, cache_key, output, generation=cache_generation)
+        return output
+
+    def query_vectors_many(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        data_list: T.Sequence[list[float]],
+        top_k: int = 10,
+        filter: T.Optional[
+            T.Union[
+                "FilterLike",
+                T.Sequence[T.Optional["FilterLike"]],
+            ]
+        ] = None,
+        return_metadata: bool = False,
+        return_distance: bool = False,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        return_exceptions: bool = True,
+    ) -> list[T.Union["QueryVectorsOutput", Exception]]:
+        """
+        Run many similarity searches concurrently.
+
+        This is useful when a single user request needs several query embeddings
+        (query expansion, sub-questions, multiple personas, ...). The queries are
+        sent through a thread pool, so the total latency is close to the latency
+        of the slowest query instead of the sum of all of them.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param data_list: List of query vectors
+        :param top_k: Maximum number of similar vectors to return per query (default: 10)
+        :param filter: Optional filter expression shared by all queries, or a list
+            of filter expressions (``None`` for no filter), one per query vector
+        :param return_metadata: Whether to include metadata in the results (default: False)
+        :param return_distance: Whether to include distance values in the results (default: False)
+        :param max_workers: Maximum number of concurrent queries (default: 8)
+        :param return_exceptions: If True (default), a failed query puts its exception
+            at its position in the returned list. If False, the first error is raised.
+
+        :returns: A list of :class:`QueryVectorsOutput` (or exceptions),
+            in the same order as ``data_list``
+
+        Example:
+            >>> results = index.query_vectors_many(
+            ...     s3_vectors_client,
+            ...     data_list=[embedding_1, embedding_2, embedding_3],
+            ...     filter=[None, DocChunkMeta.owner_id.eq("user-1"), None],
+            ...     return_metadata=True,
+            ... )
+            >>> for res in results:
+            ...     if isinstance(res, Exception):
+            ...         print(f"query failed: {res!r}")
+            ...     else:
+            ...         docs = res.as_vector_objects(DocChunk)
+        """
+        filters = self._expand_filters(len(data_list), filter)
+        if len(data_list) == 0:
+            return []
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(data_list))
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self.query_vectors,
+                    s3_vectors_client=s3_vectors_client,
+                    data=data,
+                    top_k=top_k,
+                    filter=filter_,
+                    return_metadata=return_metadata,
+                    return_distance=return_distance,
+                )
+                for data, filter_ in zip(data_list, filters)
+            ]
+            results = []
+            for future in futures:
+                error = future.exception()
+                if error is None:
+                    results.append(future.result())
+                elif return_exceptions:
+                    results.append(error)
+                else:
+                    raise error
+            return results
 
     def list_vectors(
         self,
@@ -506,7 +1582,8 @@ class Index(BaseModel):
         return_data: bool = OPT,
         return_metadata: bool = OPT,
         page_size: int = 100,
-        max_items: int = 9999,
+        max_items: int | None = 9999,
+        starting_token: str = OPT,
     ) -> T.Generator["ListVectorsOutput", None, None]:
         """
         List all vectors in the index with pagination support.
@@ -523,7 +1600,10 @@ class Index(BaseModel):
         :param return_data: Whether to include vector data in the results
         :param return_metadata: Whether to include metadata in the results
         :param page_size: Number of vectors per page (default: 100)
-        :param max_items: Maximum total number of vectors to retrieve (default: 9999)
+        :param max_items: Maximum total number of vectors to retrieve (default: 9999),
+            ``None`` means no limit
+        :param starting_token: Optional ``nextToken`` of a previous page, the
+            listing resumes after that page
 
         :yields: ListVectorsOutput objects containing paginated vector results
 
@@ -540,29 +1620,243 @@ class Index(BaseModel):
         Reference:
             https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/paginator/ListVectors.html
         """
-        kwargs = {
-            "vectorBucketName": self.bucket_name,
-            "indexName": self.index_name,
-            "indexArn": index_arn,
-            "segmentCount": segment_count,
-            "segmentIndex": segment_index,
-            "returnData": return_data,
-            "returnMetadata": return_metadata,
-            "PaginationConfig": {
-                "MaxItems": max_items,
-                "PageSize": page_size,
-            },
-        }
-        kwargs = remove_optional(**kwargs)
-        if "indexArn" in kwargs:
-            kwargs.pop("indexName")
+        kwargs = self._get_list_vectors_kwargs(
+            index_arn=index_arn,
+            segment_count=segment_count,
+            segment_index=segment_index,
+            return_data=return_data,
+            return_metadata=return_metadata,
+            page_size=page_size,
+            max_items=max_items,
+            starting_token=starting_token,
+        )
         paginator = s3_vectors_client.get_paginator("list_vectors")
-        for response in paginator.paginate(**kwargs):
+        pages = paginator.paginate(**kwargs)
+        if self.metrics is not None:
+            pages = self.metrics.iter_pages(
+                "list_vectors", kwargs, pages, s3_vectors_client
+            )
+        for response in pages:
             yield ListVectorsOutput(
                 boto3_raw_data=response,
                 data_type=self.data_type,
             )
 
+    def iter_vectors(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        vector_class: T.Type[VectorT],
+        index_arn: str = OPT,
+        segment_count: int = OPT,
+        segment_index: int = OPT,
+        return_data: bool = OPT,
+        return_metadata: bool = OPT,
+        page_size: int = 100,
+        max_items: int | None = None,
+        trusted: bool = False,
+        filter: T.Optional["FilterLike"] = None,
+    ) -> T.Generator[VectorT, None, None]:
+        """
+        Iterate over all vectors in the index as ``vector_class`` objects.
+
+        Vector objects are created lazily, one at a time, across all pages of
+        :meth:`list_vectors`, instead of building a whole page of objects up
+        front. No reference to a page is kept once its last vector has been
+        yielded, so memory usage is bounded by about one page of raw data,
+        however large the index is.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param vector_class: The Vector class to use for creating vector objects
+        :param index_arn: Optional ARN of the vector index. If provided,
+            takes precedence over index_name
+        :param segment_count: Total number of segments for parallel processing
+        :param segment_index: Index of the segment to retrieve (0-based)
+        :param return_data: Whether to include vector data in the results
+        :param return_metadata: Whether to include metadata in the results
+        :param page_size: Number of vectors per page (default: 100)
+        :param max_items: Maximum total number of vectors to retrieve,
+            ``None`` (default) means no limit
+        :param trusted: See :meth:`VectorsOutputMixin.as_vector_objects`
+        :param filter: Optional metadata filter, ``list_vectors`` does not
+            support filters, so it is evaluated locally on each page (see
+            :meth:`VectorsOutputMixin.filter_vectors`). The metadata is always
+            returned when a filter is given. ``max_items`` limits the number
+            of vectors listed, not the number of matches.
+
+        :yields: ``vector_class`` objects
+
+        Example:
+            >>> for doc_chunk in index.iter_vectors(
+            ...     s3_vectors_client,
+            ...     DocChunk,
+            ...     return_metadata=True,
+            ...     page_size=1000,
+            ... ):
+            ...     export(doc_chunk)
+
+        .. seealso::
+
+            :meth:`scan_vector_objects` to list all segments in parallel.
+        """
+        predicate = None if filter is None else compile_filter(filter)
+        for page in self.list_vectors(
+            s3_vectors_client=s3_vectors_client,
+            index_arn=index_arn,
+            segment_count=segment_count,
+            segment_index=segment_index,
+            return_data=return_data,
+            return_metadata=True if predicate is not None else return_metadata,
+            page_size=page_size,
+            max_items=max_items,
+        ):
+            if predicate is not None:
+                page = page.filter_vectors(predicate)
+            yield from page.iter_vector_objects(vector_class, trusted=trusted)
+
+    def scan_vectors(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        segment_count: int = MAX_SEGMENT_COUNT,
+        return_data: bool = False,
+        return_metadata: bool = False,
+        page_size: int = 100,
+        max_workers: int | None = None,
+        queue_size: int | None = None,
+    ) -> T.Generator["ListVectorsOutput", None, None]:
+        """
+        List all vectors in the index using a segment-parallel scan.
+
+        The index is split into ``segment_count`` segments which are listed
+        concurrently on a worker pool, each segment prefetching its next page.
+        All pages are merged into one stream through a bounded queue, so a slow
+        consumer won't cause unbounded memory usage. Unlike :meth:`list_vectors`,
+        there is no cap on the total number of vectors.
+
+        The order of pages across segments is not deterministic.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param segment_count: Number of segments to scan in parallel (1 - 16, default: 16)
+        :param return_data: Whether to include vector data in the results
+        :param return_metadata: Whether to include metadata in the results
+        :param page_size: Number of vectors per page (default: 100)
+        :param max_workers: Number of worker threads, default to ``segment_count``
+        :param queue_size: Maximum number of pages buffered in memory,
+            default to ``2 * segment_count``
+
+        :yields: ListVectorsOutput objects containing paginated vector results
+
+        Example:
+            >>> n = 0
+            >>> for page in index.scan_vectors(s3_vectors_client, segment_count=8):
+            ...     n += len(page.vectors)
+
+        Reference:
+            https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/list_vectors.html
+        """
+        for segment_page in iter_segment_pages(
+            index=self,
+            s3_vectors_client=s3_vectors_client,
+            segment_count=segment_count,
+            return_data=return_data,
+            return_metadata=return_metadata,
+            page_size=page_size,
+            max_workers=max_workers,
+            queue_size=queue_size,
+        ):
+            yield segment_page.page
+
+    def scan_vector_objects(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        vector_class: T.Type[VectorT],
+        segment_count: int = MAX_SEGMENT_COUNT,
+        return_data: bool = False,
+        return_metadata: bool = False,
+        page_size: int = 100,
+        max_workers: int | None = None,
+        queue_size: int | None = None,
+        trusted: bool = False,
+        filter: T.Optional["FilterLike"] = None,
+    ) -> T.Generator[VectorT, None, None]:
+        """
+        Same as :meth:`scan_vectors`, but yield ``vector_class`` objects
+        instead of pages.
+
+        :param vector_class: The Vector class to use for creating vector objects
+        :param trusted: See :meth:`VectorsOutputMixin.as_vector_objects`
+        :param filter: Optional metadata filter evaluated locally, see
+            :meth:`iter_vectors`
+
+        Example:
+            >>> for doc_chunk in index.scan_vector_objects(
+            ...     s3_vectors_client,
+            ...     DocChunk,
+            ...     return_metadata=True,
+            ... ):
+            ...     print(doc_chunk.document_id)
+        """
+        predicate = None if filter is None else compile_filter(filter)
+        for page in self.scan_vectors(
+            s3_vectors_client=s3_vectors_client,
+            segment_count=segment_count,
+            return_data=return_data,
+            return_metadata=True if predicate is not None else return_metadata,
+            page_size=page_size,
+            max_workers=max_workers,
+            queue_size=queue_size,
+        ):
+            if predicate is not None:
+                page = page.filter_vectors(predicate)
+            yield from page.iter_vector_objects(vector_class, trusted=trusted)
+
+    def get_vectors(
+        self,
+        s3_vectors_client: "S3VectorsClient",
+        keys: list[str],
+        return_data: bool = OPT,
+        return_metadata: bool = OPT,
+        index_arn: str = OPT,
+    ) -> "GetVectorsOutput":
+        """
+        Get specific vectors from the index by their keys.
+
+        Keys that do not exist are silently left out of the result.
+
+        :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+        :param keys: List of vector keys to get, at most 100 keys per call
+        :param return_data: Whether to include vector embedding data in results
+        :param return_metadata: Whether to include vector metadata in results
+        :param index_arn: Optional ARN of the vector index. If provided,
+            takes precedence over index_name
+
+        :returns: A :class:`GetVectorsOutput` with the found vectors
+
+        Example:
+            >>> res = index.get_vectors(
+            ...     s3_vectors_client,
+            ...     keys=["doc1", "doc2"],
+            ...     return_metadata=True,
+            ... )
+            >>> vectors = res.as_vector_objects(Vector)
+
+        Reference:
+            https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/get_vectors.html
+        """
+        res = self._call(
+            s3_vectors_client,
+            "get_vectors",
+            self._get_get_vectors_kwargs(
+                keys=keys,
+                return_data=return_data,
+                return_metadata=return_metadata,
+                index_arn=index_arn,
+            ),
+        )
+        return GetVectorsOutput(
+            boto3_raw_data=res,
+            data_type=self.data_type,
+        )
+
     def delete_vectors(
         self,
         s3_vectors_client: "S3VectorsClient",
@@ -589,56 +1883,103 @@ class Index(BaseModel):
         Reference:
             https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3vectors/client/delete_vectors.html
         """
-        kwargs = {
-            "indexName": self.index_name,
-            "indexArn": index_arn,
-        }
-        kwargs = remove_optional(**kwargs)
-        if "indexArn" in kwargs:
-            kwargs.pop("indexName")
-        s3_vectors_client.delete_vectors(
-            vectorBucketName=self.bucket_name,
-            keys=keys,
-            **kwargs,
-        )
+        try:
+            self._write(
+                s3_vectors_client,
+                "delete_vectors",
+                self._get_delete_vectors_kwargs(keys=keys, index_arn=index_arn),
+            )
+        finally:
+            self._invalidate_query_cache(s3_vectors_client)
 
     def delete_all_vectors(
         self,
         s3_vectors_client: "S3VectorsClient",
-        page_size: int = 100,
-        max_items: int = 9999,
+        page_size: int = MAX_KEYS_PER_DELETE,
+        max_items: int | None = None,
+        segment_count: int = MAX_SEGMENT_COUNT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        progress_callback: T.Callable[[int], None] | None = None,
+        filter: T.Optional["FilterLike"] = None,
     ) -> int:
         """
-        Delete all vectors in the index.
+        Delete all vectors in the index, or all vectors matching a metadata filter.
 
         This method provides a convenient way to delete all vectors from the index
-        by first listing them with pagination and then deleting them in batches.
-        This is useful for clearing an index without deleting the index structure itself.
+        without deleting the index structure itself. The keys are listed with a
+        segment-parallel scan (see :meth:`scan_vectors`), and delete batches are
+        sent concurrently while the scan is still running, so listing and
+        deleting overlap.
 
         :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
-        :param page_size: Number of vectors to process per page (default: 100)
-        :param max_items: Maximum total number of vectors to delete (default: 9999)
+        :param page_size: Number of keys per list page and per delete batch (default: 500)
+        :param max_items: Optional maximum total number of vectors to delete,
+            ``None`` (default) means delete everything
+        :param segment_count: Number of segments to list in parallel (1 - 16, default: 16)
+        :param max_workers: Number of concurrent delete calls (default: 8)
+        :param progress_callback: Optional callable invoked after each delete batch
+            with the total number of vectors deleted so far
+        :param filter: Optional metadata filter, only the matching vectors are
+            deleted. The filter is evaluated locally on the listed metadata,
+            ``max_items`` then limits the number of deleted vectors.
 
         :returns: The total number of vectors that were deleted
 
+        Raises:
+            Exception: The error of the first failed delete batch, raised after
+                all other batches are finished.
+
         Example:
-            >>> deleted_count = index.delete_all_vectors(s3_vectors_client)
+            >>> deleted_count = index.delete_all_vectors(
+            ...     s3_vectors_client,
+            ...     progress_callback=lambda n: print(f"deleted {n} vectors"),
+            ... )
             >>> print(f"Deleted {deleted_count} vectors from the index")
 
-        .. note::
-
-            This operation may take some time for large indexes as it processes
-            vectors in batches. For very large indexes, consider using segmentation
-            parameters in list_vectors for parallel processing.
+            >>> # Delete the vectors of one document
+            >>> index.delete_all_vectors(
+            ...     s3_vectors_client,
+            ...     filter=DocMeta.document_id.eq("doc-1"),
+            ... )
         """
+        page_size = min(page_size, MAX_KEYS_PER_DELETE)
+        predicate = None if filter is None else compile_filter(filter)
+
+        def iter_keys() -> T.Iterator[str]:
+            n_keys = 0
+            for page in self.scan_vectors(
+                s3_vectors_client=s3_vectors_client,
+                segment_count=segment_count,
+                return_metadata=predicate is not None,
+                page_size=page_size,
+            ):
+                if predicate is not None:
+                    page = page.filter_vectors(predicate)
+                for dct in page.boto3_raw_data.get("vectors", []):
+                    if max_items is not None and n_keys >= max_items:
+                        return
+                    n_keys += 1
+                    yield dct["key"]
+
         n_deleted = 0
-        for res in self.list_vectors(
-            s3_vectors_client=s3_vectors_client,
-            page_size=page_size,
-            max_items=max_items,
-        ):
-            keys = [dct["key"] for dct in res.boto3_raw_data.get("vectors", [])]
-            if len(keys):
-                self.delete_vectors(s3_vectors_client=s3_vectors_client, keys=keys)
+
+        def on_batch_done(keys: list[str], error: Exception | None):
+            nonlocal n_deleted
+            if error is None:
                 n_deleted += len(keys)
+                if progress_callback is not None:
+                    progress_callback(n_deleted)
+
+        result = run_batches(
+            batches=iter_batches(iter_keys(), page_size),
+            func=lambda keys: self.delete_vectors(
+                s3_vectors_client=s3_vectors_client,
+                keys=keys,
+            ),
+            get_key=lambda key: key,
+            max_workers=max_workers,
+            on_batch_done=on_batch_done,
+        )
+        if result.failures:
+            raise result.failures[0].error
         return n_deleted
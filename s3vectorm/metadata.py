@@ -23,10 +23,24 @@ Example:
     >>> query = meta.document_id.eq("doc-1") & meta.chunk_seq.gt(5)
     >>> query.to_doc()
     {"$and": [{"document_id": {"$eq": "doc-1"}}, {"chunk_seq": {"$gt": 5}}]}
+
+``&`` and ``|`` build binary trees, so a chain of ten conditions renders as a
+ten-deep nested document with :meth:`CompoundExpr.to_doc`.
+:meth:`CompoundExpr.to_canonical_doc` renders the equivalent flat, simplified
+document instead, which is what :meth:`~s3vectorm.index.Index.query_vectors`
+sends:
+
+    >>> query = meta.chunk_seq.eq(1) | meta.chunk_seq.eq(2) | meta.chunk_seq.eq(3)
+    >>> query.to_canonical_doc()
+    {"chunk_seq": {"$in": [1, 2, 3]}}
+
+Filters of the same shape with different values can be prepared once with
+:class:`Param` placeholders, see :class:`PreparedFilter`.
 """
 
 import typing as T
 import enum
+import functools
 import dataclasses
 
 
@@ -54,6 +68,28 @@ class OperatorEnum(str, enum.Enum):
     or_ = "$or"
 
 
+@dataclasses.dataclass(frozen=True)
+class Param:
+    """
+    A named placeholder for the value of an expression in a filter template,
+    see :class:`PreparedFilter`.
+
+    Attributes:
+        name: The name used to bind the value with :meth:`PreparedFilter.bind`
+
+    Example:
+        >>> DocumentMeta.document_id.eq(Param("document_id"))
+    """
+
+    name: str = dataclasses.field()
+
+
+def _has_param(value: T.Any) -> bool:
+    if isinstance(value, Param):
+        return True
+    return isinstance(value, list) and any(isinstance(v, Param) for v in value)
+
+
 @dataclasses.dataclass
 class Expr:
     """
@@ -110,6 +146,18 @@ class Expr:
         """
         return {self.field: {self.operator: self.value}}
 
+    def to_canonical_doc(self) -> dict:
+        """
+        Same as :meth:`to_doc`, see :meth:`CompoundExpr.to_canonical_doc`.
+        """
+        return self.to_doc()
+
+    def prepare(self) -> "PreparedFilter":
+        """
+        Prepare this expression as a filter template, see :class:`PreparedFilter`.
+        """
+        return PreparedFilter(self)
+
 
 @dataclasses.dataclass
 class CompoundExpr:
@@ -169,6 +217,255 @@ class CompoundExpr:
         """
         return {self.operator: [self.left.to_doc(), self.right.to_doc()]}
 
+    def iter_terms(self) -> T.Iterator[T.Union[Expr, "CompoundExpr"]]:
+        """
+        Iterate over the terms of the associative chain this expression is the
+        root of, from left to right. ``(a & b) & (c & d)`` yields ``a``,
+        ``b``, ``c``, ``d``; a term combined with the other operator is
+        yielded as a whole.
+
+        The tree is walked without recursion, so arbitrarily long chains work.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, CompoundExpr) and node.operator == self.operator:
+                stack.append(node.right)
+                stack.append(node.left)
+            else:
+                yield node
+
+    @functools.cached_property
+    def _canonical_doc(self) -> dict:
+        return _canonicalize(
+            self.operator,
+            [term.to_canonical_doc() for term in self.iter_terms()],
+        )
+
+    def to_canonical_doc(self) -> dict:
+        """
+        Convert the compound expression to a flat, simplified filter document
+        that is equivalent to :meth:`to_doc`:
+
+        - Chains of the same operator become one n-ary list, e.g.
+          ``a & b & c`` renders as ``{"$and": [a, b, c]}``.
+        - In ``$or``, ``$eq`` / ``$in`` conditions on the same field are merged
+          into one ``$in``; in ``$and``, ``$ne`` / ``$nin`` conditions on the
+          same field are merged into one ``$nin``.
+        - Duplicate terms are removed, and the terms are sorted, so the same
+          set of conditions always renders the same document.
+        - A chain that is left with a single term renders as that term.
+
+        The result is computed once and cached on the expression, treat the
+        expression and the returned document as immutable. Conditions on a
+        :class:`Param` placeholder are never merged.
+
+        Example:
+            >>> query = (meta.tenant.eq("t1") | meta.tenant.eq("t2")) & meta.year.gte(2024)
+            >>> query.to_canonical_doc()
+            {"$and": [{"tenant": {"$in": ["t1", "t2"]}}, {"year": {"$gte": 2024}}]}
+        """
+        return self._canonical_doc
+
+    def prepare(self) -> "PreparedFilter":
+        """
+        Prepare this expression as a filter template, see :class:`PreparedFilter`.
+        """
+        return PreparedFilter(self)
+
+
+# For each logical operator, the field operators whose conditions on the same
+# field can be merged into one, and the operator of the merged condition:
+# ``a == 1 OR a == 2`` is ``a in [1, 2]``, ``a != 1 AND a != 2`` is ``a nin [1, 2]``.
+_MERGEABLE_OPERATORS = {
+    OperatorEnum.or_.value: (
+        {OperatorEnum.eq.value, OperatorEnum.in_.value},
+        OperatorEnum.in_.value,
+    ),
+    OperatorEnum.and_.value: (
+        {OperatorEnum.ne.value, OperatorEnum.nin.value},
+        OperatorEnum.nin.value,
+    ),
+}
+
+
+def _get_single_condition(doc: dict) -> T.Optional[tuple[str, str, T.Any]]:
+    """
+    Return ``(field, operator, operand)`` if the document is a single field
+    condition, otherwise None.
+    """
+    if len(doc) != 1:
+        return None
+    field, condition = next(iter(doc.items()))
+    if field.startswith("$") or not isinstance(condition, dict) or len(condition) != 1:
+        return None
+    op, operand = next(iter(condition.items()))
+    return field, op, operand
+
+
+def _canonicalize(logical_operator: str, docs: list[dict]) -> dict:
+    """
+    Build the canonical document of a flattened ``$and`` / ``$or`` chain
+    from the canonical documents of its terms.
+    """
+    # a term may have collapsed to a chain of the same operator, e.g. the
+    # single remaining term of an inner chain
+    terms = []
+    for doc in docs:
+        if len(doc) == 1 and logical_operator in doc:
+            terms.extend(doc[logical_operator])
+        else:
+            terms.append(doc)
+
+    mergeable, merged_operator = _MERGEABLE_OPERATORS[logical_operator]
+    merged_values: dict[str, list] = {}
+    merged_terms: list[T.Union[dict, str]] = []
+    for doc in terms:
+        condition = _get_single_condition(doc)
+        # a $in / $nin operand that is not a list (an invalid filter) is kept
+        # as it is, for the service to report
+        if (
+            condition is not None
+            and condition[1] in mergeable
+            and not _has_param(condition[2])
+            and (condition[1] != merged_operator or isinstance(condition[2], list))
+        ):
+            field, op, operand = condition
+            if field not in merged_values:
+                merged_values[field] = []
+                merged_terms.append(field)  # placeholder of the merged term
+            if op == merged_operator:
+                merged_values[field].extend(operand)
+            else:
+                merged_values[field].append(operand)
+        else:
+            merged_terms.append(doc)
+
+    # the documents are always built in the same key order, so their repr
+    # identifies them (and is much cheaper than JSON serialization)
+    by_repr: dict[str, dict] = {}
+    for term in merged_terms:
+        if isinstance(term, str):
+            values = []
+            seen = set()
+            for value in merged_values[term]:
+                key = repr(value)
+                if key not in seen:
+                    seen.add(key)
+                    values.append(value)
+            if len(values) == 1:
+                op = mergeable.difference({merged_operator}).pop()
+                term = {term: {op: values[0]}}
+            else:
+                term = {term: {merged_operator: values}}
+        by_repr.setdefault(repr(term), term)
+
+    if len(by_repr) == 1:
+        return next(iter(by_repr.values()))
+    return {logical_operator: [by_repr[key] for key in sorted(by_repr)]}
+
+
+_Builder = T.Callable[[dict[str, T.Any]], T.Any]
+
+
+def _compile_template(node: T.Any, names: set[str]) -> T.Optional[_Builder]:
+    """
+    Compile a filter document that contains :class:`Param` placeholders into
+    a function that takes the bound values and returns the final document.
+
+    Only the dictionaries and lists on the path to a placeholder are rebuilt
+    on each call, the parts without placeholders are shared between all the
+    returned documents. Returns None if the node has no placeholder.
+    """
+    if isinstance(node, Param):
+        names.add(node.name)
+        name = node.name
+        return lambda values: values[name]
+    if isinstance(node, dict):
+        items = [
+            (key, value, _compile_template(value, names)) for key, value in node.items()
+        ]
+        if all(builder is None for _, _, builder in items):
+            return None
+        if len(items) == 1:
+            key, _, builder = items[0]
+            return lambda values: {key: builder(values)}
+        return lambda values: {
+            key: value if builder is None else builder(values)
+            for key, value, builder in items
+        }
+    if isinstance(node, list):
+        items = [(value, _compile_template(value, names)) for value in node]
+        if all(builder is None for _, builder in items):
+            return None
+        return lambda values: [
+            value if builder is None else builder(values) for value, builder in items
+        ]
+    return None
+
+
+class PreparedFilter:
+    """
+    A filter template with :class:`Param` placeholders.
+
+    The template is flattened into its canonical document (see
+    :meth:`CompoundExpr.to_canonical_doc`) and compiled once. :meth:`bind`
+    then produces the final filter document for a set of values without
+    creating any expression object or walking the expression tree, which
+    keeps filter building off the profile of high QPS query paths.
+
+    :param expr: The filter template, an expression whose values may be
+        :class:`Param` placeholders
+
+    Example:
+        >>> by_tenant = DocumentMeta.prepare(
+        ...     DocumentMeta.tenant_id.eq(Param("tenant_id"))
+        ...     & DocumentMeta.doc_type.in_(Param("doc_types"))
+        ... )
+        >>> by_tenant.bind(tenant_id="t-1", doc_types=["faq", "manual"])
+        {"$and": [{"doc_type": {"$in": ["faq", "manual"]}}, {"tenant_id": {"$eq": "t-1"}}]}
+        >>> index.query_vectors(
+        ...     s3_vectors_client,
+        ...     data=embedding,
+        ...     filter=by_tenant.bind(tenant_id="t-1", doc_types=["faq"]),
+        ... )
+
+    .. note::
+
+        The bound documents share the parts of the template that have no
+        placeholder, do not mutate them.
+    """
+
+    def __init__(self, expr: T.Union[Expr, "CompoundExpr"]):
+        self.expr = expr
+        self.doc = expr.to_canonical_doc()
+        names = set()
+        self._builder = _compile_template(self.doc, names)
+        self.param_names: frozenset[str] = frozenset(names)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.doc!r})"
+
+    def bind(self, **values: T.Any) -> dict:
+        """
+        Bind values to the placeholders and return the filter document.
+
+        :param values: One value per placeholder name
+
+        Raises:
+            TypeError: If a placeholder has no value, or a value has no placeholder
+        """
+        if values.keys() != self.param_names:
+            missing = sorted(self.param_names.difference(values))
+            unexpected = sorted(set(values).difference(self.param_names))
+            raise TypeError(
+                f"bind() got missing values {missing} "
+                f"and unexpected values {unexpected}"
+            )
+        if self._builder is None:
+            return self.doc
+        return self._builder(values)
+
 
 @dataclasses.dataclass
 class MetaKey:
@@ -319,4 +616,18 @@ class BaseMetadata(metaclass=MetaClass):
         ...
         >>> query = DocumentMeta.document_id.eq("doc-1") & DocumentMeta.status.eq("active")
     """
-    pass
+
+    @classmethod
+    def prepare(cls, expr: T.Union[Expr, CompoundExpr]) -> PreparedFilter:
+        """
+        Prepare a filter template with :class:`Param` placeholders,
+        see :class:`PreparedFilter`.
+
+        Example:
+            >>> by_document = DocumentMeta.prepare(
+            ...     DocumentMeta.document_id.eq(Param("document_id"))
+            ... )
+            >>> by_document.bind(document_id="doc-1")
+            {"document_id": {"$eq": "doc-1"}}
+        """
+        return PreparedFilter(expr)
@@ -0,0 +1,524 @@
+# -*- coding: utf-8 -*-
+
+"""
+Operation Metrics
+
+This module provides :class:`MetricsRegistry`, an instrumentation surface for
+the AWS S3 Vectors API calls made by :class:`~s3vectorm.index.Index`,
+:class:`~s3vectorm.bucket.Bucket` and their asyncio counterparts. Attach a
+registry to an index to record, per operation (``put_vectors``,
+``query_vectors``, ``list_vectors``, ...):
+
+- the number of calls, errors and throttled calls
+- the number of vectors sent or returned
+- the request and response payload sizes in bytes
+- the number of retries made by botocore, and the number of throttled attempts
+  among them
+- a latency histogram
+
+Example:
+    >>> index.metrics = MetricsRegistry()
+    >>> index.put_vectors_bulk(s3_vectors_client, vectors)
+    >>> stats = index.metrics.get_stats("put_vectors")
+    >>> stats.count, stats.n_vectors, stats.latency.quantile(0.99)
+
+Every call is also reported to the registered callbacks as an
+:class:`OperationEvent`, which is the place to forward the numbers to
+CloudWatch, StatsD, OpenTelemetry, a log line, etc:
+
+    >>> index.metrics.add_callback(lambda event: logger.info("%s", event))
+
+An index without a registry (the default) skips all of this, the only cost
+is an ``is None`` check per API call.
+
+A :class:`~s3vectorm.bucket.Bucket` takes a registry the same way, to record
+the bucket calls (create, delete, list its indexes), and ``Index.get`` takes
+one to record its ``get_index`` call.
+"""
+
+import typing as T
+import json
+import time
+import bisect
+import weakref
+import threading
+import dataclasses
+
+import botocore
+import botocore.exceptions
+
+from .constants import BYTES_PER_FLOAT, THROTTLING_ERROR_CODES
+from .bulk import estimate_put_vector_size
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+"""Default upper bounds in seconds of the latency histogram buckets."""
+
+
+@dataclasses.dataclass(frozen=True)
+class OperationEvent:
+    """
+    The outcome of a single AWS S3 Vectors API call.
+
+    :param operation: The name of the API operation, e.g. ``"put_vectors"``
+    :param duration: Wall clock duration of the call in seconds, including
+        the retries made by botocore
+    :param n_vectors: Number of vectors sent (``put_vectors``), keys sent
+        (``get_vectors``, ``delete_vectors``) or vectors returned
+        (``query_vectors``, ``list_vectors``)
+    :param request_bytes: Estimated size of the request payload
+    :param response_bytes: Size of the response payload, from the
+        ``content-length`` response header, 0 if unknown
+    :param retry_attempts: Number of retries made by botocore
+    :param throttled: True if the call failed with a throttling error, the
+        throttled attempts that botocore retried are counted separately in
+        :attr:`OperationStats.n_throttled_attempts`
+    :param error: The exception raised by the call, ``None`` on success
+    """
+
+    operation: str = dataclasses.field()
+    duration: float = dataclasses.field()
+    n_vectors: int = dataclasses.field(default=0)
+    request_bytes: int = dataclasses.field(default=0)
+    response_bytes: int = dataclasses.field(default=0)
+    retry_attempts: int = dataclasses.field(default=0)
+    throttled: bool = dataclasses.field(default=False)
+    error: T.Optional[BaseException] = dataclasses.field(default=None)
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram, the memory usage does not grow with the number
+    of observations.
+
+    :param buckets: Sorted upper bounds of the buckets, observations greater
+        than the last bound go to an implicit overflow bucket.
+    """
+
+    def __init__(
+        self,
+        buckets: T.Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile, e.g. ``0.99`` for the p99.
+
+        The result is the upper bound of the bucket that contains the
+        quantile, clamped to the observed min / max, 0.0 if there is no
+        observation.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count:
+                bound = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(max(bound, self.min), self.max)
+        return self.max  # pragma: no cover
+
+    def to_dict(self) -> dict[str, T.Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "mean": self.mean,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                str(bound): count
+                for bound, count in zip(self.buckets + ("+Inf",), self.counts)
+            },
+        }
+
+
+@dataclasses.dataclass
+class OperationStats:
+    """
+    The aggregated metrics of one API operation.
+
+    ``n_throttled`` counts the calls that failed with a throttling error,
+    ``n_throttled_attempts`` counts every HTTP attempt that got a throttling
+    error, including the ones botocore retried before the call succeeded.
+    The latter is only available for a client instrumented with
+    :meth:`MetricsRegistry.instrument_client`.
+    """
+
+    count: int = dataclasses.field(default=0)
+    n_errors: int = dataclasses.field(default=0)
+    n_throttled: int = dataclasses.field(default=0)
+    n_throttled_attempts: int = dataclasses.field(default=0)
+    n_retries: int = dataclasses.field(default=0)
+    n_vectors: int = dataclasses.field(default=0)
+    request_bytes: int = dataclasses.field(default=0)
+    response_bytes: int = dataclasses.field(default=0)
+    latency: Histogram = dataclasses.field(default_factory=Histogram)
+
+    def add(self, event: OperationEvent):
+        self.count += 1
+        self.n_errors += event.error is not None
+        self.n_throttled += event.throttled
+        self.n_retries += event.retry_attempts
+        self.n_vectors += event.n_vectors
+        self.request_bytes += event.request_bytes
+        self.response_bytes += event.response_bytes
+        self.latency.observe(event.duration)
+
+    def to_dict(self) -> dict[str, T.Any]:
+        return {
+            "count": self.count,
+            "n_errors": self.n_errors,
+            "n_throttled": self.n_throttled,
+            "n_throttled_attempts": self.n_throttled_attempts,
+            "n_retries": self.n_retries,
+            "n_vectors": self.n_vectors,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "latency": self.latency.to_dict(),
+        }
+
+
+def estimate_request_size(kwargs: dict[str, T.Any]) -> int:
+    """
+    Estimate the serialized size in bytes of the request of an API call,
+    without serializing the embeddings.
+    """
+    size = 0
+    vectors = kwargs.get("vectors")
+    if vectors:
+        size += sum(estimate_put_vector_size(dct) for dct in vectors)
+    query_vector = kwargs.get("queryVector")
+    if query_vector:
+        size += sum(BYTES_PER_FLOAT * len(v) for v in query_vector.values())
+    rest = {k: v for k, v in kwargs.items() if k not in ("vectors", "queryVector")}
+    return size + len(json.dumps(rest, default=str))
+
+
+def _count_vectors(
+    kwargs: dict[str, T.Any],
+    response: T.Optional[dict[str, T.Any]],
+) -> int:
+    for key in ("vectors", "keys"):
+        if key in kwargs:
+            return len(kwargs[key])
+    if response is not None:
+        return len(response.get("vectors", ()))
+    return 0
+
+
+def _get_response_metadata(
+    response: T.Optional[dict[str, T.Any]],
+    error: T.Optional[BaseException],
+) -> dict[str, T.Any]:
+    if isinstance(error, botocore.exceptions.ClientError):
+        response = error.response
+    if response is None:
+        return {}
+    return response.get("ResponseMetadata", {})
+
+
+def make_event(
+    operation: str,
+    duration: float,
+    kwargs: dict[str, T.Any],
+    response: T.Optional[dict[str, T.Any]] = None,
+    error: T.Optional[BaseException] = None,
+) -> OperationEvent:
+    """
+    Build the :class:`OperationEvent` of an API call from its request
+    arguments and its response or exception.
+    """
+    response_metadata = _get_response_metadata(response, error)
+    headers = response_metadata.get("HTTPHeaders", {})
+    throttled = (
+        isinstance(error, botocore.exceptions.ClientError)
+        and error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+    )
+    return OperationEvent(
+        operation=operation,
+        duration=duration,
+        n_vectors=_count_vectors(kwargs, response),
+        request_bytes=estimate_request_size(kwargs),
+        response_bytes=int(headers.get("content-length", 0)),
+        retry_attempts=response_metadata.get("RetryAttempts", 0),
+        throttled=throttled,
+        error=error,
+    )
+
+
+class MetricsRegistry:
+    """
+    A thread-safe registry of per-operation metrics.
+
+    :param callbacks: Functions called with every :class:`OperationEvent`,
+        after the event is aggregated. A callback must be fast and must not
+        raise, it runs on the thread that made the API call.
+    :param latency_buckets: Upper bounds in seconds of the latency histogram buckets
+    """
+
+    def __init__(
+        self,
+        callbacks: T.Iterable[T.Callable[[OperationEvent], None]] = (),
+        latency_buckets: T.Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        self.callbacks = list(callbacks)
+        self.latency_buckets = tuple(latency_buckets)
+        self._stats: dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+        self._clients: "weakref.WeakSet" = weakref.WeakSet()
+
+    def add_callback(
+        self,
+        callback: T.Callable[[OperationEvent], None],
+    ):
+        """Register a function to be called with every :class:`OperationEvent`."""
+        self.callbacks.append(callback)
+
+    def _get_or_create_stats(self, operation: str) -> OperationStats:
+        # the caller must hold the lock
+        stats = self._stats.get(operation)
+        if stats is None:
+            stats = OperationStats(latency=Histogram(self.latency_buckets))
+            self._stats[operation] = stats
+        return stats
+
+    def record(self, event: OperationEvent):
+        """
+        Aggregate an event and pass it to the callbacks.
+        """
+        with self._lock:
+            self._get_or_create_stats(event.operation).add(event)
+        for callback in self.callbacks:
+            callback(event)
+
+    def instrument_client(self, s3_vectors_client: T.Any) -> bool:
+        """
+        Register a botocore ``needs-retry`` event handler on the client, to
+        count the throttled attempts that botocore retries internally, see
+        :attr:`OperationStats.n_throttled_attempts`.
+
+        :meth:`call` and :meth:`iter_pages` (and their asynchronous versions)
+        do this automatically, it is safe to call it more than once.
+
+        :return: True if the client is instrumented, False if it has no
+            botocore event system (e.g. the local emulator)
+        """
+        try:
+            if s3_vectors_client in self._clients:
+                return True
+        except TypeError:  # not weak referenceable
+            return False
+        events = getattr(getattr(s3_vectors_client, "meta", None), "events", None)
+        if events is None or not hasattr(events, "register"):
+            return False
+        events.register(
+            "needs-retry.s3vectors",
+            self._on_needs_retry,
+            unique_id=f"s3vectorm-metrics-{id(self)}",
+        )
+        self._clients.add(s3_vectors_client)
+        return True
+
+    def _on_needs_retry(self, response=None, operation=None, **kwargs):
+        """
+        botocore ``needs-retry`` handler, it is called after every attempt.
+        Returns None so that it does not change the retry decision.
+        """
+        if response is None or operation is None:
+            return None
+        code = response[1].get("Error", {}).get("Code")
+        if code in THROTTLING_ERROR_CODES:
+            with self._lock:
+                stats = self._get_or_create_stats(botocore.xform_name(operation.name))
+                stats.n_throttled_attempts += 1
+        return None
+
+    def call(
+        self,
+        operation: str,
+        method: T.Callable[..., dict[str, T.Any]],
+        kwargs: dict[str, T.Any],
+    ) -> dict[str, T.Any]:
+        """
+        Call a client method with ``kwargs`` and record the outcome.
+
+        :param operation: The name of the API operation, e.g. ``"put_vectors"``
+        :param method: The client method that performs the operation
+        :param kwargs: The request arguments
+        """
+        self.instrument_client(getattr(method, "__self__", None))
+        start = time.perf_counter()
+        try:
+            response = method(**kwargs)
+        except Exception as e:
+            self.record(
+                make_event(operation, time.perf_counter() - start, kwargs, error=e)
+            )
+            raise
+        self.record(
+            make_event(operation, time.perf_counter() - start, kwargs, response)
+        )
+        return response
+
+    async def acall(
+        self,
+        operation: str,
+        method: T.Callable[..., T.Awaitable[dict[str, T.Any]]],
+        kwargs: dict[str, T.Any],
+    ) -> dict[str, T.Any]:
+        """
+        The asynchronous version of :meth:`call`.
+        """
+        self.instrument_client(getattr(method, "__self__", None))
+        start = time.perf_counter()
+        try:
+            response = await method(**kwargs)
+        except Exception as e:
+            self.record(
+                make_event(operation, time.perf_counter() - start, kwargs, error=e)
+            )
+            raise
+        self.record(
+            make_event(operation, time.perf_counter() - start, kwargs, response)
+        )
+        return response
+
+    def iter_pages(
+        self,
+        operation: str,
+        kwargs: dict[str, T.Any],
+        pages: T.Iterable[dict[str, T.Any]],
+        s3_vectors_client: T.Optional[T.Any] = None,
+    ) -> T.Iterator[dict[str, T.Any]]:
+        """
+        Yield the pages of a paginator and record one event per page, the
+        duration of a page is the time spent fetching it, not the time the
+        caller spends processing it.
+
+        :param s3_vectors_client: The client that created the paginator, to
+            count its throttled attempts, see :meth:`instrument_client`
+        """
+        self.instrument_client(s3_vectors_client)
+        iterator = iter(pages)
+        while True:
+            start = time.perf_counter()
+            try:
+                response = next(iterator)
+            except StopIteration:
+                return
+            except Exception as e:
+                self.record(
+                    make_event(operation, time.perf_counter() - start, kwargs, error=e)
+                )
+                raise
+            self.record(
+                make_event(operation, time.perf_counter() - start, kwargs, response)
+            )
+            yield response
+
+    async def aiter_pages(
+        self,
+        operation: str,
+        kwargs: dict[str, T.Any],
+        pages: T.AsyncIterable[dict[str, T.Any]],
+        s3_vectors_client: T.Optional[T.Any] = None,
+    ) -> T.AsyncIterator[dict[str, T.Any]]:
+        """
+        The asynchronous version of :meth:`iter_pages`.
+        """
+        self.instrument_client(s3_vectors_client)
+        iterator = pages.__aiter__()
+        while True:
+            start = time.perf_counter()
+            try:
+                response = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                self.record(
+                    make_event(operation, time.perf_counter() - start, kwargs, error=e)
+                )
+                raise
+            self.record(
+                make_event(operation, time.perf_counter() - start, kwargs, response)
+            )
+            yield response
+
+    @property
+    def operations(self) -> list[str]:
+        """The names of the operations that have been recorded."""
+        with self._lock:
+            return list(self._stats)
+
+    def get_stats(self, operation: str) -> OperationStats:
+        """
+        Get the aggregated metrics of an operation, an empty
+        :class:`OperationStats` if the operation has not been recorded.
+        """
+        with self._lock:
+            stats = self._stats.get(operation)
+            if stats is None:
+                return OperationStats(latency=Histogram(self.latency_buckets))
+            return dataclasses.replace(stats, latency=_copy_histogram(stats.latency))
+
+    def to_dict(self) -> dict[str, dict[str, T.Any]]:
+        """
+        Get a JSON serializable snapshot of all operations.
+        """
+        with self._lock:
+            return {
+                operation: stats.to_dict() for operation, stats in self._stats.items()
+            }
+
+    def reset(self):
+        """Discard all recorded metrics, the instrumented clients stay instrumented."""
+        with self._lock:
+            self._stats.clear()
+
+
+def _copy_histogram(histogram: Histogram) -> Histogram:
+    copy = Histogram(histogram.buckets)
+    copy.counts = list(histogram.counts)
+    copy.count = histogram.count
+    copy.sum = histogram.sum
+    copy.min = histogram.min
+    copy.max = histogram.max
+    return copy
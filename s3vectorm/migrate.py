@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+"""
+Index to Index Copy
+
+This module copies all vectors of an index into another index, e.g. to
+change the distance metric (which can not be changed in place), to move an
+index to another bucket, account or region, or to rewrite the metadata:
+
+- the source is read with a segment-parallel scan (see :mod:`s3vectorm.scan`),
+- an optional per-vector ``transform`` and per-page ``batch_transform``
+  rewrite the vectors (e.g. rename metadata keys, re-project the data),
+- the target is written with concurrent batched ``put_vectors`` calls.
+
+Reads and writes overlap: the scan threads fill a bounded queue of pages,
+and the writes start with the first page, so the memory usage does not
+depend on the size of the index.
+
+The progress can be recorded in a checkpoint file: for each segment, the
+``nextToken`` after the last page whose vectors are all written. Running
+the copy again with the same checkpoint file resumes every segment from
+there. A resumed copy may write some vectors twice, which is harmless
+because ``put_vectors`` overwrites by key.
+
+Example:
+    >>> result = source_index.copy_to(
+    ...     s3_vectors_client,
+    ...     target=new_index,
+    ...     target_s3_vectors_client=other_region_client,
+    ...     transform=lambda dct: {**dct, "metadata": rename(dct["metadata"])},
+    ...     checkpoint_path="copy-documents.json",
+    ... )
+    >>> print(result.n_succeeded, result.n_failed)
+"""
+
+import typing as T
+import json
+import collections
+import dataclasses
+from pathlib import Path
+
+from .constants import (
+    MAX_VECTORS_PER_PUT,
+    MAX_PUT_PAYLOAD_BYTES,
+    MAX_LIST_PAGE_SIZE,
+    MAX_SEGMENT_COUNT,
+    DEFAULT_MAX_WORKERS,
+)
+from .bulk import BulkWriteResult, iter_put_batches, run_batches
+from .scan import iter_segment_pages
+from .utils import write_json_atomic
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3vectors import S3VectorsClient
+    from mypy_boto3_s3vectors.type_defs import PutInputVectorTypeDef
+
+    from .index import Index
+
+VectorTransform = T.Callable[
+    ["PutInputVectorTypeDef"], T.Optional["PutInputVectorTypeDef"]
+]
+"""
+A function that takes a vector in the ``put_vectors`` format and returns the
+vector to write, or ``None`` to leave it out.
+"""
+
+BatchTransform = T.Callable[
+    [list["PutInputVectorTypeDef"]], list["PutInputVectorTypeDef"]
+]
+"""
+A function that takes the vectors of a page and returns the vectors to
+write, e.g. to re-project the data of a whole page with one matrix product.
+"""
+
+
+@dataclasses.dataclass
+class _Page:
+    segment_index: int
+    next_token: str | None
+    n_pending: int
+
+
+class _CopyCheckpoint:
+    """
+    Track which pages are fully written and persist the per-segment progress.
+
+    All methods are called in the calling thread, see
+    :func:`~s3vectorm.bulk.run_batches`.
+    """
+
+    def __init__(
+        self,
+        path: T.Optional[Path],
+        segment_count: int,
+    ):
+        self.path = path
+        self.state = {
+            "complete": False,
+            "n_copied": 0,
+            "segment_count": segment_count,
+            "segments": {
+                str(i): {"next_token": None, "done": False}
+                for i in range(segment_count)
+            },
+        }
+        if path is not None and path.exists():
+            self.state = json.loads(path.read_text())
+        self.pages: dict[int, _Page] = {}
+        # page number of each vector not yet in a batch, in order
+        self.vector_pages: collections.deque[int] = collections.deque()
+        # (batch, page number of each vector) of the batches in flight
+        self.in_flight: list[tuple[list["PutInputVectorTypeDef"], list[int]]] = []
+        self.queues: dict[int, collections.deque[int]] = collections.defaultdict(
+            collections.deque
+        )
+        self.n_pages = 0
+
+    @property
+    def starting_tokens(self) -> dict[int, str | None]:
+        return {
+            int(segment_index): segment["next_token"]
+            for segment_index, segment in self.state["segments"].items()
+            if not segment["done"]
+        }
+
+    def add_page(
+        self,
+        segment_index: int,
+        next_token: str | None,
+        vectors: list["PutInputVectorTypeDef"],
+    ):
+        page_number = self.n_pages
+        self.n_pages += 1
+        self.pages[page_number] = _Page(segment_index, next_token, len(vectors))
+        self.queues[segment_index].append(page_number)
+        self.vector_pages.extend([page_number] * len(vectors))
+        if not vectors:
+            self._advance(segment_index)
+
+    def add_batch(self, batch: list["PutInputVectorTypeDef"]):
+        """
+        Record the pages of a batch, the batches take the vectors in order.
+        """
+        page_numbers = [self.vector_pages.popleft() for _ in batch]
+        self.in_flight.append((batch, page_numbers))
+
+    def on_batch_done(self, batch: list["PutInputVectorTypeDef"], error):
+        i = next(i for i, item in enumerate(self.in_flight) if item[0] is batch)
+        _, page_numbers = self.in_flight.pop(i)
+        segment_indexes = set()
+        for page_number in page_numbers:
+            if error is None:
+                page = self.pages[page_number]
+                page.n_pending -= 1
+                segment_indexes.add(page.segment_index)
+        if error is None:
+            self.state["n_copied"] += len(batch)
+        moved = False
+        for segment_index in segment_indexes:
+            moved |= self._advance(segment_index)
+        if moved:
+            self.save()
+
+    def _advance(self, segment_index: int) -> bool:
+        """
+        Move the segment's progress past its leading fully written pages.
+        """
+        queue = self.queues[segment_index]
+        moved = False
+        while queue and self.pages[queue[0]].n_pending == 0:
+            page = self.pages.pop(queue.popleft())
+            self.state["segments"][str(segment_index)] = {
+                "next_token": page.next_token,
+                "done": page.next_token is None,
+            }
+            moved = True
+        return moved
+
+    def save(self):
+        if self.path is not None:
+            write_json_atomic(self.path, self.state)
+
+
+def copy_index(
+    source: "Index",
+    source_s3_vectors_client: "S3VectorsClient",
+    target: "Index",
+    target_s3_vectors_client: "S3VectorsClient",
+    transform: T.Optional[VectorTransform] = None,
+    batch_transform: T.Optional[BatchTransform] = None,
+    checkpoint_path: T.Optional[T.Union[str, Path]] = None,
+    segment_count: int = MAX_SEGMENT_COUNT,
+    page_size: int = MAX_LIST_PAGE_SIZE,
+    batch_size: int = MAX_VECTORS_PER_PUT,
+    max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> BulkWriteResult:
+    """
+    Copy all vectors of an index into another index. See
+    :meth:`~s3vectorm.index.Index.copy_to` for the parameters.
+    """
+    if (
+        transform is None
+        and batch_transform is None
+        and source.dimension != target.dimension
+    ):
+        raise ValueError(
+            f"the source index has {source.dimension} dimensions, "
+            f"the target index has {target.dimension}, use a transform"
+        )
+    if checkpoint_path is not None:
+        checkpoint_path = Path(checkpoint_path)
+    checkpoint = _CopyCheckpoint(checkpoint_path, segment_count)
+    if checkpoint.state["complete"]:
+        return BulkWriteResult(n_skipped=checkpoint.state["n_copied"])
+    n_copied_before = checkpoint.state["n_copied"]
+
+    def iter_vectors() -> T.Iterator["PutInputVectorTypeDef"]:
+        for segment_page in iter_segment_pages(
+            index=source,
+            s3_vectors_client=source_s3_vectors_client,
+            segment_count=checkpoint.state["segment_count"],
+            return_data=True,
+            return_metadata=True,
+            page_size=page_size,
+            starting_tokens=checkpoint.starting_tokens,
+        ):
+            vectors = []
+            for dct in segment_page.page.boto3_raw_data.get("vectors", []):
+                dct = {
+                    "key": dct["key"],
+                    "data": {
+                        target.data_type: dct["data"][source.data_type],
+                    },
+                    "metadata": dct.get("metadata", {}),
+                }
+                if transform is not None:
+                    dct = transform(dct)
+                    if dct is None:
+                        continue
+                vectors.append(dct)
+            if batch_transform is not None and vectors:
+                vectors = batch_transform(vectors)
+            checkpoint.add_page(
+                segment_index=segment_page.segment_index,
+                next_token=segment_page.next_token,
+                vectors=vectors,
+            )
+            yield from vectors
+
+    def iter_checkpointed_batches() -> T.Iterator[list["PutInputVectorTypeDef"]]:
+        for batch in iter_put_batches(
+            iter_vectors(),
+            max_vectors=batch_size,
+            max_payload_bytes=max_payload_bytes,
+        ):
+            checkpoint.add_batch(batch)
+            yield batch
+
+    result = run_batches(
+        batches=iter_checkpointed_batches(),
+        func=lambda batch: target._put_vector_dicts(
+            s3_vectors_client=target_s3_vectors_client,
+            dcts=batch,
+        ),
+        get_key=lambda dct: dct["key"],
+        max_workers=max_workers,
+        on_batch_done=checkpoint.on_batch_done,
+    )
+    result.n_skipped = n_copied_before
+    checkpoint.state["complete"] = all(
+        segment["done"] for segment in checkpoint.state["segments"].values()
+    )
+    checkpoint.save()
+    return result
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+"""
+Embed and Ingest Pipeline
+
+This module streams rows (e.g. text chunks) through an embedding function
+into an index, with the two stages running at the same time:
+
+1. **Embed**: the rows are grouped into batches of ``embed_batch_size`` and
+   passed to a user supplied ``embed`` function (a local model, or an
+   embedding API) on ``embed_workers`` threads.
+2. **Put**: each embedded row is turned into a :class:`~s3vectorm.vector.Vector`
+   by a ``to_vector`` function, and the vectors are sent with concurrent
+   batched ``put_vectors`` calls on ``put_workers`` threads.
+
+While the vectors of a batch are uploaded, the next batches are already
+being embedded. Both stages are bounded: at most ``max_pending_embeds``
+embedding batches and ``2 * put_workers`` put batches are in flight, so a
+slow stage makes the other one wait instead of buffering the whole input.
+
+Example:
+    >>> def embed(rows: list[dict]) -> list[list[float]]:
+    ...     res = bedrock_runtime.invoke_model(...)  # one call for the batch
+    ...     return res["embeddings"]
+    >>> def to_vector(row: dict, embedding: list[float]) -> DocChunk:
+    ...     return DocChunk(key=row["id"], data=embedding, document_id=row["doc"])
+    >>> result = index.ingest(
+    ...     s3_vectors_client,
+    ...     rows=iter_chunk_rows(),
+    ...     embed=embed,
+    ...     to_vector=to_vector,
+    ...     embed_batch_size=32,
+    ...     embed_workers=4,
+    ... )
+    >>> print(result.n_rows, result.put_result.n_succeeded)
+"""
+
+import typing as T
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+
+from .constants import (
+    MAX_VECTORS_PER_PUT,
+    MAX_PUT_PAYLOAD_BYTES,
+    DEFAULT_MAX_WORKERS,
+)
+from .bulk import BulkWriteResult, iter_batches, iter_put_batches, run_batches
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3vectors import S3VectorsClient
+    from mypy_boto3_s3vectors.type_defs import PutInputVectorTypeDef
+
+    from .index import Index
+    from .vector import Vector
+
+RowT = T.TypeVar("RowT")
+
+DEFAULT_EMBED_BATCH_SIZE = 64
+
+EmbedFunction = T.Callable[[list[RowT]], T.Sequence[T.Sequence[float]]]
+"""
+A function that takes a batch of rows and returns one embedding per row,
+in the same order.
+"""
+
+ToVectorFunction = T.Callable[[RowT, T.Sequence[float]], "Vector"]
+"""
+A function that takes a row and its embedding and returns the vector to put.
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class EmbedFailure:
+    """
+    Rows that could not be turned into vectors: a whole embedding batch when
+    the embed function failed or returned the wrong number of embeddings, a
+    single row when ``to_vector`` failed.
+
+    :param rows: The failed rows, e.g. to retry them later
+    :param error: The exception raised by the embed function or ``to_vector``,
+        or a ``ValueError`` for a wrong number of embeddings
+    """
+
+    rows: list[T.Any] = dataclasses.field()
+    error: Exception = dataclasses.field()
+
+
+@dataclasses.dataclass
+class IngestResult:
+    """
+    Summary of an ingestion.
+
+    :param n_rows: Number of input rows
+    :param n_embed_failed: Number of rows that could not be embedded or
+        turned into vectors
+    :param embed_failures: Details of each failure
+    :param put_result: Outcome of the ``put_vectors`` calls
+    """
+
+    n_rows: int = dataclasses.field(default=0)
+    n_embed_failed: int = dataclasses.field(default=0)
+    embed_failures: list[EmbedFailure] = dataclasses.field(default_factory=list)
+    put_result: BulkWriteResult = dataclasses.field(default_factory=BulkWriteResult)
+
+    @property
+    def ok(self) -> bool:
+        """Whether all rows were embedded and put."""
+        return self.n_embed_failed == 0 and self.put_result.ok
+
+
+def ingest(
+    index: "Index",
+    s3_vectors_client: "S3VectorsClient",
+    rows: T.Iterable[RowT],
+    embed: EmbedFunction,
+    to_vector: ToVectorFunction,
+    embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+    embed_workers: int = 1,
+    max_pending_embeds: int | None = None,
+    put_batch_size: int = MAX_VECTORS_PER_PUT,
+    max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+    put_workers: int = DEFAULT_MAX_WORKERS,
+) -> IngestResult:
+    """
+    Embed rows and put them into an index, with the embedding and the
+    upload overlapping. See :meth:`~s3vectorm.index.Index.ingest` for the
+    parameters.
+    """
+    if max_pending_embeds is None:
+        max_pending_embeds = 2 * embed_workers
+    max_pending_embeds = max(max_pending_embeds, 1)
+    result = IngestResult()
+
+    def iter_embedded(
+        future: Future,
+        batch: list[RowT],
+    ) -> T.Iterator["PutInputVectorTypeDef"]:
+        def add_failure(rows: list[RowT], error: Exception):
+            result.n_embed_failed += len(rows)
+            result.embed_failures.append(EmbedFailure(rows=rows, error=error))
+
+        error = future.exception()
+        if error is not None:
+            add_failure(batch, error)
+            return
+        embeddings = future.result()
+        if len(embeddings) != len(batch):
+            error = ValueError(
+                f"embed returned {len(embeddings)} embeddings for {len(batch)} rows"
+            )
+            add_failure(batch, error)
+            return
+        for row, embedding in zip(batch, embeddings):
+            try:
+                dct = to_vector(row, embedding).to_put_vectors_dict(
+                    data_type=index.data_type
+                )
+            except Exception as e:
+                add_failure([row], e)
+                continue
+            yield dct
+
+    def iter_put_dcts() -> T.Iterator["PutInputVectorTypeDef"]:
+        # runs in the calling thread, pulled by run_batches as it has room
+        with ThreadPoolExecutor(max_workers=embed_workers) as executor:
+            pending: dict[Future, list[RowT]] = {}
+            for batch in iter_batches(rows, embed_batch_size):
+                result.n_rows += len(batch)
+                if len(pending) >= max_pending_embeds:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from iter_embedded(future, pending.pop(future))
+                pending[executor.submit(embed, batch)] = batch
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from iter_embedded(future, pending.pop(future))
+
+    result.put_result = run_batches(
+        batches=iter_put_batches(
+            iter_put_dcts(),
+            max_vectors=put_batch_size,
+            max_payload_bytes=max_payload_bytes,
+        ),
+        func=lambda batch: index._put_vector_dicts(
+            s3_vectors_client=s3_vectors_client,
+            dcts=batch,
+        ),
+        get_key=lambda dct: dct["key"],
+        max_workers=put_workers,
+    )
+    return result
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+
+"""
+Metadata Filter Compiler
+
+This module compiles a metadata filter, an :class:`~s3vectorm.metadata.Expr` /
+:class:`~s3vectorm.metadata.CompoundExpr` tree or a raw filter document, into:
+
+- a Python predicate over a metadata dictionary (:func:`compile_filter`), and
+- a vectorized evaluator over columnar metadata that returns a boolean mask
+  (:func:`filter_mask`), e.g. over :attr:`s3vectorm.columnar.VectorBatch.metadata`.
+
+Both follow the S3 Vectors filtering semantics:
+
+- ``$eq`` / ``$ne`` / ``$in`` / ``$nin`` match strings, numbers and booleans
+  (a boolean never equals a number).
+- ``$gt`` / ``$gte`` / ``$lt`` / ``$lte`` only match numbers.
+- A list value matches if any of its elements matches; ``$ne`` / ``$nin``
+  match if none of its elements is excluded.
+- A vector without the field matches ``$ne``, ``$nin`` and
+  ``{"$exists": False}`` only.
+- ``{"field": value}`` is a shorthand for ``{"field": {"$eq": value}}``, and
+  several conditions in one document are combined with AND.
+
+Example:
+    >>> predicate = compile_filter(
+    ...     DocMeta.category.eq("news") & DocMeta.year.gte(2024)
+    ... )
+    >>> predicate({"category": "news", "year": 2025})
+    True
+
+Reference:
+    https://docs.aws.amazon.com/AmazonS3/latest/userguide/s3-vectors-metadata-filtering.html
+"""
+
+import typing as T
+import operator
+
+from .metadata import OperatorEnum, Expr, CompoundExpr
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+FilterLike = T.Union[Expr, CompoundExpr, dict[str, T.Any]]
+"""
+A filter expression, or a filter document as returned by ``to_doc()`` or ``to_canonical_doc()``.
+"""
+
+Predicate = T.Callable[[dict[str, T.Any]], bool]
+"""
+A function that takes the metadata of a vector and returns True if it matches.
+"""
+
+_MISSING = object()
+
+_AND = OperatorEnum.and_.value
+_OR = OperatorEnum.or_.value
+_EXISTS = OperatorEnum.exists.value
+_NEGATIVE_OPERATORS = {OperatorEnum.ne.value, OperatorEnum.nin.value}
+_RANGE_OPERATORS = {
+    OperatorEnum.gt.value: operator.gt,
+    OperatorEnum.gte.value: operator.ge,
+    OperatorEnum.lt.value: operator.lt,
+    OperatorEnum.lte.value: operator.le,
+}
+
+
+def to_filter_doc(filter: FilterLike) -> dict[str, T.Any]:
+    """
+    Get the filter document of a filter expression, a document is returned as-is.
+    """
+    if isinstance(filter, dict):
+        return filter
+    return filter.to_canonical_doc()
+
+
+def _is_number(value: T.Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _equality_key(value: T.Any) -> tuple[bool, T.Any]:
+    # keep ``True`` and ``1`` apart, they are equal and hash the same in Python
+    return (isinstance(value, bool), value)
+
+
+def _iter_conditions(
+    doc: dict[str, T.Any],
+) -> T.Iterator[tuple[str, str, T.Any]]:
+    """
+    Yield ``(field, operator, operand)`` for every condition of a document,
+    including ``$and`` / ``$or`` with their list of sub documents.
+    """
+    for field, condition in doc.items():
+        if field in (_AND, _OR):
+            if not isinstance(condition, list):
+                raise ValueError(
+                    f"{field} expects a list of filters, got {condition!r}"
+                )
+            yield field, field, condition
+        elif isinstance(condition, dict) and condition:
+            for op, operand in condition.items():
+                yield field, op, operand
+        else:
+            yield field, OperatorEnum.eq.value, condition
+
+
+def _compile_value_predicate(op: str, operand: T.Any) -> T.Callable[[T.Any], bool]:
+    """
+    Compile one condition into a predicate over the value of the field,
+    which is ``_MISSING`` if the vector does not have the field.
+    """
+    if op == _EXISTS:
+        if operand:
+            return lambda value: value is not _MISSING
+        return lambda value: value is _MISSING
+
+    if op in (OperatorEnum.eq.value, OperatorEnum.ne.value):
+        key = _equality_key(operand)
+
+        def match(value) -> bool:
+            return _equality_key(value) == key
+
+    elif op in (OperatorEnum.in_.value, OperatorEnum.nin.value):
+        if not isinstance(operand, list):
+            raise ValueError(f"{op} expects a list, got {operand!r}")
+        keys = {_equality_key(value) for value in operand}
+
+        def match(value) -> bool:
+            return _equality_key(value) in keys
+
+    elif op in _RANGE_OPERATORS:
+        compare = _RANGE_OPERATORS[op]
+        if not _is_number(operand):
+            raise ValueError(f"{op} expects a number, got {operand!r}")
+
+        def match(value) -> bool:
+            return _is_number(value) and compare(value, operand)
+
+    else:
+        raise ValueError(f"unsupported filter operator: {op!r}")
+
+    if op in _NEGATIVE_OPERATORS:
+
+        def predicate(value) -> bool:
+            if value is _MISSING:
+                return True
+            if isinstance(value, list):
+                return not any(match(v) for v in value)
+            return not match(value)
+
+    else:
+
+        def predicate(value) -> bool:
+            if value is _MISSING:
+                return False
+            if isinstance(value, list):
+                return any(match(v) for v in value)
+            return match(value)
+
+    return predicate
+
+
+def _compile_doc(doc: dict[str, T.Any]) -> Predicate:
+    predicates = []
+    for field, op, operand in _iter_conditions(doc):
+        if op == _AND:
+            predicates.append(_compile_all([_compile_doc(sub) for sub in operand]))
+        elif op == _OR:
+            subs = [_compile_doc(sub) for sub in operand]
+            predicates.append(
+                lambda metadata, subs=subs: any(p(metadata) for p in subs)
+            )
+        else:
+            value_predicate = _compile_value_predicate(op, operand)
+            predicates.append(
+                lambda metadata, field=field, value_predicate=value_predicate: (
+                    value_predicate(metadata.get(field, _MISSING))
+                )
+            )
+    return _compile_all(predicates)
+
+
+def _compile_all(predicates: list[Predicate]) -> Predicate:
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda metadata: all(p(metadata) for p in predicates)
+
+
+def compile_filter(filter: FilterLike) -> Predicate:
+    """
+    Compile a filter into a predicate over a metadata dictionary.
+
+    The filter is parsed and validated once, evaluating the returned function
+    only runs the comparisons.
+
+    :param filter: The filter expression or filter document
+
+    :returns: A function that takes the metadata dictionary of a vector and
+        returns True if the vector matches the filter
+
+    Raises:
+        ValueError: If the filter uses an unknown operator or an invalid operand
+
+    Example:
+        >>> predicate = compile_filter({"category": {"$in": ["news", "blog"]}})
+        >>> [dct["key"] for dct in vectors if predicate(dct.get("metadata", {}))]
+    """
+    return _compile_doc(to_filter_doc(filter))
+
+
+def _condition_mask(
+    column: T.Optional["np.ndarray"],
+    op: str,
+    operand: T.Any,
+    n: int,
+) -> "np.ndarray":
+    import numpy as np
+
+    value_predicate = _compile_value_predicate(op, operand)
+    if column is None:
+        return np.full(n, value_predicate(_MISSING))
+
+    kind = column.dtype.kind
+    if kind in "biuf":
+        # a numeric column has no missing value and no list value
+        if op == _EXISTS:
+            return np.full(n, bool(operand))
+        is_bool = kind == "b"
+        if op in _RANGE_OPERATORS:
+            if is_bool:
+                return np.zeros(n, dtype=bool)
+            return _RANGE_OPERATORS[op](column, operand)
+        operands = operand if isinstance(operand, list) else [operand]
+        operands = [
+            value
+            for value in operands
+            if (is_bool and isinstance(value, bool))
+            or (not is_bool and _is_number(value))
+        ]
+        mask = np.isin(column, operands)
+        if op in _NEGATIVE_OPERATORS:
+            mask = ~mask
+        return mask
+
+    # object column: strings, lists, or ``None`` for missing values
+    return np.fromiter(
+        (value_predicate(_MISSING if value is None else value) for value in column),
+        dtype=bool,
+        count=n,
+    )
+
+
+def _doc_mask(
+    doc: dict[str, T.Any],
+    columns: T.Mapping[str, "np.ndarray"],
+    n: int,
+) -> "np.ndarray":
+    import numpy as np
+
+    mask = np.ones(n, dtype=bool)
+    for field, op, operand in _iter_conditions(doc):
+        if op == _AND:
+            for sub in operand:
+                mask &= _doc_mask(sub, columns, n)
+        elif op == _OR:
+            any_mask = np.zeros(n, dtype=bool)
+            for sub in operand:
+                any_mask |= _doc_mask(sub, columns, n)
+            mask &= any_mask
+        else:
+            mask &= _condition_mask(columns.get(field), op, operand, n)
+    return mask
+
+
+def filter_mask(
+    filter: FilterLike,
+    columns: T.Mapping[str, "np.ndarray"],
+    n: int | None = None,
+) -> "np.ndarray":
+    """
+    Evaluate a filter over columnar metadata.
+
+    Numeric and boolean columns are compared with NumPy array operations.
+    Object columns (strings, lists, or columns with missing values stored as
+    ``None``, see :class:`~s3vectorm.columnar.VectorBatch`) are evaluated
+    element by element with the compiled predicate.
+
+    .. note::
+
+        This function requires ``numpy``.
+
+    :param filter: The filter expression or filter document
+    :param columns: Mapping from metadata key to a 1-D array of values.
+        A missing key means no row has this metadata.
+    :param n: The number of rows, only required if ``columns`` is empty
+
+    :returns: A 1-D boolean array, True for the rows that match the filter
+
+    Example:
+        >>> mask = filter_mask(DocMeta.year.gte(2024), batch.metadata, len(batch))
+        >>> batch.keys[mask]
+    """
+    if n is None:
+        if not columns:
+            raise ValueError("n is required when there is no column")
+        n = len(next(iter(columns.values())))
+    return _doc_mask(to_filter_doc(filter), columns, n)
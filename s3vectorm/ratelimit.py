@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+
+"""
+Adaptive Rate Limiting
+
+This module provides :class:`AdaptiveRateLimiter`, a thread-safe controller
+that paces write calls (``put_vectors``, ``delete_vectors``) to the rate the
+service accepts, instead of letting every worker retry into a throttling storm.
+
+It combines:
+
+- a token bucket, which spaces the calls out at the current request rate,
+- an adaptive concurrency limit, the maximum number of calls in flight,
+- AIMD (additive increase, multiplicative decrease): every successful call
+  slowly raises the rate and the concurrency, a throttling error (or a
+  response that botocore only got after retries, or a latency above the
+  target) cuts them by a factor,
+- throttle-aware retries with exponential backoff and full jitter.
+
+Share one limiter between all the threads and indexes that write to the same
+vector bucket:
+
+Example:
+    >>> limiter = AdaptiveRateLimiter(initial_rate=20, max_concurrency=16)
+    >>> index.rate_limiter = limiter
+    >>> index.put_vectors_bulk(s3_vectors_client, vectors, max_workers=16)
+    >>> limiter.rate, limiter.concurrency
+
+Since the limiter does its own retries, botocore's retries are best kept low,
+for example with ``botocore.config.Config(retries={"max_attempts": 1})``,
+otherwise every throttled call is retried by botocore before the limiter
+sees it.
+"""
+
+import typing as T
+import time
+import random
+import threading
+import contextlib
+
+import botocore.exceptions
+
+from .constants import THROTTLING_ERROR_CODES, DEFAULT_MAX_WORKERS
+
+R = T.TypeVar("R")
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """
+    Check if an exception is a throttling ``ClientError``.
+    """
+    return (
+        isinstance(error, botocore.exceptions.ClientError)
+        and error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+    )
+
+
+class AdaptiveRateLimiter:
+    """
+    A thread-safe token bucket rate limiter with AIMD rate and concurrency control.
+
+    :param initial_rate: The starting request rate, in calls per second
+    :param min_rate: The rate never drops below this value
+    :param max_rate: The rate never grows above this value
+    :param additive_increase: How much the rate grows, in calls per second,
+        per second of successful calls at the current rate
+    :param multiplicative_decrease: The factor applied to the rate and the
+        concurrency on a congestion signal, between 0 and 1
+    :param max_concurrency: The maximum number of calls in flight, usually the
+        ``max_workers`` of the bulk operation
+    :param min_concurrency: The concurrency never drops below this value
+    :param latency_target: Optional latency in seconds, a successful call
+        slower than this is a congestion signal
+    :param cooldown: Minimum number of seconds between two decreases, so the
+        many calls in flight that are throttled at the same time only cut the
+        rate once
+    :param max_retries: Maximum number of retries of a throttled call
+    :param base_delay: Base delay of the exponential backoff in seconds
+    :param max_delay: Maximum delay of the exponential backoff in seconds
+    :param clock: The monotonic clock, in seconds
+    :param sleep: The function used to wait, in seconds
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 10.0,
+        min_rate: float = 0.5,
+        max_rate: float = 1000.0,
+        additive_increase: float = 1.0,
+        multiplicative_decrease: float = 0.5,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        min_concurrency: int = 1,
+        latency_target: float | None = None,
+        cooldown: float = 1.0,
+        max_retries: int = 8,
+        base_delay: float = 0.1,
+        max_delay: float = 20.0,
+        clock: T.Callable[[], float] = time.monotonic,
+        sleep: T.Callable[[float], None] = time.sleep,
+    ):
+        if not (0 < min_rate <= initial_rate <= max_rate):
+            raise ValueError("expect 0 < min_rate <= initial_rate <= max_rate")
+        if not (0 < multiplicative_decrease < 1):
+            raise ValueError("multiplicative_decrease must be between 0 and 1")
+        if not (1 <= min_concurrency <= max_concurrency):
+            raise ValueError("expect 1 <= min_concurrency <= max_concurrency")
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.additive_increase = additive_increase
+        self.multiplicative_decrease = multiplicative_decrease
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._sleep = sleep
+
+        self._rate = float(initial_rate)
+        self._concurrency = float(max_concurrency)
+        self._tokens = 1.0
+        self._last_refill = clock()
+        self._last_decrease = float("-inf")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._slot_available = threading.Condition(self._lock)
+
+        self.n_calls = 0
+        self.n_throttled = 0
+
+    @property
+    def rate(self) -> float:
+        """The current request rate, in calls per second."""
+        return self._rate
+
+    @property
+    def concurrency(self) -> int:
+        """The current maximum number of calls in flight."""
+        return int(self._concurrency)
+
+    def _refill(self, now: float):
+        # the bucket holds at most one second worth of tokens
+        capacity = max(1.0, self._rate)
+        elapsed = now - self._last_refill
+        self._tokens = min(capacity, self._tokens + elapsed * self._rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """
+        Block until the token bucket allows one more call.
+
+        The token is reserved immediately (the bucket may go negative), so the
+        waiting callers are served in order and never spin.
+        """
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+
+    @contextlib.contextmanager
+    def slot(self) -> T.Iterator[None]:
+        """
+        Context manager that blocks until the number of calls in flight is
+        below the current concurrency limit.
+        """
+        with self._slot_available:
+            while self._in_flight >= int(self._concurrency):
+                self._slot_available.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._slot_available:
+                self._in_flight -= 1
+                self._slot_available.notify()
+
+    def on_success(self, latency: float = 0.0):
+        """
+        Record a successful call, which raises the rate and the concurrency,
+        unless ``latency`` is above the ``latency_target``.
+        """
+        if self.latency_target is not None and latency > self.latency_target:
+            self.on_congestion()
+            return
+        with self._slot_available:
+            self.n_calls += 1
+            # at rate r there are about r successes per second, so the rate
+            # grows by ``additive_increase`` per second
+            self._rate = min(
+                self.max_rate, self._rate + self.additive_increase / self._rate
+            )
+            # the concurrency grows by one per "window" of successful calls
+            before = int(self._concurrency)
+            self._concurrency = min(
+                float(self.max_concurrency),
+                self._concurrency + 1 / self._concurrency,
+            )
+            if int(self._concurrency) > before:
+                self._slot_available.notify()
+
+    def on_congestion(self):
+        """
+        Record a congestion signal, which cuts the rate and the concurrency by
+        ``multiplicative_decrease``, at most once per ``cooldown`` seconds.
+        """
+        with self._lock:
+            self.n_calls += 1
+            now = self._clock()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._rate = max(self.min_rate, self._rate * self.multiplicative_decrease)
+            self._concurrency = max(
+                float(self.min_concurrency),
+                self._concurrency * self.multiplicative_decrease,
+            )
+
+    def on_throttle(self):
+        """
+        Record a throttled call.
+        """
+        with self._lock:
+            self.n_throttled += 1
+        self.on_congestion()
+
+    def get_backoff_delay(self, attempt: int) -> float:
+        """
+        Get the delay before retry number ``attempt`` (starting from 0),
+        exponential backoff with full jitter.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def call(
+        self,
+        func: T.Callable[..., R],
+        *args,
+        **kwargs,
+    ) -> R:
+        """
+        Call ``func`` within the rate and concurrency limits, retrying it with
+        backoff when it raises a throttling error.
+
+        A response whose ``ResponseMetadata.RetryAttempts`` is not zero means
+        botocore already had to retry, it is recorded as a congestion signal.
+
+        Raises:
+            botocore.exceptions.ClientError: The throttling error, once
+                ``max_retries`` retries are exhausted, or any other error
+                raised by ``func``, without retry.
+        """
+        attempt = 0
+        while True:
+            with self.slot():
+                self.acquire()
+                start = self._clock()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    if not is_throttling_error(e):
+                        raise
+                    self.on_throttle()
+                    if attempt >= self.max_retries:
+                        raise
+                else:
+                    retry_attempts = 0
+                    if isinstance(result, dict):
+                        response_metadata = result.get("ResponseMetadata", {})
+                        retry_attempts = response_metadata.get("RetryAttempts", 0)
+                    if retry_attempts:
+                        self.on_congestion()
+                    else:
+                        self.on_success(self._clock() - start)
+                    return result
+            self._sleep(self.get_backoff_delay(attempt))
+            attempt += 1
@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local Index Replica
+
+This module provides :class:`LocalReplica`, a read-only local copy of an
+index for offline exact search, e.g. to run millions of evaluation queries
+without a ``query_vectors`` call for each of them.
+
+A replica is a snapshot directory (see :mod:`s3vectorm.snapshot`):
+
+- the vector data is memory-mapped, it is not loaded into memory. Worker
+  processes that open the same directory share the pages of the operating
+  system's page cache instead of holding their own copy, and a pickled
+  replica only carries its path, so it is cheap to send to a
+  ``multiprocessing`` / ``concurrent.futures`` worker.
+- the keys and the metadata columns are loaded into NumPy arrays, the
+  metadata filters are evaluated with :func:`~s3vectorm.predicate.filter_mask`.
+
+Searches are exact and vectorized over a batch of queries, with the
+distance metric of the index. :meth:`LocalReplica.refresh` brings the replica
+up to date by fetching only the new and changed vectors: the files are
+append-only, superseded rows are marked as deleted. Once the deleted rows
+exceed a share of the files, the refresh rewrites the files with only the
+live rows, see :meth:`LocalReplica.compact`.
+
+.. note::
+
+    This module requires ``numpy``, install it with ``pip install "s3vectorm[numpy]"``.
+
+Example:
+    >>> replica = LocalReplica.build(index, s3_vectors_client, "replicas/documents")
+    >>> keys, distances = replica.search(query_matrix, top_k=10,
+    ...     filter=DocMeta.year.gte(2024))
+    >>> result = replica.refresh(index, s3_vectors_client)
+"""
+
+import typing as T
+import json
+import uuid
+import shutil
+import dataclasses
+from pathlib import Path
+
+import numpy as np
+
+from .constants import (
+    MAX_KEYS_PER_GET,
+    MAX_LIST_PAGE_SIZE,
+    MAX_SEGMENT_COUNT,
+)
+from .bulk import iter_batches
+from .columnar import VectorBatch, to_column
+from .predicate import filter_mask
+from .snapshot import (
+    MANIFEST_FILE,
+    KEYS_FILE,
+    VECTORS_FILE,
+    METADATA_DIR,
+    read_manifest,
+    read_deleted_rows,
+    export_snapshot,
+    SnapshotWriter,
+)
+from .utils import write_json_atomic
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3vectors import S3VectorsClient
+
+    from .index import Index
+    from .predicate import FilterLike
+
+DEFAULT_CHUNK_SIZE = 65536
+"""
+Number of rows compared with the queries at a time, it bounds the memory
+used by a search to about ``n_queries * chunk_size * 8`` bytes.
+"""
+
+DEFAULT_MAX_DELETED_RATIO = 0.5
+"""
+Share of deleted rows above which :meth:`LocalReplica.refresh` compacts the
+replica.
+"""
+
+
+def _read_lines(path: Path, size: int, n: int) -> list[T.Any]:
+    """
+    Read the first ``n`` JSON lines from the first ``size`` bytes of a file.
+    """
+    with open(path, "rb") as f:
+        lines = f.read(size).splitlines()
+    return [json.loads(line) for line in lines[:n]]
+
+
+@dataclasses.dataclass
+class RefreshResult:
+    """
+    Summary of a :meth:`LocalReplica.refresh`.
+
+    :param n_added: Number of vectors that were not in the replica
+    :param n_updated: Number of vectors of the replica that were fetched again
+    :param n_deleted: Number of vectors of the replica that are no longer in
+        the index
+    :param compacted: Whether the refresh compacted the replica
+    """
+
+    n_added: int = dataclasses.field(default=0)
+    n_updated: int = dataclasses.field(default=0)
+    n_deleted: int = dataclasses.field(default=0)
+    compacted: bool = dataclasses.field(default=False)
+
+
+class LocalReplica:
+    """
+    A memory-mapped, read-only local copy of an index.
+
+    :param path: A complete snapshot directory, e.g. created by :meth:`build`
+        or :meth:`~s3vectorm.index.Index.export_snapshot`
+
+    Attributes:
+        keys: 1-D object array of the keys of all rows
+        data: ``(n_rows, dimension)`` float32 memory map of the vector data
+        metadata: Mapping from metadata key to a 1-D array over all rows
+        live: 1-D boolean array, False for the deleted rows
+
+    .. note::
+
+        Only one process should :meth:`refresh` a replica at a time. The
+        other processes keep searching their current view, and see the
+        changes after :meth:`reload`.
+    """
+
+    def __init__(self, path: T.Union[str, Path]):
+        self.path = Path(path)
+        self.reload()
+
+    def __getstate__(self) -> dict[str, T.Any]:
+        # only send the path, the receiving process maps the files itself
+        return {"path": str(self.path)}
+
+    def __setstate__(self, state: dict[str, T.Any]):
+        self.__init__(state["path"])
+
+    def __len__(self) -> int:
+        """Number of vectors, the deleted rows are not counted."""
+        return len(self._rows)
+
+    @classmethod
+    def build(
+        cls,
+        index: "Index",
+        s3_vectors_client: "S3VectorsClient",
+        path: T.Union[str, Path],
+        segment_count: int = MAX_SEGMENT_COUNT,
+        page_size: int = MAX_LIST_PAGE_SIZE,
+        resume: bool = True,
+    ) -> "LocalReplica":
+        """
+        Export an index to a snapshot directory and open it as a replica,
+        see :func:`~s3vectorm.snapshot.export_snapshot` for the parameters.
+        """
+        export_snapshot(
+            index=index,
+            s3_vectors_client=s3_vectors_client,
+            path=path,
+            segment_count=segment_count,
+            page_size=page_size,
+            resume=resume,
+        )
+        return cls(path)
+
+    def reload(self):
+        """
+        Map the files again, to see the changes of a :meth:`refresh` made by
+        another process.
+
+        The rows are append-only, so the squared norms of the rows that were
+        already loaded are kept, only the new rows are computed.
+        """
+        path = self.path
+        manifest = read_manifest(path)
+        if not manifest["complete"]:
+            raise ValueError(f"snapshot {path} is incomplete, resume the export first")
+        previous_manifest = getattr(self, "manifest", None)
+        self.manifest = manifest
+        self.distance_metric: str = manifest["index"]["distance_metric"]
+        dimension: int = manifest["index"]["dimension"]
+        n: int = manifest["n_vectors"]
+        file_sizes = manifest["file_sizes"]
+
+        if n:
+            self.data = np.memmap(
+                path / VECTORS_FILE, dtype="<f4", mode="r", shape=(n, dimension)
+            )
+        else:
+            self.data = np.empty((0, dimension), dtype=np.float32)
+        self.keys = np.empty(n, dtype=object)
+        self.keys[:] = _read_lines(path / KEYS_FILE, file_sizes[KEYS_FILE], n)
+        self.metadata: dict[str, np.ndarray] = {
+            field: to_column(_read_lines(path / relpath, file_sizes[relpath], n))
+            for field, relpath in manifest["columns"].items()
+        }
+        self.live = np.ones(n, dtype=bool)
+        deleted_rows = read_deleted_rows(path)
+        if deleted_rows:
+            self.live[list(deleted_rows)] = False
+        self._rows: dict[str, int] = {
+            key: row
+            for row, key in enumerate(self.keys.tolist())
+            if row not in deleted_rows
+        }
+
+        # squared norms of the rows, computed once per row
+        n_known = 0
+        if (
+            previous_manifest is not None
+            and previous_manifest.get("snapshot_id") == manifest.get("snapshot_id")
+            and previous_manifest["n_vectors"] <= n
+        ):
+            n_known = previous_manifest["n_vectors"]
+        squared_norms = np.empty(n, dtype=np.float32)
+        if n_known:
+            squared_norms[:n_known] = self._squared_norms[:n_known]
+        for start in range(n_known, n, DEFAULT_CHUNK_SIZE):
+            chunk = self.data[start : start + DEFAULT_CHUNK_SIZE]
+            squared_norms[start : start + len(chunk)] = np.einsum(
+                "ij,ij->i", chunk, chunk
+            )
+        self._squared_norms = squared_norms
+
+    @property
+    def deleted_ratio(self) -> float:
+        """Share of the rows of the files that are deleted."""
+        n = len(self.keys)
+        return (n - len(self._rows)) / n if n else 0.0
+
+    def compact(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Rewrite the files with only the live rows, and reload.
+
+        :meth:`refresh` never rewrites a row, it appends the new version and
+        marks the old one as deleted, so the files of a replica that is
+        refreshed often keep growing. A refresh compacts the replica
+        automatically, see its ``max_deleted_ratio``.
+
+        The compacted files are written to a ``<path>.compact`` directory,
+        which then replaces the replica directory. The processes that still
+        map the old files keep searching them until they :meth:`reload`.
+
+        :param chunk_size: Number of rows copied at a time
+        """
+        path = self.path
+        tmp_path = path.with_name(path.name + ".compact")
+        old_path = path.with_name(path.name + ".old")
+        for p in (tmp_path, old_path):
+            shutil.rmtree(p, ignore_errors=True)
+        tmp_path.mkdir()
+
+        manifest = dict(self.manifest)
+        manifest.pop("n_deleted", None)
+        manifest["snapshot_id"] = uuid.uuid4().hex
+        manifest["n_vectors"] = len(self._rows)
+        rows = np.flatnonzero(self.live)
+        with open(tmp_path / VECTORS_FILE, "wb") as f:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start : start + chunk_size]
+                np.asarray(self.data[chunk], dtype="<f4").tofile(f)
+        # copy the JSON lines as they are, so that no metadata value is upcast
+        (tmp_path / METADATA_DIR).mkdir()
+        line_files = [KEYS_FILE, *manifest["columns"].values()]
+        for relpath in line_files:
+            with open(path / relpath, "rb") as f:
+                lines = f.read(manifest["file_sizes"][relpath]).splitlines(True)
+            with open(tmp_path / relpath, "wb") as f:
+                f.writelines(lines[row] for row in rows.tolist())
+        manifest["file_sizes"] = {
+            relpath: (tmp_path / relpath).stat().st_size
+            for relpath in [VECTORS_FILE, *line_files]
+        }
+        write_json_atomic(tmp_path / MANIFEST_FILE, manifest)
+
+        path.rename(old_path)
+        tmp_path.rename(path)
+        shutil.rmtree(old_path)
+        # the norms of the live rows are still valid
+        self._squared_norms = self._squared_norms[rows]
+        self.manifest = manifest
+        self.reload()
+
+    def get_metadata(self, key: str) -> dict[str, T.Any]:
+        """
+        Get the metadata of a vector.
+
+        :raises KeyError: If the replica does not have the vector
+        """
+        row = self._rows[key]
+        metadata = {}
+        for field, column in self.metadata.items():
+            value = column[row]
+            if value is not None:
+                metadata[field] = (
+                    value.item() if isinstance(value, np.generic) else value
+                )
+        return metadata
+
+    def _search_rows(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        filter: T.Optional["FilterLike"],
+        chunk_size: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the ``top_k`` nearest rows of each query.
+
+        :returns: ``(rows, distances)``, two ``(n_queries, k)`` arrays sorted
+            by distance, ``k`` is ``top_k`` or the number of candidate rows
+            if it is smaller
+        """
+        n = len(self.keys)
+        mask = self.live
+        if filter is not None:
+            mask = mask & filter_mask(filter, self.metadata, n)
+        all_rows = bool(mask.all())
+        k = min(top_k, int(mask.sum()))
+        n_queries = len(queries)
+        best_rows = np.empty((n_queries, 0), dtype=np.int64)
+        best_distances = np.empty((n_queries, 0), dtype=np.float32)
+        if k == 0:
+            return best_rows, best_distances
+
+        cosine = self.distance_metric == "cosine"
+        query_squared_norms = np.einsum("ij,ij->i", queries, queries)
+        query_norms = np.sqrt(query_squared_norms)
+        for start in range(0, n, chunk_size):
+            end = min(start + chunk_size, n)
+            if all_rows:
+                rows = np.arange(start, end)
+                data = self.data[start:end]
+            else:
+                rows = start + np.flatnonzero(mask[start:end])
+                if len(rows) == 0:
+                    continue
+                data = self.data[rows]
+            dots = queries @ data.T
+            if cosine:
+                norms = np.outer(query_norms, np.sqrt(self._squared_norms[rows]))
+                norms[norms == 0] = 1.0
+                distances = 1.0 - dots / norms
+            else:
+                distances = (
+                    query_squared_norms[:, None]
+                    + self._squared_norms[rows][None, :]
+                    - 2.0 * dots
+                )
+                np.maximum(distances, 0.0, out=distances)
+                np.sqrt(distances, out=distances)
+
+            # merge the chunk into the running top k
+            candidate_distances = np.concatenate([best_distances, distances], axis=1)
+            candidate_rows = np.concatenate(
+                [best_rows, np.broadcast_to(rows, distances.shape)], axis=1
+            )
+            if candidate_distances.shape[1] > k:
+                top = np.argpartition(candidate_distances, k - 1, axis=1)[:, :k]
+                candidate_distances = np.take_along_axis(candidate_distances, top, 1)
+                candidate_rows = np.take_along_axis(candidate_rows, top, 1)
+            best_distances, best_rows = candidate_distances, candidate_rows
+
+        order = np.lexsort((best_rows, best_distances), axis=-1)
+        return (
+            np.take_along_axis(best_rows, order, 1),
+            np.take_along_axis(best_distances, order, 1),
+        )
+
+    def search(
+        self,
+        queries: T.Union[np.ndarray, T.Sequence[T.Sequence[float]]],
+        top_k: int = 10,
+        filter: T.Optional["FilterLike"] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Exact k nearest neighbor search for a batch of queries.
+
+        :param queries: ``(n_queries, dimension)`` matrix, or one query vector
+        :param top_k: Number of nearest vectors per query
+        :param filter: Optional metadata filter, the same as
+            :meth:`~s3vectorm.index.Index.query_vectors`
+        :param chunk_size: Number of rows compared with the queries at a time
+
+        :returns: ``(keys, distances)``, an object array and a float32 array
+            of shape ``(n_queries, k)``, sorted by distance. ``k`` is
+            ``top_k``, or the number of matching vectors if it is smaller.
+            For one query vector, both are 1-D.
+
+        Example:
+            >>> keys, distances = replica.search(query_matrix, top_k=10)
+            >>> recall = np.mean([len(set(a) & set(b)) / 10
+            ...     for a, b in zip(keys, expected_keys)])
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        if single:
+            queries = queries[None, :]
+        rows, distances = self._search_rows(queries, top_k, filter, chunk_size)
+        keys = self.keys[rows]
+        if single:
+            return keys[0], distances[0]
+        return keys, distances
+
+    def query_vectors(
+        self,
+        data: T.Union[np.ndarray, T.Sequence[float]],
+        top_k: int = 10,
+        filter: T.Optional["FilterLike"] = None,
+        return_data: bool = False,
+    ) -> VectorBatch:
+        """
+        Exact k nearest neighbor search for one query, with the distances
+        and the metadata of the results.
+
+        :param data: The query vector
+        :param top_k: Number of nearest vectors
+        :param filter: Optional metadata filter
+        :param return_data: Whether to include the vector data
+
+        :returns: A :class:`~s3vectorm.columnar.VectorBatch` sorted by distance
+        """
+        queries = np.asarray(data, dtype=np.float32)[None, :]
+        rows, distances = self._search_rows(queries, top_k, filter, DEFAULT_CHUNK_SIZE)
+        rows = rows[0]
+        return VectorBatch(
+            keys=self.keys[rows],
+            data=np.asarray(self.data[rows]) if return_data else None,
+            distances=distances[0],
+            metadata={field: column[rows] for field, column in self.metadata.items()},
+        )
+
+    def refresh(
+        self,
+        index: "Index",
+        s3_vectors_client: "S3VectorsClient",
+        keys: T.Optional[T.Iterable[str]] = None,
+        segment_count: int = MAX_SEGMENT_COUNT,
+        page_size: int = MAX_LIST_PAGE_SIZE,
+        max_deleted_ratio: T.Optional[float] = DEFAULT_MAX_DELETED_RATIO,
+    ) -> RefreshResult:
+        """
+        Bring the replica up to date with the index.
+
+        Without ``keys``, the keys and the metadata of the index are listed
+        (without the vector data), and only the vectors that are new or whose
+        metadata changed are fetched with ``get_vectors``. A change of the
+        vector data alone is only detected if the metadata carries a content
+        hash, e.g. the ``hash_key`` of
+        :meth:`~s3vectorm.index.Index.sync_vectors`.
+
+        With ``keys`` (e.g. the keys written since the last refresh), only
+        those vectors are fetched, the ones that are no longer in the index
+        are deleted from the replica.
+
+        :param index: The index the replica was built from
+        :param s3_vectors_client: The AWS S3 Vectors client to use
+        :param keys: Optional keys of the vectors that may have changed
+        :param segment_count: Number of segments to list in parallel
+        :param page_size: Number of vectors per list page
+        :param max_deleted_ratio: :meth:`compact` the replica when the share
+            of deleted rows exceeds this ratio, ``None`` to never compact
+        """
+        if keys is None:
+            listed: dict[str, dict[str, T.Any]] = {}
+            for page in index.scan_vectors(
+                s3_vectors_client=s3_vectors_client,
+                segment_count=segment_count,
+                return_metadata=True,
+                page_size=page_size,
+            ):
+                for dct in page.boto3_raw_data.get("vectors", []):
+                    listed[dct["key"]] = dct.get("metadata", {})
+            to_fetch = [
+                key
+                for key, metadata in listed.items()
+                if key not in self._rows or metadata != self.get_metadata(key)
+            ]
+            missing = [key for key in self._rows if key not in listed]
+        else:
+            to_fetch = list(dict.fromkeys(keys))
+            missing = []
+
+        fetched = []
+        for chunk in iter_batches(to_fetch, MAX_KEYS_PER_GET):
+            res = index.get_vectors(
+                s3_vectors_client=s3_vectors_client,
+                keys=chunk,
+                return_data=True,
+                return_metadata=True,
+            )
+            fetched.extend(res.boto3_raw_data.get("vectors", []))
+        if keys is not None:
+            found = {dct["key"] for dct in fetched}
+            missing = [
+                key for key in to_fetch if key not in found and key in self._rows
+            ]
+
+        updated_rows = [
+            self._rows[dct["key"]] for dct in fetched if dct["key"] in self._rows
+        ]
+        result = RefreshResult(
+            n_added=len(fetched) - len(updated_rows),
+            n_updated=len(updated_rows),
+            n_deleted=len(missing),
+        )
+        if fetched or missing:
+            writer = SnapshotWriter(self.path, read_manifest(self.path))
+            try:
+                writer.update(
+                    vectors=fetched,
+                    deleted_rows=updated_rows + [self._rows[key] for key in missing],
+                )
+            finally:
+                writer.close()
+            self.reload()
+            if max_deleted_ratio is not None and self.deleted_ratio > max_deleted_ratio:
+                self.compact()
+                result.compacted = True
+        return result
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+"""
+Segment-Parallel Scan Engine
+
+The ``list_vectors`` API can split an index into up to 16 disjoint segments
+(``segmentCount`` / ``segmentIndex``) that can be listed independently. This
+module runs one paginator per segment on a worker pool and merges all pages
+into a single stream:
+
+- Every segment worker prefetches its next page while the consumer is still
+  processing the previous one.
+- Pages are handed over through a bounded queue, so a slow consumer applies
+  back pressure to the workers and memory usage stays bounded.
+- If the consumer stops early (``break`` or garbage collection of the
+  generator), all workers are told to stop.
+
+Example:
+    >>> for page in index.scan_vectors(s3_vectors_client, segment_count=8):
+    ...     print(len(page.vectors))
+"""
+
+import typing as T
+import queue
+import threading
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+
+from .constants import MAX_SEGMENT_COUNT
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3vectors import S3VectorsClient
+
+    from .index import Index, ListVectorsOutput
+
+
+@dataclasses.dataclass(frozen=True)
+class SegmentPage:
+    """
+    A page of the ``list_vectors`` result, tagged with the segment it came from.
+
+    :param segment_index: The segment that produced this page (0-based)
+    :param page: The page itself
+    """
+
+    segment_index: int = dataclasses.field()
+    page: "ListVectorsOutput" = dataclasses.field()
+
+    @property
+    def next_token(self) -> str | None:
+        """
+        The token to continue listing this segment after this page,
+        ``None`` if this is the last page of the segment.
+        """
+        return self.page.boto3_raw_data.get("nextToken")
+
+
+@dataclasses.dataclass(frozen=True)
+class _SegmentDone:
+    segment_index: int = dataclasses.field()
+
+
+@dataclasses.dataclass(frozen=True)
+class _SegmentError:
+    segment_index: int = dataclasses.field()
+    error: BaseException = dataclasses.field()
+
+
+def _put_until_stopped(
+    q: queue.Queue,
+    item: T.Any,
+    stop: threading.Event,
+    poll_interval: float = 0.1,
+) -> bool:
+    """
+    Put an item into a bounded queue, give up if the consumer has stopped.
+
+    :returns: True if the item was put into the queue, False if stopped.
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=poll_interval)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def iter_segment_pages(
+    index: "Index",
+    s3_vectors_client: "S3VectorsClient",
+    segment_count: int = MAX_SEGMENT_COUNT,
+    return_data: bool = False,
+    return_metadata: bool = False,
+    page_size: int = 100,
+    max_workers: int | None = None,
+    queue_size: int | None = None,
+    starting_tokens: T.Optional[T.Mapping[int, T.Optional[str]]] = None,
+) -> T.Generator[SegmentPage, None, None]:
+    """
+    Scan all segments of an index concurrently and yield pages as they arrive.
+
+    Pages of the same segment are yielded in order, pages of different
+    segments are interleaved in arrival order.
+
+    :param index: The index to scan
+    :param s3_vectors_client: The AWS S3 Vectors client to use for the operation
+    :param segment_count: Number of segments (1 - 16)
+    :param return_data: Whether to include vector data in the results
+    :param return_metadata: Whether to include metadata in the results
+    :param page_size: Number of vectors per page
+    :param max_workers: Number of worker threads, default to ``segment_count``
+    :param queue_size: Maximum number of pages buffered between the workers
+        and the consumer, default to ``2 * segment_count``
+    :param starting_tokens: Optional mapping from segment index to the
+        ``nextToken`` to resume that segment from (``None`` to start it from
+        the beginning), only the segments in the mapping are scanned. Use
+        :attr:`SegmentPage.next_token` to resume an interrupted scan.
+
+    :yields: :class:`SegmentPage` objects
+    """
+    if not (1 <= segment_count <= MAX_SEGMENT_COUNT):
+        raise ValueError(
+            f"segment_count must be between 1 and {MAX_SEGMENT_COUNT}, "
+            f"got {segment_count}"
+        )
+    if starting_tokens is None:
+        starting_tokens = dict.fromkeys(range(segment_count))
+    if max_workers is None:
+        max_workers = segment_count
+    if queue_size is None:
+        queue_size = 2 * segment_count
+
+    q = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def scan_segment(segment_index: int):
+        kwargs = dict(
+            s3_vectors_client=s3_vectors_client,
+            return_data=return_data,
+            return_metadata=return_metadata,
+            page_size=page_size,
+            max_items=None,
+        )
+        if segment_count > 1:
+            kwargs["segment_count"] = segment_count
+            kwargs["segment_index"] = segment_index
+        if starting_tokens[segment_index] is not None:
+            kwargs["starting_token"] = starting_tokens[segment_index]
+        try:
+            for page in index.list_vectors(**kwargs):
+                item = SegmentPage(segment_index=segment_index, page=page)
+                if not _put_until_stopped(q, item, stop):
+                    return
+            _put_until_stopped(q, _SegmentDone(segment_index), stop)
+        except BaseException as e:
+            _put_until_stopped(q, _SegmentError(segment_index, e), stop)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for segment_index in starting_tokens:
+            executor.submit(scan_segment, segment_index)
+        n_done = 0
+        while n_done < len(starting_tokens):
+            item = q.get()
+            if isinstance(item, SegmentPage):
+                yield item
+            elif isinstance(item, _SegmentDone):
+                n_done += 1
+            else:
+                raise item.error
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+
+"""
+Index Snapshots
+
+This module exports the vectors of an index to a directory of compact local
+files, and imports them back into an index, e.g. for backups or to clone an
+index into another environment.
+
+A snapshot directory contains:
+
+- ``manifest.json``: the index configuration, the number of vectors, the
+  list of metadata columns and the export progress
+- ``keys.jsonl``: one JSON string (the vector key) per line
+- ``vectors.f32``: the vector data, a row-major little-endian float32 matrix
+  of ``n_vectors`` rows and ``dimension`` columns, without header. With NumPy:
+  ``np.fromfile(path, dtype="<f4").reshape(-1, dimension)``, or
+  ``np.memmap`` for large snapshots.
+- ``metadata/<n>.jsonl``: one file per metadata key (see the ``columns`` of
+  the manifest), one JSON value per line, ``null`` if the vector does not
+  have this metadata
+- ``deleted.jsonl`` (optional): the numbers of the rows that were deleted or
+  replaced by a later row, one per line. An export does not write it, it
+  comes from refreshing a :class:`~s3vectorm.replica.LocalReplica`.
+
+Both directions stream, the memory usage does not depend on the number of
+vectors, and both are resumable:
+
+- The export is a segment-parallel scan (see :mod:`s3vectorm.scan`). After
+  each page, the files are flushed and the manifest records the file sizes
+  and the ``nextToken`` of every segment. Running the export again on the
+  same directory truncates the files to the last checkpoint and resumes
+  every unfinished segment from its token.
+- The import records, in an optional checkpoint file, the number of leading
+  rows whose batches are all done. Running it again skips those rows.
+
+Example:
+    >>> manifest = index.export_snapshot(s3_vectors_client, "backup/documents")
+    >>> print(manifest["n_vectors"])
+    >>> result = new_index.import_snapshot(
+    ...     s3_vectors_client,
+    ...     "backup/documents",
+    ...     checkpoint_path="backup/documents.import.json",
+    ... )
+"""
+
+import typing as T
+import os
+import sys
+import json
+import array
+import uuid
+import itertools
+import contextlib
+import collections
+from pathlib import Path
+
+from .constants import (
+    MAX_VECTORS_PER_PUT,
+    MAX_PUT_PAYLOAD_BYTES,
+    MAX_LIST_PAGE_SIZE,
+    MAX_SEGMENT_COUNT,
+    DEFAULT_MAX_WORKERS,
+)
+from .bulk import BulkWriteResult, iter_put_batches, run_batches
+from .scan import iter_segment_pages
+from .utils import write_json_atomic
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3vectors import S3VectorsClient
+    from mypy_boto3_s3vectors.type_defs import PutInputVectorTypeDef
+
+    from .index import Index
+
+FORMAT_NAME = "s3vectorm-snapshot"
+FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+KEYS_FILE = "keys.jsonl"
+VECTORS_FILE = "vectors.f32"
+METADATA_DIR = "metadata"
+DELETED_FILE = "deleted.jsonl"
+
+_BYTES_PER_FLOAT32 = 4
+_NULL_ROWS_PER_WRITE = 64 * 1024
+
+
+def read_manifest(path: T.Union[str, Path]) -> dict[str, T.Any]:
+    """
+    Read the manifest of a snapshot directory.
+    """
+    return json.loads((Path(path) / MANIFEST_FILE).read_text())
+
+
+def read_deleted_rows(path: T.Union[str, Path]) -> set[int]:
+    """
+    Read the numbers of the deleted rows of a snapshot directory.
+    """
+    path = Path(path)
+    manifest = read_manifest(path)
+    size = manifest["file_sizes"].get(DELETED_FILE, 0)
+    if size == 0:
+        return set()
+    with open(path / DELETED_FILE, "rb") as f:
+        return {int(line) for line in f.read(size).splitlines()}
+
+
+def _to_float32_bytes(values: list[float]) -> bytes:
+    row = array.array("f", values)
+    if sys.byteorder == "big":  # pragma: no cover
+        row.byteswap()
+    return row.tobytes()
+
+
+def _new_manifest(index: "Index", segment_count: int) -> dict[str, T.Any]:
+    return {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        # identifies the files, a rewrite of the directory gets a new id
+        "snapshot_id": uuid.uuid4().hex,
+        "index": {
+            "bucket_name": index.bucket_name,
+            "index_name": index.index_name,
+            "data_type": index.data_type,
+            "dimension": index.dimension,
+            "distance_metric": index.distance_metric,
+        },
+        "complete": False,
+        "n_vectors": 0,
+        "segment_count": segment_count,
+        "segments": {
+            str(i): {"next_token": None, "done": False} for i in range(segment_count)
+        },
+        "columns": {},
+        "file_sizes": {KEYS_FILE: 0, VECTORS_FILE: 0},
+    }
+
+
+class SnapshotWriter:
+    """
+    Append rows to the files of a snapshot directory and checkpoint the
+    manifest.
+
+    Opening a writer truncates the files to the sizes recorded by the last
+    checkpoint of the manifest, so that what was written after it (e.g. by a
+    process that crashed) is dropped. Every :meth:`append_page` or
+    :meth:`update` ends with a checkpoint. Call :meth:`close` when done.
+
+    :param path: The snapshot directory
+    :param manifest: The manifest of the snapshot, see :func:`read_manifest`,
+        it is updated in place
+    """
+
+    def __init__(self, path: Path, manifest: dict[str, T.Any]):
+        self.path = path
+        self.manifest = manifest
+        (path / METADATA_DIR).mkdir(parents=True, exist_ok=True)
+        # drop what was written after the last checkpoint
+        file_sizes = manifest["file_sizes"]
+        for name in os.listdir(path / METADATA_DIR):
+            relpath = f"{METADATA_DIR}/{name}"
+            if relpath not in file_sizes:
+                os.remove(path / relpath)
+        self.files: dict[str, T.BinaryIO] = {}
+        for relpath, size in file_sizes.items():
+            f = open(path / relpath, "ab")
+            f.truncate(size)
+            self.files[relpath] = f
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+    def _add_column(self, field: str) -> str:
+        relpath = f"{METADATA_DIR}/{len(self.manifest['columns']):04d}.jsonl"
+        f = open(self.path / relpath, "wb")
+        # the vectors written so far do not have this metadata
+        n_rows = self.manifest["n_vectors"]
+        for i in range(0, n_rows, _NULL_ROWS_PER_WRITE):
+            f.write(b"null\n" * min(_NULL_ROWS_PER_WRITE, n_rows - i))
+        self.manifest["columns"][field] = relpath
+        self.files[relpath] = f
+        return relpath
+
+    def _write_checkpoint(self):
+        for f in self.files.values():
+            f.flush()
+        self.manifest["file_sizes"] = {
+            relpath: os.fstat(f.fileno()).st_size for relpath, f in self.files.items()
+        }
+        write_json_atomic(self.path / MANIFEST_FILE, self.manifest)
+
+    def _append_rows(self, vectors: list[dict[str, T.Any]]):
+        manifest = self.manifest
+        data_type = manifest["index"]["data_type"]
+        dimension = manifest["index"]["dimension"]
+        if not vectors:
+            return
+        for dct in vectors:
+            for field in dct.get("metadata", {}):
+                if field not in manifest["columns"]:
+                    self._add_column(field)
+        self.files[KEYS_FILE].write(
+            "".join(json.dumps(dct["key"]) + "\n" for dct in vectors).encode("utf-8")
+        )
+        chunks = []
+        for dct in vectors:
+            values = dct["data"][data_type]
+            if len(values) != dimension:
+                raise ValueError(
+                    f"vector {dct['key']!r} has {len(values)} dimensions, "
+                    f"expected {dimension}"
+                )
+            chunks.append(_to_float32_bytes(values))
+        self.files[VECTORS_FILE].write(b"".join(chunks))
+        for field, relpath in manifest["columns"].items():
+            self.files[relpath].write(
+                "".join(
+                    json.dumps(dct.get("metadata", {}).get(field)) + "\n"
+                    for dct in vectors
+                ).encode("utf-8")
+            )
+        manifest["n_vectors"] += len(vectors)
+
+    def append_page(
+        self,
+        segment_index: int,
+        vectors: list[dict[str, T.Any]],
+        next_token: str | None,
+    ):
+        """
+        Append a page of an export scan and record the ``nextToken`` of its
+        segment, in one checkpoint.
+        """
+        self._append_rows(vectors)
+        self.manifest["segments"][str(segment_index)] = {
+            "next_token": next_token,
+            "done": next_token is None,
+        }
+        self._write_checkpoint()
+
+    def update(
+        self,
+        vectors: list[dict[str, T.Any]],
+        deleted_rows: T.Iterable[int],
+    ):
+        """
+        Append new rows and mark rows as deleted, in one checkpoint.
+        """
+        self._append_rows(vectors)
+        deleted_rows = sorted(deleted_rows)
+        if deleted_rows:
+            if DELETED_FILE not in self.files:
+                self.files[DELETED_FILE] = open(self.path / DELETED_FILE, "ab")
+            self.files[DELETED_FILE].write(
+                "".join(f"{row}\n" for row in deleted_rows).encode("utf-8")
+            )
+            self.manifest["n_deleted"] = self.manifest.get("n_deleted", 0) + len(
+                deleted_rows
+            )
+        self._write_checkpoint()
+
+
+def export_snapshot(
+    index: "Index",
+    s3_vectors_client: "S3VectorsClient",
+    path: T.Union[str, Path],
+    segment_count: int = MAX_SEGMENT_COUNT,
+    page_size: int = MAX_LIST_PAGE_SIZE,
+    resume: bool = True,
+) -> dict[str, T.Any]:
+    """
+    Export all vectors of an index to a snapshot directory. See
+    :meth:`~s3vectorm.index.Index.export_snapshot` for the parameters.
+    """
+    if index.data_type != "float32":
+        raise ValueError(f"unsupported data type: {index.data_type!r}")
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    manifest_path = path / MANIFEST_FILE
+    if resume and manifest_path.exists():
+        manifest = read_manifest(path)
+        if manifest["complete"]:
+            return manifest
+    else:
+        manifest = _new_manifest(index, segment_count)
+    starting_tokens = {
+        int(segment_index): segment["next_token"]
+        for segment_index, segment in manifest["segments"].items()
+        if not segment["done"]
+    }
+
+    writer = SnapshotWriter(path, manifest)
+    try:
+        write_json_atomic(manifest_path, manifest)
+        for segment_page in iter_segment_pages(
+            index=index,
+            s3_vectors_client=s3_vectors_client,
+            segment_count=manifest["segment_count"],
+            return_data=True,
+            return_metadata=True,
+            page_size=page_size,
+            starting_tokens=starting_tokens,
+        ):
+            writer.append_page(
+                segment_index=segment_page.segment_index,
+                vectors=segment_page.page.boto3_raw_data.get("vectors", []),
+                next_token=segment_page.next_token,
+            )
+        manifest["complete"] = True
+        write_json_atomic(manifest_path, manifest)
+    finally:
+        writer.close()
+    return manifest
+
+
+def iter_snapshot_vectors(
+    path: T.Union[str, Path],
+    start: int = 0,
+) -> T.Iterator["PutInputVectorTypeDef"]:
+    """
+    Read the vectors of a snapshot, in the ``put_vectors`` format. Deleted
+    rows are skipped.
+
+    The files are read line by line (and row by row), the memory usage does
+    not depend on the size of the snapshot.
+
+    :param path: The snapshot directory
+    :param start: Number of leading rows to skip
+    """
+    for _, dct in _iter_snapshot_rows(path, start):
+        yield dct
+
+
+def _iter_snapshot_rows(
+    path: T.Union[str, Path],
+    start: int = 0,
+) -> T.Iterator[tuple[int, "PutInputVectorTypeDef"]]:
+    """
+    Yield ``(row number, vector)`` of the rows that are not deleted.
+    """
+    path = Path(path)
+    manifest = read_manifest(path)
+    if not manifest["complete"]:
+        raise ValueError(f"snapshot {path} is incomplete, resume the export first")
+    data_type = manifest["index"]["data_type"]
+    row_size = manifest["index"]["dimension"] * _BYTES_PER_FLOAT32
+    n_vectors = manifest["n_vectors"]
+    deleted_rows = read_deleted_rows(path)
+
+    with contextlib.ExitStack() as stack:
+        keys_file = stack.enter_context(open(path / KEYS_FILE, "rb"))
+        vectors_file = stack.enter_context(open(path / VECTORS_FILE, "rb"))
+        vectors_file.seek(start * row_size)
+        column_files = {
+            field: stack.enter_context(open(path / relpath, "rb"))
+            for field, relpath in manifest["columns"].items()
+        }
+        readers = [itertools.islice(keys_file, start, n_vectors)] + [
+            itertools.islice(f, start, n_vectors) for f in column_files.values()
+        ]
+        fields = list(column_files)
+        for row_number, lines in enumerate(zip(*readers), start):
+            row = array.array("f")
+            row.frombytes(vectors_file.read(row_size))
+            if row_number in deleted_rows:
+                continue
+            if sys.byteorder == "big":  # pragma: no cover
+                row.byteswap()
+            metadata = {}
+            for field, line in zip(fields, lines[1:]):
+                value = json.loads(line)
+                if value is not None:
+                    metadata[field] = value
+            yield row_number, {
+                "key": json.loads(lines[0]),
+                "data": {data_type: row.tolist()},
+                "metadata": metadata,
+            }
+
+
+def import_snapshot(
+    index: "Index",
+    s3_vectors_client: "S3VectorsClient",
+    path: T.Union[str, Path],
+    checkpoint_path: T.Optional[T.Union[str, Path]] = None,
+    batch_size: int = MAX_VECTORS_PER_PUT,
+    max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> BulkWriteResult:
+    """
+    Put all vectors of a snapshot into an index. See
+    :meth:`~s3vectorm.index.Index.import_snapshot` for the parameters.
+    """
+    manifest = read_manifest(path)
+    if manifest["index"]["dimension"] != index.dimension:
+        raise ValueError(
+            f"the snapshot has {manifest['index']['dimension']} dimensions, "
+            f"the index has {index.dimension}"
+        )
+
+    start = 0
+    if checkpoint_path is not None:
+        checkpoint_path = Path(checkpoint_path)
+        if checkpoint_path.exists():
+            start = json.loads(checkpoint_path.read_text())["n_imported"]
+
+    # batches finish out of order, the checkpoint is the end of the leading
+    # run of finished batches
+    watermark = start
+    finished: dict[int, int] = {}
+    # (batch, first row, end row) of the batches in flight
+    in_flight: list[tuple[list["PutInputVectorTypeDef"], int, int]] = []
+
+    def iter_batches_with_ranges() -> T.Iterator[list["PutInputVectorTypeDef"]]:
+        # a batch covers the rows from the end of the previous batch to its
+        # last vector, including the deleted rows in between. The batches
+        # take the vectors in order, so the row numbers of a batch are the
+        # next len(batch) row numbers read.
+        row_numbers: collections.deque[int] = collections.deque()
+
+        def iter_vectors() -> T.Iterator["PutInputVectorTypeDef"]:
+            for row_number, dct in _iter_snapshot_rows(path, start=start):
+                row_numbers.append(row_number)
+                yield dct
+
+        batch_start = start
+        for batch in iter_put_batches(
+            iter_vectors(),
+            max_vectors=batch_size,
+            max_payload_bytes=max_payload_bytes,
+        ):
+            for _ in range(len(batch)):
+                batch_end = row_numbers.popleft() + 1
+            in_flight.append((batch, batch_start, batch_end))
+            batch_start = batch_end
+            yield batch
+
+    def on_batch_done(batch: list["PutInputVectorTypeDef"], error):
+        nonlocal watermark
+        i = next(i for i, item in enumerate(in_flight) if item[0] is batch)
+        _, batch_start, batch_end = in_flight.pop(i)
+        if error is not None:
+            return
+        finished[batch_start] = batch_end
+        moved = False
+        while watermark in finished:
+            watermark = finished.pop(watermark)
+            moved = True
+        if moved and checkpoint_path is not None:
+            write_json_atomic(checkpoint_path, {"n_imported": watermark})
+
+    result = run_batches(
+        batches=iter_batches_with_ranges(),
+        func=lambda batch: index._put_vector_dicts(
+            s3_vectors_client=s3_vectors_client,
+            dcts=batch,
+        ),
+        get_key=lambda dct: dct["key"],
+        max_workers=max_workers,
+        on_batch_done=on_batch_done,
+    )
+    # the checkpoint counts rows, the deleted rows among them are not vectors
+    result.n_skipped = start - sum(
+        1 for row_number in read_deleted_rows(path) if row_number < start
+    )
+    return result
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+"""
+Incremental Sync Engine
+
+This module makes an index match a source of truth (e.g. a table of document
+chunks) by sending only the differences, instead of a full reload:
+
+1. The keys of the index (and the stored content hashes) are listed with a
+   segment-parallel scan, see :meth:`~s3vectorm.index.Index.scan_vectors`.
+2. The desired vectors are streamed and compared with the listed keys.
+   New and changed vectors are sent with concurrent batched ``put_vectors``
+   calls while the input is still being read.
+3. The listed keys that are not in the desired set are stale, they are
+   removed with concurrent batched ``delete_vectors`` calls.
+
+Example:
+    >>> result = index.sync_vectors(
+    ...     s3_vectors_client,
+    ...     desired=(to_vector(row) for row in iter_chunk_rows()),
+    ...     hash_key="content_hash",
+    ... )
+    >>> print(result.n_added, result.n_changed, result.n_unchanged, result.n_stale)
+
+Only the keys and hashes of the index, and the desired keys, are held in
+memory (about 100 bytes per vector), the desired vectors are streamed. Each
+key must be desired only once, a duplicate key raises a ``ValueError``.
+"""
+
+import typing as T
+import dataclasses
+
+from .constants import (
+    MAX_VECTORS_PER_PUT,
+    MAX_PUT_PAYLOAD_BYTES,
+    MAX_KEYS_PER_DELETE,
+    MAX_LIST_PAGE_SIZE,
+    MAX_SEGMENT_COUNT,
+    DEFAULT_MAX_WORKERS,
+)
+from .bulk import BulkWriteResult, iter_batches, iter_put_batches, run_batches
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3vectors import S3VectorsClient
+    from mypy_boto3_s3vectors.type_defs import PutInputVectorTypeDef
+
+    from .index import Index
+    from .vector import Vector
+    from .catalog import HashCatalog
+
+DesiredItem = T.Union["Vector", tuple[str, str]]
+"""
+A desired vector, or a ``(key, hash)`` pair whose vector is loaded on demand.
+"""
+
+_MISSING = object()
+
+
+@dataclasses.dataclass
+class SyncResult:
+    """
+    Summary of a sync operation.
+
+    :param dry_run: True if nothing was written
+    :param n_existing: Number of vectors in the index before the sync
+    :param n_added: Number of desired vectors that were not in the index
+    :param n_changed: Number of desired vectors whose hash changed, or whose
+        hash is unknown (no ``hash_key`` and no ``catalog``)
+    :param n_unchanged: Number of desired vectors that were skipped
+    :param n_stale: Number of vectors in the index that are not desired
+    :param put_result: Outcome of the ``put_vectors`` calls
+    :param delete_result: Outcome of the ``delete_vectors`` calls
+    :param added_keys: Keys of the added vectors, only filled in a dry run
+    :param changed_keys: Keys of the changed vectors, only filled in a dry run
+    :param stale_keys: Keys of the stale vectors, only filled in a dry run
+    """
+
+    dry_run: bool = dataclasses.field(default=False)
+    n_existing: int = dataclasses.field(default=0)
+    n_added: int = dataclasses.field(default=0)
+    n_changed: int = dataclasses.field(default=0)
+    n_unchanged: int = dataclasses.field(default=0)
+    n_stale: int = dataclasses.field(default=0)
+    put_result: BulkWriteResult = dataclasses.field(default_factory=BulkWriteResult)
+    delete_result: BulkWriteResult = dataclasses.field(default_factory=BulkWriteResult)
+    added_keys: list[str] = dataclasses.field(default_factory=list)
+    changed_keys: list[str] = dataclasses.field(default_factory=list)
+    stale_keys: list[str] = dataclasses.field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether all put and delete batches succeeded."""
+        return self.put_result.ok and self.delete_result.ok
+
+
+def scan_stored_hashes(
+    index: "Index",
+    s3_vectors_client: "S3VectorsClient",
+    hash_key: str | None = None,
+    catalog: T.Optional["HashCatalog"] = None,
+    segment_count: int = MAX_SEGMENT_COUNT,
+) -> dict[str, str | None]:
+    """
+    List all keys of the index with the hash of their stored content.
+
+    The hash is read from the ``hash_key`` metadata field if given, otherwise
+    from the ``catalog`` if given, otherwise it is ``None`` (unknown).
+    """
+    stored_hashes: dict[str, str | None] = {}
+    for page in index.scan_vectors(
+        s3_vectors_client=s3_vectors_client,
+        segment_count=segment_count,
+        return_metadata=hash_key is not None,
+        page_size=MAX_LIST_PAGE_SIZE,
+    ):
+        vectors = page.boto3_raw_data.get("vectors", [])
+        if hash_key is None:
+            stored_hashes.update(dict.fromkeys(dct["key"] for dct in vectors))
+        else:
+            for dct in vectors:
+                stored_hashes[dct["key"]] = dct.get("metadata", {}).get(hash_key)
+    if hash_key is None and catalog is not None:
+        stored_hashes.update(catalog.get_many(stored_hashes))
+    return stored_hashes
+
+
+def sync_vectors(
+    index: "Index",
+    s3_vectors_client: "S3VectorsClient",
+    desired: T.Iterable[DesiredItem],
+    hash_key: str | None = None,
+    catalog: T.Optional["HashCatalog"] = None,
+    load_vectors: T.Optional[T.Callable[[list[str]], T.Iterable["Vector"]]] = None,
+    delete_stale: bool = True,
+    dry_run: bool = False,
+    batch_size: int = MAX_VECTORS_PER_PUT,
+    max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    segment_count: int = MAX_SEGMENT_COUNT,
+) -> SyncResult:
+    """
+    Make the index match the desired vectors. See
+    :meth:`~s3vectorm.index.Index.sync_vectors` for the parameters.
+    """
+    stored_hashes = scan_stored_hashes(
+        index=index,
+        s3_vectors_client=s3_vectors_client,
+        hash_key=hash_key,
+        catalog=catalog,
+        segment_count=segment_count,
+    )
+    result = SyncResult(dry_run=dry_run, n_existing=len(stored_hashes))
+    exclude = () if hash_key is None else (hash_key,)
+
+    def iter_to_put() -> T.Iterator[tuple[str, str, T.Optional["Vector"]]]:
+        """
+        Yield ``(key, hash, vector or None)`` of the desired items to put.
+        """
+        desired_keys: set[str] = set()
+        for item in desired:
+            if isinstance(item, tuple):
+                key, content_hash = item
+                vector = None
+            else:
+                key, content_hash, vector = (
+                    item.key,
+                    item.content_hash(exclude=exclude),
+                    item,
+                )
+            # the input is streamed, a later duplicate can not replace the
+            # item that is already sent
+            if key in desired_keys:
+                raise ValueError(f"duplicate desired key {key!r}")
+            desired_keys.add(key)
+            stored_hash = stored_hashes.pop(key, _MISSING)
+            if stored_hash is _MISSING:
+                result.n_added += 1
+                if dry_run:
+                    result.added_keys.append(key)
+            elif stored_hash is not None and stored_hash == content_hash:
+                result.n_unchanged += 1
+                continue
+            else:
+                result.n_changed += 1
+                if dry_run:
+                    result.changed_keys.append(key)
+            yield key, content_hash, vector
+
+    sent_hashes: dict[str, str] = {}
+
+    def iter_put_dcts() -> T.Iterator["PutInputVectorTypeDef"]:
+        for chunk in iter_batches(iter_to_put(), batch_size):
+            keys_to_load = [key for key, _, vector in chunk if vector is None]
+            loaded = {}
+            if keys_to_load:
+                if load_vectors is None:
+                    raise ValueError(
+                        "load_vectors is required when desired items are "
+                        "(key, hash) pairs"
+                    )
+                loaded = {vector.key: vector for vector in load_vectors(keys_to_load)}
+            for key, content_hash, vector in chunk:
+                if vector is None:
+                    vector = loaded.get(key)
+                    if vector is None:
+                        raise KeyError(f"load_vectors did not return vector {key!r}")
+                dct = vector.to_put_vectors_dict(data_type=index.data_type)
+                if hash_key is not None:
+                    dct["metadata"][hash_key] = content_hash
+                sent_hashes[key] = content_hash
+                yield dct
+
+    def on_put_done(batch: list["PutInputVectorTypeDef"], error):
+        items = [
+            (dct["key"], sent_hashes.pop(dct["key"]))
+            for dct in batch
+            if dct["key"] in sent_hashes
+        ]
+        if catalog is not None and error is None:
+            catalog.set_many(items)
+
+    if dry_run:
+        for _ in iter_to_put():
+            pass
+    else:
+        result.put_result = run_batches(
+            batches=iter_put_batches(
+                iter_put_dcts(),
+                max_vectors=batch_size,
+                max_payload_bytes=max_payload_bytes,
+            ),
+            func=lambda batch: index._put_vector_dicts(
+                s3_vectors_client=s3_vectors_client,
+                dcts=batch,
+            ),
+            get_key=lambda dct: dct["key"],
+            max_workers=max_workers,
+            on_batch_done=on_put_done,
+        )
+        result.put_result.n_skipped = result.n_unchanged
+
+    # what is left was not desired
+    result.n_stale = len(stored_hashes)
+    if dry_run:
+        result.stale_keys = list(stored_hashes)
+    elif delete_stale and stored_hashes:
+
+        def on_delete_done(keys: list[str], error):
+            if catalog is not None and error is None:
+                catalog.delete_many(keys)
+
+        result.delete_result = run_batches(
+            batches=iter_batches(stored_hashes, MAX_KEYS_PER_DELETE),
+            func=lambda keys: index.delete_vectors(
+                s3_vectors_client=s3_vectors_client,
+                keys=keys,
+            ),
+            get_key=lambda key: key,
+            max_workers=max_workers,
+            on_batch_done=on_delete_done,
+        )
+    return result
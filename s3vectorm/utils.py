@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+"""
+Shared Helpers
+
+Small helpers used by more than one module of this library.
+"""
+
+import typing as T
+import os
+import json
+from pathlib import Path
+
+
+def write_json_atomic(path: T.Union[str, Path], data: dict[str, T.Any]):
+    """
+    Write a JSON document so that a reader, or a process that restarts after a
+    crash, sees either the previous content or the new one, never a partial
+    file.
+
+    The document is written to a ``<name>.tmp`` file next to ``path``, then
+    renamed over ``path``. It is used for the snapshot manifests and the
+    checkpoint files.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(data, indent=2))
+    os.replace(tmp_path, path)
@@ -19,16 +19,99 @@ Example:
     ... )
     >>> put_format = vector.to_put_vectors_dict("float32")
     >>> metadata = vector.to_metadata_dict()
+
+Besides ``list[float]``, the vector data can also be a 1-D ``numpy.ndarray``,
+an ``array.array("f")`` or a ``memoryview``. Such objects are stored as-is,
+without copying or validating each element, and are only converted to the wire
+format when the vector is serialized.
 """
 
+import sys
+import json
+import array
+import hashlib
 import typing as T
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, WrapValidator, PlainSerializer
 
 if T.TYPE_CHECKING:  # pragma: no cover
     from mypy_boto3_s3vectors.literals import DataTypeType
     from mypy_boto3_s3vectors.type_defs import PutInputVectorTypeDef
 
 
+def is_array_like(value: T.Any) -> bool:
+    """
+    Check if the value is a buffer-backed sequence of numbers
+    (``numpy.ndarray``, ``array.array`` or ``memoryview``).
+
+    NumPy is an optional dependency, it is never imported by this function,
+    if it is not imported yet, the value cannot be a ``numpy.ndarray``.
+    """
+    if isinstance(value, (array.array, memoryview)):
+        return True
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(value, np.ndarray)
+
+
+def to_float_list(value: T.Any) -> list[float] | None:
+    """
+    Convert vector data to the ``list[float]`` wire format.
+
+    A list is returned as-is, array-like objects are converted with their
+    C-implemented ``tolist()`` method.
+    """
+    if value is None or isinstance(value, list):
+        return value
+    return value.tolist()
+
+
+_FLOAT_FORMATS = {"f", "d"}
+"""
+The ``array.array`` type codes and ``memoryview`` formats of float vector data.
+"""
+
+
+def _validate_data(value: T.Any, handler: T.Callable[[T.Any], T.Any]) -> T.Any:
+    """
+    Keep array-like data as-is (no copy, no per-element validation),
+    validate anything else as ``list[float]``.
+
+    Only the element type of an array-like object is checked (in constant
+    time), it must be a floating point type.
+    """
+    if is_array_like(value):
+        if getattr(value, "ndim", 1) != 1:
+            raise ValueError(f"vector data must be 1-D, got {value.ndim}-D")
+        if isinstance(value, array.array):
+            element_type = value.typecode
+            is_float = element_type in _FLOAT_FORMATS
+        elif isinstance(value, memoryview):
+            element_type = value.format
+            is_float = element_type in _FLOAT_FORMATS
+        else:
+            element_type = value.dtype
+            is_float = value.dtype.kind == "f"
+        if not is_float:
+            raise ValueError(
+                f"vector data must have a floating point type, got {element_type!r}"
+            )
+        return value
+    return handler(value)
+
+
+VectorData = T.Annotated[
+    list[float],
+    WrapValidator(_validate_data),
+    PlainSerializer(to_float_list),
+]
+"""
+The type of :attr:`Vector.data`, a ``list[float]``, or an array-like object
+(``numpy.ndarray``, ``array.array``, ``memoryview``) that is kept without copying.
+"""
+
+
+_NON_METADATA_FIELDS = {"key", "data", "distance"}
+
+
 class Vector(BaseModel):
     """
     Represents a vector with embedding data and associated metadata.
@@ -40,7 +123,9 @@ class Vector(BaseModel):
 
     Attributes:
         key: Unique identifier for the vector
-        data: Optional list of float values representing the vector embedding
+        data: Optional vector embedding, a list of float values, or a 1-D
+            ``numpy.ndarray`` / ``array.array("f")`` / ``memoryview`` which
+            is stored without copying
         distance: Optional distance metric (typically set during query operations)
 
     Examples:
@@ -51,6 +136,12 @@ class Vector(BaseModel):
         ...     distance=0.95
         ... )
 
+        >>> # Create a vector from a numpy array, the array is not copied
+        >>> vector = Vector(
+        ...     key="doc-789",
+        ...     data=np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32),
+        ... )
+
         >>> # Create a vector without embedding data (for metadata-only operations)
         >>> metadata_vector = Vector(
         ...     key="doc-456",
@@ -65,9 +156,23 @@ class Vector(BaseModel):
     """
 
     key: str = Field()
-    data: list[float] | None = Field(default=None)
+    data: VectorData | None = Field(default=None)
     distance: float | None = Field(default=None)
 
+    def __eq__(self, other: T.Any) -> bool:
+        """
+        Compare like a pydantic model, except that array-like data is
+        compared by value (an ``ndarray`` has no single truth value).
+        """
+        if isinstance(other, Vector) and (
+            is_array_like(self.data) or is_array_like(other.data)
+        ):
+            return BaseModel.__eq__(
+                self.model_copy(update={"data": to_float_list(self.data)}),
+                other.model_copy(update={"data": to_float_list(other.data)}),
+            )
+        return super().__eq__(other)
+
     def to_put_vectors_dict(
         self,
         data_type: "DataTypeType",
@@ -103,14 +208,12 @@ class Vector(BaseModel):
                 "metadata": {"category": "documents"}
             }
         """
-        dct = self.model_dump()
-        dct.pop("distance")
         return {
-            "key": dct.pop("key"),
+            "key": self.key,
             "data": {
-                data_type: dct.pop("data"),
+                data_type: to_float_list(self.data),
             },
-            "metadata": dct,
+            "metadata": self.to_metadata_dict(),
         }
 
     def to_metadata_dict(self):
@@ -136,8 +239,48 @@ class Vector(BaseModel):
             >>> print(metadata)
             {"category": "documents", "status": "active"}
         """
-        dct = self.model_dump()
-        dct.pop("key")
-        dct.pop("data")
-        dct.pop("distance")
-        return dct
+        return self.model_dump(exclude=_NON_METADATA_FIELDS)
+
+    def content_hash(
+        self,
+        exclude: T.Iterable[str] = (),
+    ) -> str:
+        """
+        Compute a stable hash of the vector content: the data (as float32, the
+        precision the service stores) and the metadata. The key and the
+        distance are not part of the content.
+
+        Two vectors with the same content have the same hash, in any process
+        and on any machine, so the hash can be stored and compared later to
+        detect changed vectors, see :meth:`~s3vectorm.index.Index.upsert_vectors`.
+
+        :param exclude: Metadata fields to leave out of the hash, e.g. the
+            field that stores the hash itself
+
+        :returns: A 32 characters hexadecimal digest
+
+        Example:
+            >>> vector = DocChunk(key="doc-1", data=[0.1, 0.2], category="news")
+            >>> vector.content_hash()
+            '945a713b48f5954840e1c4819ba9ba35'
+        """
+        metadata = self.to_metadata_dict()
+        for field in exclude:
+            metadata.pop(field, None)
+        data = (
+            b""
+            if self.data is None
+            else array.array("f", to_float_list(self.data)).tobytes()
+        )
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(len(data).to_bytes(8, "little"))
+        hasher.update(data)
+        hasher.update(
+            json.dumps(
+                metadata,
+                sort_keys=True,
+                separators=(",", ":"),
+                default=str,
+            ).encode("utf-8")
+        )
+        return hasher.hexdigest()
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+
+"""
+Write-Behind Buffered Writer
+
+This module provides :class:`BufferedWriter`, a context manager that collects
+single puts and deletes from a producer (e.g. an event handler that embeds
+one document at a time) and sends them to an index in batches from a
+background thread:
+
+- Writes to the same key are merged while they wait in the buffer, the last
+  write wins: a put after a put replaces the vector, a delete after a put
+  drops the put (only the delete is sent), a put after a delete drops the
+  delete.
+- The buffer is flushed when it holds ``max_vectors`` keys, or about
+  ``max_payload_bytes`` of put payload, or when its oldest write is
+  ``flush_interval`` seconds old.
+- A flush sends the puts and the deletes with concurrent batched calls, see
+  :func:`~s3vectorm.bulk.run_batches`. Flushes run one at a time, in order,
+  so the writes to a key reach the index in the order they were made.
+- When the producer is faster than the index, :meth:`BufferedWriter.put` and
+  :meth:`BufferedWriter.delete` block while ``max_pending`` keys are waiting,
+  which keeps the memory usage bounded.
+
+Example:
+    >>> with index.buffered_writer(s3_vectors_client, flush_interval=0.5) as writer:
+    ...     for event in events:
+    ...         if event.type == "deleted":
+    ...             writer.delete(event.doc_id)
+    ...         else:
+    ...             writer.put(to_vector(event))
+    >>> print(writer.put_result.n_succeeded, writer.delete_result.n_succeeded)
+
+Closing the writer (leaving the ``with`` block) flushes what is left and
+waits for all calls to finish.
+"""
+
+import typing as T
+import time
+import threading
+
+from .constants import (
+    MAX_VECTORS_PER_PUT,
+    MAX_PUT_PAYLOAD_BYTES,
+    MAX_KEYS_PER_DELETE,
+    DEFAULT_MAX_WORKERS,
+)
+from .bulk import (
+    BulkWriteResult,
+    estimate_put_vector_size,
+    iter_batches,
+    iter_put_batches,
+    run_batches,
+)
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3vectors import S3VectorsClient
+    from mypy_boto3_s3vectors.type_defs import PutInputVectorTypeDef
+
+    from .index import Index
+    from .vector import Vector
+
+_PUT = "put"
+_DELETE = "delete"
+
+
+class BufferedWriter:
+    """
+    Buffer puts and deletes and send them in batches from a background thread.
+
+    The methods are thread safe, several producer threads can share a writer.
+
+    A delete after a buffered put of the same key does not cancel out: the put
+    is dropped but the delete is still sent, because the key may already be
+    in the index from an earlier flush or another writer.
+
+    :param index: The index to write to
+    :param s3_vectors_client: The AWS S3 Vectors client to use
+    :param max_vectors: Flush when this many keys are buffered (default: 500)
+    :param max_payload_bytes: Flush when the estimated put payload of the
+        buffer reaches this size (default: 20 MiB)
+    :param flush_interval: Flush when the oldest buffered write is this many
+        seconds old (default: 1.0)
+    :param max_pending: Maximum number of buffered keys, the producers wait
+        when it is reached, default to ``4 * max_vectors``
+    :param max_workers: Number of concurrent API calls of a flush (default: 8)
+
+    Attributes:
+        put_result: The :class:`~s3vectorm.bulk.BulkWriteResult` of all
+            ``put_vectors`` calls so far
+        delete_result: The :class:`~s3vectorm.bulk.BulkWriteResult` of all
+            ``delete_vectors`` calls so far
+        n_merged: Number of writes that were merged into a later write to
+            the same key, and never sent
+    """
+
+    def __init__(
+        self,
+        index: "Index",
+        s3_vectors_client: "S3VectorsClient",
+        max_vectors: int = MAX_VECTORS_PER_PUT,
+        max_payload_bytes: int = MAX_PUT_PAYLOAD_BYTES,
+        flush_interval: float = 1.0,
+        max_pending: int | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        if max_pending is None:
+            max_pending = 4 * max_vectors
+        self.index = index
+        self.s3_vectors_client = s3_vectors_client
+        self.max_vectors = max_vectors
+        self.max_payload_bytes = max_payload_bytes
+        self.flush_interval = flush_interval
+        self.max_pending = max(max_pending, max_vectors)
+        self.max_workers = max_workers
+
+        self.put_result = BulkWriteResult()
+        self.delete_result = BulkWriteResult()
+        self.n_merged = 0
+
+        self._cond = threading.Condition()
+        # key -> (operation, put vector dict or None, estimated size)
+        self._pending: dict[str, tuple[str, T.Optional["PutInputVectorTypeDef"], int]]
+        self._pending = {}
+        self._pending_bytes = 0
+        self._first_write_time: float | None = None
+        self._flush_requested = False
+        self._closed = False
+        self._error: BaseException | None = None
+        # number of buffers taken, and number of buffers sent
+        self._n_taken = 0
+        self._n_sent = 0
+        self._thread = threading.Thread(
+            target=self._run,
+            name="s3vectorm-buffered-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "BufferedWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError("the buffered writer failed") from self._error
+        if self._closed:
+            raise RuntimeError("the buffered writer is closed")
+
+    def _add(
+        self,
+        key: str,
+        operation: str,
+        dct: T.Optional["PutInputVectorTypeDef"],
+    ):
+        size = 0 if dct is None else estimate_put_vector_size(dct)
+        with self._cond:
+            self._check()
+            while key not in self._pending and len(self._pending) >= self.max_pending:
+                self._cond.wait()
+                self._check()
+            previous = self._pending.pop(key, None)
+            is_first = not self._pending and previous is None
+            if is_first:
+                # start the flush timer of the background thread
+                self._first_write_time = time.monotonic()
+            if previous is not None:
+                self.n_merged += 1
+                self._pending_bytes -= previous[2]
+            self._pending[key] = (operation, dct, size)
+            self._pending_bytes += size
+            if is_first or self._is_full():
+                self._cond.notify_all()
+
+    def put(self, vector: "Vector"):
+        """
+        Buffer a vector to put, it replaces a buffered write to the same key.
+        """
+        self._add(
+            vector.key,
+            _PUT,
+            vector.to_put_vectors_dict(data_type=self.index.data_type),
+        )
+
+    def put_many(self, vectors: T.Iterable["Vector"]):
+        """
+        Buffer many vectors to put.
+        """
+        for vector in vectors:
+            self.put(vector)
+
+    def delete(self, key: str):
+        """
+        Buffer a key to delete, it replaces a buffered write to the same key.
+        """
+        self._add(key, _DELETE, None)
+
+    def delete_many(self, keys: T.Iterable[str]):
+        """
+        Buffer many keys to delete.
+        """
+        for key in keys:
+            self.delete(key)
+
+    def __len__(self) -> int:
+        """Number of buffered keys, not yet sent."""
+        with self._cond:
+            return len(self._pending)
+
+    def _is_full(self) -> bool:
+        return (
+            len(self._pending) >= self.max_vectors
+            or self._pending_bytes >= self.max_payload_bytes
+        )
+
+    def flush(self):
+        """
+        Send the buffered writes now, and wait until they are sent.
+        """
+        with self._cond:
+            if self._pending:
+                self._flush_requested = True
+                target = self._n_taken + 1
+                self._cond.notify_all()
+            else:
+                target = self._n_taken
+            while self._n_sent < target and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise RuntimeError("the buffered writer failed") from self._error
+
+    def close(self):
+        """
+        Flush the buffered writes, wait until they are sent and stop the
+        background thread. Closing a closed writer does nothing.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError("the buffered writer failed") from self._error
+
+    def _take(
+        self,
+    ) -> T.Optional[dict[str, tuple[str, T.Optional["PutInputVectorTypeDef"], int]]]:
+        """
+        Wait until the buffer should be flushed and take it, or return
+        ``None`` when the writer is closed and the buffer is empty.
+        """
+        with self._cond:
+            while True:
+                if self._pending:
+                    age = time.monotonic() - self._first_write_time
+                    if (
+                        self._is_full()
+                        or self._flush_requested
+                        or self._closed
+                        or age >= self.flush_interval
+                    ):
+                        break
+                    self._cond.wait(self.flush_interval - age)
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait()
+            buffer = self._pending
+            self._pending = {}
+            self._pending_bytes = 0
+            self._first_write_time = None
+            self._flush_requested = False
+            self._n_taken += 1
+            # the producers waiting for room can go on
+            self._cond.notify_all()
+            return buffer
+
+    def _send(
+        self,
+        buffer: dict[str, tuple[str, T.Optional["PutInputVectorTypeDef"], int]],
+    ):
+        dcts = [dct for operation, dct, _ in buffer.values() if operation == _PUT]
+        keys = [
+            key for key, (operation, _, _) in buffer.items() if operation == _DELETE
+        ]
+        put_result = run_batches(
+            batches=iter_put_batches(
+                dcts,
+                max_vectors=min(self.max_vectors, MAX_VECTORS_PER_PUT),
+                max_payload_bytes=min(self.max_payload_bytes, MAX_PUT_PAYLOAD_BYTES),
+            ),
+            func=lambda batch: self.index._put_vector_dicts(
+                s3_vectors_client=self.s3_vectors_client,
+                dcts=batch,
+            ),
+            get_key=lambda dct: dct["key"],
+            max_workers=self.max_workers,
+        )
+        delete_result = run_batches(
+            batches=iter_batches(keys, min(self.max_vectors, MAX_KEYS_PER_DELETE)),
+            func=lambda batch: self.index.delete_vectors(
+                s3_vectors_client=self.s3_vectors_client,
+                keys=batch,
+            ),
+            get_key=lambda key: key,
+            max_workers=self.max_workers,
+        )
+        with self._cond:
+            self.put_result.merge(put_result)
+            self.delete_result.merge(delete_result)
+
+    def _run(self):
+        try:
+            while True:
+                buffer = self._take()
+                if buffer is None:
+                    return
+                self._send(buffer)
+                with self._cond:
+                    self._n_sent += 1
+                    self._cond.notify_all()
+        except BaseException as e:  # pragma: no cover
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
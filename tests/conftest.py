@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+Shared test helpers for the tests that run against the local emulator.
+
+The helpers are plain functions, import them with
+``from conftest import make_index, fill, dump_index``. The emulator requires
+``numpy``: a test module calls ``pytest.importorskip("numpy")`` before
+importing :class:`FlakyClient`.
+"""
+
+import typing as T
+
+import pytest
+
+from s3vectorm.index import Index
+
+try:
+    from s3vectorm.emulator import LocalS3VectorsClient
+except ImportError:  # pragma: no cover, numpy is not installed
+    LocalS3VectorsClient = None
+
+
+def make_index(
+    client: "LocalS3VectorsClient",
+    name: str = "index",
+    bucket_name: str = "bucket",
+    dimension: int = 2,
+    distance_metric: str = "cosine",
+) -> Index:
+    """
+    Create a float32 index, and its bucket if it does not exist yet.
+    """
+    buckets = client.list_vector_buckets()["vectorBuckets"]
+    if bucket_name not in {dct["vectorBucketName"] for dct in buckets}:
+        client.create_vector_bucket(vectorBucketName=bucket_name)
+    index = Index(
+        bucket_name=bucket_name,
+        index_name=name,
+        data_type="float32",
+        dimension=dimension,
+        distance_metric=distance_metric,
+    )
+    index.create(client)
+    return index
+
+
+@pytest.fixture
+def index_config() -> dict[str, T.Any]:
+    """
+    The :func:`make_index` arguments of the ``emulator_index`` fixture,
+    override or parametrize it to change the index, e.g.
+    ``@pytest.mark.parametrize("index_config", [{"dimension": 8}])``.
+    """
+    return {}
+
+
+@pytest.fixture
+def emulator_index(index_config) -> tuple[Index, "LocalS3VectorsClient"]:
+    """
+    A new emulator client with an empty index, see ``index_config``.
+    """
+    pytest.importorskip("numpy")
+    client = LocalS3VectorsClient()
+    return make_index(client, **index_config), client
+
+
+def fill(
+    index: Index,
+    client: "LocalS3VectorsClient",
+    dcts: list[dict[str, T.Any]],
+    chunk_size: int = 100,
+):
+    """
+    Write vectors in the ``put_vectors`` format, ``chunk_size`` per call.
+    """
+    for i in range(0, len(dcts), chunk_size):
+        index._put_vector_dicts(client, dcts[i : i + chunk_size])
+
+
+def dump_index(index: Index, client: "LocalS3VectorsClient") -> dict[str, dict]:
+    """
+    Get all vectors of an index, with their data and metadata, by key.
+    """
+    return {
+        dct["key"]: dct
+        for page in index.scan_vectors(
+            client, segment_count=1, return_data=True, return_metadata=True
+        )
+        for dct in page.boto3_raw_data["vectors"]
+    }
+
+
+def list_keys(index: Index, client: "LocalS3VectorsClient") -> set[str]:
+    """
+    Get the keys of all vectors of an index.
+    """
+    return {
+        dct["key"]
+        for page in index.scan_vectors(client, segment_count=1)
+        for dct in page.boto3_raw_data["vectors"]
+    }
+
+
+if LocalS3VectorsClient is not None:
+
+    class FlakyClient(LocalS3VectorsClient):
+        """
+        An emulator client whose ``fail_operation`` calls raise a
+        ``ConnectionError``: the ``fail_at``-th call, and the first call that
+        sends each of the ``fail_keys`` vector keys.
+        """
+
+        def __init__(
+            self,
+            fail_operation: str,
+            fail_at: T.Optional[int] = None,
+            fail_keys: T.Iterable[str] = (),
+        ):
+            super().__init__()
+            self.fail_operation = fail_operation
+            self.fail_at = fail_at
+            self.fail_keys = set(fail_keys)
+            self.n_calls = 0
+
+        def _maybe_fail(self, kwargs: dict[str, T.Any]):
+            self.n_calls += 1
+            if self.n_calls == self.fail_at:
+                raise ConnectionError("boom")
+            keys = {dct["key"] for dct in kwargs.get("vectors", ())}
+            if keys & self.fail_keys:
+                self.fail_keys -= keys
+                raise ConnectionError("boom")
+
+        def list_vectors(self, **kwargs):
+            if self.fail_operation == "list_vectors":
+                self._maybe_fail(kwargs)
+            return super().list_vectors(**kwargs)
+
+        def put_vectors(self, **kwargs):
+            if self.fail_operation == "put_vectors":
+                self._maybe_fail(kwargs)
+            return super().put_vectors(**kwargs)
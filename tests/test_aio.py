@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+import botocore.exceptions
+
+from s3vectorm.aio import AsyncBucket, AsyncIndex
+from s3vectorm.index import QueryVectorsOutput, ListVectorsOutput, GetVectorsOutput
+from s3vectorm.vector import Vector
+from s3vectorm.metadata import MetaKey
+from s3vectorm.metrics import MetricsRegistry
+
+
+def client_error(code: str) -> botocore.exceptions.ClientError:
+    return botocore.exceptions.ClientError(
+        error_response={"Error": {"Code": code, "Message": ""}},
+        operation_name="",
+    )
+
+
+class FakeAsyncPaginator:
+    def __init__(self, pages):
+        self.pages = pages
+        self.kwargs = None
+
+    async def _iter(self):
+        for page in self.pages:
+            await asyncio.sleep(0)
+            yield page
+
+    def paginate(self, **kwargs):
+        self.kwargs = kwargs
+        return self._iter()
+
+
+class FakeAsyncClient:
+    def __init__(self):
+        self.calls = []
+        self.paginators = {
+            "list_indexes": FakeAsyncPaginator(
+                [{"indexes": [{"vectorBucketName": "bucket", "indexName": "index"}]}]
+            ),
+            "list_vectors": FakeAsyncPaginator(
+                [
+                    {"vectors": [{"key": "doc-1"}, {"key": "doc-2"}]},
+                    {"vectors": [{"key": "doc-3"}]},
+                ]
+            ),
+        }
+
+    def __getattr__(self, name):
+        async def method(**kwargs):
+            self.calls.append((name, kwargs))
+            await asyncio.sleep(0)
+            if name in ("create_vector_bucket", "create_index"):
+                raise client_error("ConflictException")
+            if name == "get_index":
+                if kwargs["indexName"] == "missing":
+                    raise client_error("NotFoundException")
+                return {
+                    "index": {
+                        "vectorBucketName": kwargs["vectorBucketName"],
+                        "indexName": kwargs["indexName"],
+                        "dataType": "float32",
+                        "dimension": 3,
+                        "distanceMetric": "cosine",
+                    }
+                }
+            if name == "query_vectors":
+                if kwargs["queryVector"]["float32"][0] < 0:
+                    raise ValueError("boom")
+                return {"vectors": [{"key": "doc-1", "distance": 0.1}]}
+            return {}
+
+        return method
+
+    def get_paginator(self, name):
+        return self.paginators[name]
+
+
+def test_async_bucket():
+    async def main():
+        client = FakeAsyncClient()
+        bucket = AsyncBucket(name="bucket")
+        assert await bucket.create(client) is None
+        await bucket.delete(client)
+        pages = [res async for res in bucket.list_index(client)]
+        assert pages[0].indexes[0].indexName == "index"
+        assert [name for name, _ in client.calls] == [
+            "create_vector_bucket",
+            "delete_vector_bucket",
+        ]
+
+        metrics = MetricsRegistry()
+        bucket = AsyncBucket(name="bucket", metrics=metrics)
+        assert await bucket.create(client) is None
+        await bucket.delete(client)
+        pages = [res async for res in bucket.list_index(client)]
+        assert len(pages) == 1
+        assert metrics.get_stats("create_vector_bucket").n_errors == 1
+        assert metrics.get_stats("delete_vector_bucket").count == 1
+        assert metrics.get_stats("list_indexes").count == 1
+
+    asyncio.run(main())
+
+
+def test_async_index():
+    async def main():
+        client = FakeAsyncClient()
+        index = await AsyncIndex.get(client, "bucket", index_name="index")
+        assert isinstance(index, AsyncIndex)
+        assert index.dimension == 3
+        assert await AsyncIndex.get(client, "bucket", index_name="missing") is None
+        metrics = MetricsRegistry()
+        index_with_metrics = await AsyncIndex.get(
+            client, "bucket", index_name="index", metrics=metrics
+        )
+        assert index_with_metrics.metrics is metrics
+        assert metrics.get_stats("get_index").count == 1
+
+        assert await index.create(client) is None
+        await index.put_vectors(client, [Vector(key="doc-1", data=[0.1, 0.2, 0.3])])
+        name, kwargs = client.calls[-1]
+        assert name == "put_vectors"
+        assert kwargs["vectors"][0]["data"] == {"float32": [0.1, 0.2, 0.3]}
+
+        results = await asyncio.gather(
+            *[
+                index.query_vectors(
+                    client,
+                    data=[0.1, 0.2, 0.3],
+                    filter=MetaKey(name="a").eq(1),
+                )
+                for _ in range(10)
+            ]
+        )
+        assert all(isinstance(res, QueryVectorsOutput) for res in results)
+        assert results[0].as_vector_objects(Vector)[0].key == "doc-1"
+        name, kwargs = client.calls[-1]
+        assert kwargs["filter"] == {"a": {"$eq": 1}}
+
+        results = await index.query_vectors_many(
+            client,
+            data_list=[[0.1, 0.2, 0.3], [-1.0, 0.2, 0.3]],
+            max_concurrency=1,
+        )
+        assert isinstance(results[0], QueryVectorsOutput)
+        assert isinstance(results[1], ValueError)
+
+        pages = [page async for page in index.list_vectors(client, return_data=True)]
+        assert all(isinstance(page, ListVectorsOutput) for page in pages)
+        assert [v.key for page in pages for v in page.as_vector_objects(Vector)] == [
+            "doc-1",
+            "doc-2",
+            "doc-3",
+        ]
+        assert client.paginators["list_vectors"].kwargs["returnData"] is True
+
+        res = await index.get_vectors(client, keys=["doc-1"], return_metadata=True)
+        assert isinstance(res, GetVectorsOutput)
+        assert client.calls[-1] == (
+            "get_vectors",
+            {
+                "vectorBucketName": "bucket",
+                "indexName": "index",
+                "keys": ["doc-1"],
+                "returnMetadata": True,
+            },
+        )
+
+        await index.delete_vectors(client, keys=["doc-1"])
+        assert client.calls[-1] == (
+            "delete_vectors",
+            {"vectorBucketName": "bucket", "indexName": "index", "keys": ["doc-1"]},
+        )
+        await index.delete(client)
+        assert client.calls[-1][0] == "delete_index"
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.aio",
+        preview=False,
+    )
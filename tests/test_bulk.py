@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from s3vectorm.bulk import (
+    estimate_put_vector_size,
+    iter_put_batches,
+    iter_batches,
+    run_batches,
+)
+
+
+def make_dct(key: str, dim: int = 4, **metadata):
+    return {"key": key, "data": {"float32": [0.1] * dim}, "metadata": metadata}
+
+
+def test_estimate_put_vector_size():
+    small = estimate_put_vector_size(make_dct("a", dim=4))
+    large = estimate_put_vector_size(make_dct("a", dim=1024))
+    with_meta = estimate_put_vector_size(make_dct("a", dim=4, category="documents"))
+    assert small < large
+    assert small < with_meta
+
+
+def test_iter_put_batches_by_count():
+    batches = list(
+        iter_put_batches((make_dct(str(i)) for i in range(12)), max_vectors=5)
+    )
+    assert [len(batch) for batch in batches] == [5, 5, 2]
+    assert [dct["key"] for batch in batches for dct in batch] == [
+        str(i) for i in range(12)
+    ]
+
+
+def test_iter_put_batches_by_payload():
+    size = estimate_put_vector_size(make_dct("0", dim=100))
+    batches = list(
+        iter_put_batches(
+            (make_dct(str(i), dim=100) for i in range(10)),
+            max_vectors=500,
+            max_payload_bytes=size * 3,
+        )
+    )
+    assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+
+    # an item larger than the limit goes into its own batch
+    batches = list(
+        iter_put_batches(
+            [make_dct("0"), make_dct("1", dim=1000), make_dct("2")],
+            max_payload_bytes=size,
+        )
+    )
+    assert [len(batch) for batch in batches] == [1, 1, 1]
+
+
+def test_iter_batches():
+    assert list(iter_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(iter_batches([], 2)) == []
+
+
+def test_run_batches():
+    def func(batch):
+        if 13 in batch:
+            raise ValueError("boom")
+
+    done = []
+    result = run_batches(
+        batches=iter_batches(range(100), 10),
+        func=func,
+        get_key=str,
+        max_workers=4,
+        on_batch_done=lambda batch, error: done.append((batch, error)),
+    )
+    assert result.n_batches == 10
+    assert result.n_succeeded == 90
+    assert result.n_failed == 10
+    assert result.n_total == 100
+    assert result.ok is False
+    assert len(result.failures) == 1
+    assert result.failures[0].keys == [str(i) for i in range(10, 20)]
+    assert isinstance(result.failures[0].error, ValueError)
+    assert len(done) == 10
+
+    result = run_batches(batches=[], func=func, get_key=str)
+    assert result.ok is True
+    assert result.n_batches == 0
+
+    other = run_batches(batches=[[1, 2]], func=func, get_key=str)
+    result.merge(other)
+    assert result.n_succeeded == 2
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.bulk",
+        preview=False,
+    )
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from s3vectorm.cache import QueryCache, make_query_key
+
+
+def test_make_query_key():
+    key = make_query_key([0.1, 0.2], 10, {"b": 1, "a": 2}, False, True)
+    assert key == make_query_key([0.1, 0.2], 10, {"a": 2, "b": 1}, False, True)
+    assert key != make_query_key([0.1, 0.3], 10, {"a": 2, "b": 1}, False, True)
+    assert key != make_query_key([0.1, 0.2], 5, {"a": 2, "b": 1}, False, True)
+    assert key != make_query_key([0.1, 0.2], 10, None, False, True)
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_size=2, ttl=None)
+    cache.set("ns", "a", 1)
+    cache.set("ns", "b", 2)
+    assert cache.get("ns", "a") == 1  # "a" becomes the most recently used
+    cache.set("ns", "c", 3)
+    assert len(cache) == 2
+    assert cache.get("ns", "b") is None
+    assert cache.get("ns", "a") == 1
+    assert cache.get("ns", "c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert cache.hit_rate == 0.75
+    cache.reset_stats()
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_ttl():
+    cache = QueryCache(ttl=0.05)
+    cache.set("ns", "a", 1)
+    assert cache.get("ns", "a") == 1
+    time.sleep(0.1)
+    assert cache.get("ns", "a") is None
+    assert len(cache) == 0
+
+
+def test_invalidate():
+    cache = QueryCache()
+    cache.set("ns1", "a", 1)
+    cache.set("ns2", "a", 2)
+    cache.invalidate("ns1")
+    assert cache.get("ns1", "a") is None
+    assert cache.get("ns2", "a") == 2
+    cache.set("ns1", "a", 3)
+    assert cache.get("ns1", "a") == 3
+    cache.invalidate()
+    assert len(cache) == 0
+    assert cache.get("ns2", "a") is None
+
+
+def test_invalidate_between_get_and_set():
+    cache = QueryCache()
+    generation = cache.generation("ns")
+    assert cache.get("ns", "a", generation=generation) is None
+    cache.invalidate("ns")  # a write while the value is computed
+    cache.set("ns", "a", "stale", generation=generation)
+    assert cache.get("ns", "a") is None
+    assert len(cache) == 0
+
+    generation = cache.generation("ns")
+    cache.set("ns", "a", "fresh", generation=generation)
+    assert cache.get("ns", "a", generation=generation) == "fresh"
+    assert cache.get("ns", "a") == "fresh"
+
+
+def test_generations_are_bounded():
+    cache = QueryCache(max_size=2, ttl=None)
+    for i in range(100):
+        namespace = f"ns-{i}"
+        cache.set(namespace, "a", i)
+        cache.invalidate(namespace)
+        cache.invalidate(f"unused-{i}")
+    assert len(cache) == 2
+    assert len(cache._generations) == len(cache._n_entries) == 2
+
+    # a namespace forgotten after an invalidation does not accept a value
+    # computed before it
+    generation = cache.generation("ns")
+    cache.set("ns", "a", 1, generation=generation)
+    cache.invalidate("ns")
+    cache.set("other-1", "a", 1)
+    cache.set("other-2", "a", 2)  # evicts the last entry of "ns"
+    assert "ns" not in cache._generations
+    cache.set("ns", "a", "stale", generation=generation)
+    assert cache.get("ns", "a") is None
+
+    # expired entries release their namespace too
+    cache = QueryCache(ttl=0.05)
+    cache.set("ns", "a", 1)
+    time.sleep(0.1)
+    assert cache.get("ns", "a") is None
+    assert cache._generations == {}
+    cache.set("ns", "a", 2, generation=cache.generation("ns"))
+    assert cache.get("ns", "a") == 2
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.cache",
+        preview=False,
+    )
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from s3vectorm.catalog import HashCatalog
+
+
+def test_hash_catalog(tmp_path):
+    path = tmp_path / "hashes.sqlite"
+    with HashCatalog(path) as catalog:
+        assert len(catalog) == 0
+        assert catalog.get_many(["doc-1"]) == {}
+        catalog.set_many((f"doc-{i}", f"hash-{i}") for i in range(1200))
+        catalog.set_many([("doc-1", "new-hash")])
+        assert len(catalog) == 1200
+        keys = [f"doc-{i}" for i in range(0, 1300, 2)] + ["doc-1"]
+        hashes = catalog.get_many(keys)
+        assert len(hashes) == 601
+        assert hashes["doc-0"] == "hash-0"
+        assert hashes["doc-1"] == "new-hash"
+        catalog.delete_many(["doc-0", "missing"])
+        assert len(catalog) == 1199
+
+    # the catalog is persisted
+    with HashCatalog(path) as catalog:
+        assert len(catalog) == 1199
+        assert catalog.get_many(["doc-2"]) == {"doc-2": "hash-2"}
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.catalog",
+        preview=False,
+    )
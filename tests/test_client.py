@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import boto3
+import pytest
+
+from s3vectorm.client import (
+    recommended_max_pool_connections,
+    make_client_config,
+    prewarm_connections,
+    ClientRegistry,
+    get_client,
+)
+
+
+def make_session() -> boto3.session.Session:
+    return boto3.session.Session(
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        region_name="us-east-1",
+    )
+
+
+def test_make_client_config():
+    assert recommended_max_pool_connections(max_workers=8, segment_count=16) == 24
+    config = make_client_config(max_workers=32, segment_count=4, read_timeout=30)
+    assert config.max_pool_connections == 36
+    assert config.tcp_keepalive is True
+    assert config.read_timeout == 30
+    assert config.retries == {"mode": "standard", "max_attempts": 5}
+    assert make_client_config(max_pool_connections=50).max_pool_connections == 50
+
+
+def test_client_registry():
+    registry = ClientRegistry()
+    session = make_session()
+
+    clients = []
+
+    def get():
+        clients.append(registry.get_client(boto_session=session, max_workers=16))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in clients}) == 1
+    assert len(registry) == 1
+    client = clients[0]
+    assert client.meta.config.max_pool_connections == 32
+    assert client.meta.config.tcp_keepalive is True
+    assert client.meta.region_name == "us-east-1"
+
+    other = registry.get_client(boto_session=session, region_name="us-west-2")
+    assert other is not client
+    assert other.meta.region_name == "us-west-2"
+    assert len(registry) == 2
+
+    registry.clear()
+    assert len(registry) == 0
+    assert registry.get_client(boto_session=session, max_workers=16) is not client
+
+    assert get_client(boto_session=session) is get_client(boto_session=session)
+
+
+def test_prewarm_connections():
+    pytest.importorskip("numpy")
+    from s3vectorm.emulator import LocalS3VectorsClient
+
+    class CountingClient(LocalS3VectorsClient):
+        def __init__(self):
+            super().__init__()
+            self.threads = set()
+
+        def list_vector_buckets(self, **kwargs):
+            self.threads.add(threading.get_ident())
+            return super().list_vector_buckets(**kwargs)
+
+    client = CountingClient()
+    assert prewarm_connections(client, 4) == 4
+    assert len(client.threads) == 4
+    assert prewarm_connections(client, 0) == 0
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.client",
+        preview=False,
+    )
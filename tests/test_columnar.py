@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from s3vectorm.index import QueryVectorsOutput, ListVectorsOutput
+from s3vectorm.columnar import VectorBatch
+
+
+def test_as_vector_batch():
+    boto3_raw_data = {
+        "vectors": [
+            {
+                "key": "doc-1",
+                "data": {"float32": [0.1, 0.2, 0.3]},
+                "distance": 0.5,
+                "metadata": {"document_id": "doc-1", "chunk_seq": 1},
+            },
+            {
+                "key": "doc-2",
+                "data": {"float32": [0.4, 0.5, 0.6]},
+                "distance": 0.1,
+                "metadata": {"document_id": "doc-2", "chunk_seq": 2, "tag": "x"},
+            },
+        ]
+    }
+    out = QueryVectorsOutput(boto3_raw_data=boto3_raw_data, data_type="float32")
+    batch = out.as_vector_batch()
+    assert len(batch) == 2
+    assert batch.keys.tolist() == ["doc-1", "doc-2"]
+    assert batch.data.dtype == np.float32
+    assert batch.data.shape == (2, 3)
+    np.testing.assert_allclose(batch.distances, [0.5, 0.1])
+    assert batch.metadata["chunk_seq"].dtype.kind == "i"
+    assert batch.metadata["document_id"].tolist() == ["doc-1", "doc-2"]
+    assert batch.metadata["tag"].tolist() == [None, "x"]
+
+    top = batch.take(np.argsort(batch.distances)[:1])
+    assert top.keys.tolist() == ["doc-2"]
+    assert top.metadata["chunk_seq"].tolist() == [2]
+    assert len(batch.take(batch.distances > 1)) == 0
+
+    # no data, no distance, partial data
+    batch = ListVectorsOutput(
+        boto3_raw_data={"vectors": [{"key": "a"}, {"key": "b"}]},
+        data_type="float32",
+    ).as_vector_batch()
+    assert batch.data is None
+    assert batch.distances is None
+    assert batch.metadata == {}
+
+    batch = VectorBatch.from_raw_vectors(
+        [{"key": "a", "data": {"float32": [1.0, 2.0]}}, {"key": "b"}],
+        data_type="float32",
+    )
+    assert batch.data[0].tolist() == [1.0, 2.0]
+    assert np.isnan(batch.data[1]).all()
+
+
+def test_concat():
+    pages = [
+        ListVectorsOutput(
+            boto3_raw_data={
+                "vectors": [
+                    {"key": f"doc-{i}", "metadata": {"seq": i}} for i in range(j, j + 3)
+                ]
+            },
+            data_type="float32",
+        )
+        for j in (0, 3)
+    ]
+    pages.append(
+        ListVectorsOutput(
+            boto3_raw_data={
+                "vectors": [
+                    {"key": "x", "data": {"float32": [1.0]}, "metadata": {"tag": "t"}}
+                ]
+            },
+            data_type="float32",
+        )
+    )
+    pages.append(ListVectorsOutput(boto3_raw_data={"vectors": []}, data_type="float32"))
+    batch = VectorBatch.from_outputs(pages)
+    assert len(batch) == 7
+    assert batch.keys.tolist()[-1] == "x"
+    assert batch.metadata["seq"].tolist() == [0, 1, 2, 3, 4, 5, None]
+    assert batch.metadata["tag"].tolist() == [None] * 6 + ["t"]
+    assert np.isnan(batch.data[:6]).all()
+    assert batch.data[6].tolist() == [1.0]
+    assert batch.distances is None
+
+    assert len(VectorBatch.concat([])) == 0
+    single = pages[0].as_vector_batch()
+    assert VectorBatch.concat([single]) is single
+
+
+def test_mixed_columns():
+    def make_batch(values: list) -> VectorBatch:
+        return VectorBatch.from_raw_vectors(
+            [
+                {"key": f"doc-{i}", "metadata": {"flag": value}}
+                for i, value in enumerate(values)
+            ],
+            data_type="float32",
+        )
+
+    assert make_batch([True, False]).metadata["flag"].dtype == bool
+    assert make_batch([1, 2.5]).metadata["flag"].dtype == np.float64
+    # booleans mixed with numbers are kept as they are
+    column = make_batch([True, 2, 0.5]).metadata["flag"]
+    assert column.dtype == object
+    assert [type(value) for value in column] == [bool, int, float]
+
+    batch = VectorBatch.concat([make_batch([True, False]), make_batch([2, 3])])
+    assert batch.metadata["flag"].dtype == object
+    assert batch.metadata["flag"].tolist() == [True, False, 2, 3]
+    assert type(batch.metadata["flag"][0]) is bool
+
+
+def test_filter():
+    boto3_raw_data = {
+        "vectors": [
+            {"key": "a", "metadata": {"year": 2024, "category": "news"}},
+            {"key": "b", "metadata": {"year": 2025}},
+            {"key": "c", "metadata": {"year": 2023, "category": "blog"}},
+        ]
+    }
+    batch = ListVectorsOutput(
+        boto3_raw_data=boto3_raw_data, data_type="float32"
+    ).as_vector_batch()
+    assert batch.filter({"year": {"$gte": 2024}}).keys.tolist() == ["a", "b"]
+    assert batch.filter({"category": {"$ne": "news"}}).keys.tolist() == ["b", "c"]
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.columnar",
+        preview=False,
+    )
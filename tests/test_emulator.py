@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import botocore.exceptions
+from pydantic import Field
+
+from s3vectorm.bucket import Bucket
+from s3vectorm.index import Index
+from s3vectorm.vector import Vector
+from s3vectorm.metadata import MetaKey
+from s3vectorm.emulator import LocalS3VectorsClient
+
+
+class DocChunk(Vector):
+    category: str = Field()
+    year: int = Field()
+
+
+def error_code(e: pytest.ExceptionInfo) -> str:
+    return e.value.response["Error"]["Code"]
+
+
+def test_bucket_and_index():
+    client = LocalS3VectorsClient()
+    bucket = Bucket(name="my-bucket")
+    assert bucket.create(client) is not None
+    assert bucket.create(client) is None  # ConflictException
+
+    index = Index(
+        bucket_name="my-bucket",
+        index_name="documents",
+        data_type="float32",
+        dimension=3,
+        distance_metric="cosine",
+    )
+    assert index.create(client) is not None
+    assert index.create(client) is None
+    assert Index.get(client, "my-bucket", index_name="documents") == index
+    assert Index.get(client, "my-bucket", index_name="not-exists") is None
+    for name in ["a", "b", "c"]:
+        Index.new_for_delete("my-bucket", name).model_copy(
+            update=dict(dimension=3, data_type="float32", distance_metric="cosine")
+        ).create(client)
+
+    pages = list(bucket.list_index(client, page_size=2))
+    assert [len(page.indexes) for page in pages] == [2, 2]
+    assert [summary.indexName for page in pages for summary in page.indexes] == [
+        "a",
+        "b",
+        "c",
+        "documents",
+    ]
+
+    with pytest.raises(botocore.exceptions.ClientError) as e:
+        bucket.delete(client)
+    assert error_code(e) == "ConflictException"
+    for page in pages:
+        for summary in page.indexes:
+            Index.new_for_delete("my-bucket", summary.indexName).delete(client)
+    bucket.delete(client)
+    with pytest.raises(botocore.exceptions.ClientError) as e:
+        index.put_vectors(client, [Vector(key="doc", data=[1.0, 0.0, 0.0])])
+    assert error_code(e) == "NotFoundException"
+
+
+@pytest.fixture
+def index_config():
+    return {
+        "bucket_name": "my-bucket",
+        "name": "documents",
+        "distance_metric": "euclidean",
+    }
+
+
+def test_put_and_query_vectors(emulator_index):
+    index, client = emulator_index
+    index.put_vectors_bulk(
+        client,
+        (
+            DocChunk(
+                key=f"doc-{i}",
+                data=[float(i), 0.0],
+                category="even" if i % 2 == 0 else "odd",
+                year=2000 + i,
+            )
+            for i in range(1000)
+        ),
+        batch_size=100,
+    )
+
+    res = index.query_vectors(client, data=[10.2, 0.0], top_k=3, return_distance=True)
+    assert [vector.key for vector in res.vectors] == ["doc-10", "doc-11", "doc-9"]
+    assert res.vectors[0].distance == pytest.approx(0.2, abs=1e-5)
+
+    filter = MetaKey(name="category").eq("odd") & MetaKey(name="year").gte(2100)
+    res = index.query_vectors(
+        client, data=[10.2, 0.0], top_k=2, filter=filter, return_metadata=True
+    )
+    chunks = res.as_vector_objects(DocChunk)
+    assert [chunk.key for chunk in chunks] == ["doc-101", "doc-103"]
+    assert chunks[0].category == "odd"
+    assert chunks[0].data is None
+
+    # overwrite
+    index.put_vectors(
+        client, [DocChunk(key="doc-0", data=[10.2, 0.0], category="even", year=1)]
+    )
+    res = index.query_vectors(client, data=[10.2, 0.0], top_k=1, return_metadata=True)
+    assert res.vectors[0].key == "doc-0"
+    assert res.vectors[0].metadata == {"category": "even", "year": 1}
+
+    with pytest.raises(botocore.exceptions.ClientError) as e:
+        index.query_vectors(client, data=[1.0, 2.0, 3.0])
+    assert error_code(e) == "ValidationException"
+
+
+def test_cosine_distance():
+    client = LocalS3VectorsClient()
+    Bucket(name="my-bucket").create(client)
+    index = Index(
+        bucket_name="my-bucket",
+        index_name="documents",
+        data_type="float32",
+        dimension=2,
+        distance_metric="cosine",
+    )
+    index.create(client)
+    index.put_vectors(
+        client,
+        [
+            Vector(key="x", data=[5.0, 0.0]),
+            Vector(key="y", data=[0.0, 1.0]),
+            Vector(key="xy", data=[1.0, 1.0]),
+        ],
+    )
+    res = index.query_vectors(client, data=[1.0, 0.0], top_k=3, return_distance=True)
+    assert [vector.key for vector in res.vectors] == ["x", "xy", "y"]
+    assert [vector.distance for vector in res.vectors] == pytest.approx(
+        [0.0, 1 - 2**-0.5, 1.0], abs=1e-6
+    )
+
+
+def test_list_and_delete_vectors(emulator_index):
+    index, client = emulator_index
+    index.put_vectors_bulk(
+        client, (Vector(key=f"doc-{i}", data=[float(i), 0.0]) for i in range(1000))
+    )
+
+    pages = list(index.list_vectors(client, page_size=300, return_data=True))
+    assert [len(page.vectors) for page in pages] == [300, 300, 300, 100]
+    assert pages[0].vectors[0].data.float32 == [0.0, 0.0]
+    assert len(list(index.iter_vectors(client, Vector, max_items=250))) == 250
+
+    segments = [
+        {
+            vector.key
+            for vector in index.iter_vectors(
+                client, Vector, segment_count=4, segment_index=i
+            )
+        }
+        for i in range(4)
+    ]
+    assert sum(len(keys) for keys in segments) == 1000
+    assert set.union(*segments) == {f"doc-{i}" for i in range(1000)}
+
+    index.delete_vectors(client, keys=["doc-0", "doc-1", "not-exists"])
+    res = client.get_vectors(
+        vectorBucketName="my-bucket",
+        indexName="documents",
+        keys=["doc-0", "doc-2"],
+        returnData=True,
+    )
+    assert res["vectors"] == [{"key": "doc-2", "data": {"float32": [2.0, 0.0]}}]
+
+    assert index.delete_all_vectors(client, page_size=100, segment_count=4) == 998
+    assert list(index.iter_vectors(client, Vector)) == []
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.emulator",
+        preview=False,
+    )
@@ -1,10 +1,17 @@
 # -*- coding: utf-8 -*-
 
+import types
+import threading
+
 from s3vectorm.index import QueryVectorsOutput, Index
+from s3vectorm.cache import QueryCache
 
 import pytest
 from pydantic import Field
 from s3vectorm.vector import Vector
+from s3vectorm.metadata import MetaKey
+
+from conftest import make_index
 
 
 class TestQueryVectorsOutput:
@@ -49,11 +56,335 @@ class TestQueryVectorsOutput:
         out = QueryVectorsOutput(boto3_raw_data=boto3_raw_data, data_type="float32")
         assert len(out.as_vector_objects(DocChunk)) == 0
 
+    def test_as_vector_objects_trusted(self):
+        class DocChunk(Vector):
+            document_id: str = Field()
+            chunk_seq: int = Field()
+
+        boto3_raw_data = {
+            "vectors": [
+                {
+                    "key": f"doc-1#{i}",
+                    "data": {"float32": [0.1] * 8},
+                    "distance": 0.5,
+                    "metadata": {"document_id": "doc-1", "chunk_seq": i},
+                }
+                for i in range(3)
+            ]
+        }
+        out = QueryVectorsOutput(boto3_raw_data=boto3_raw_data, data_type="float32")
+        expected = out.as_vector_objects(DocChunk)
+        for check_metadata in (False, True):
+            vectors = out.as_vector_objects(
+                DocChunk, trusted=True, check_metadata=check_metadata
+            )
+            assert vectors == expected
+            assert all(isinstance(vector, DocChunk) for vector in vectors)
+
+        # no data, no distance
+        out = QueryVectorsOutput(
+            boto3_raw_data={"vectors": [{"key": "doc-1#1"}]}, data_type="float32"
+        )
+        vector = out.as_vector_objects(Vector, trusted=True)[0]
+        assert vector == Vector(key="doc-1#1")
+
+        # missing metadata is only detected with check_metadata
+        boto3_raw_data = {
+            "vectors": [{"key": "doc-1#1", "metadata": {"document_id": "doc-1"}}]
+        }
+        out = QueryVectorsOutput(boto3_raw_data=boto3_raw_data, data_type="float32")
+        assert len(out.as_vector_objects(DocChunk, trusted=True)) == 1
+        with pytest.raises(ValueError, match="chunk_seq"):
+            out.as_vector_objects(DocChunk, trusted=True, check_metadata=True)
+
+
+class FakePutVectorsClient:
+    def __init__(self, fail_key: str | None = None):
+        self.fail_key = fail_key
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def put_vectors(self, vectorBucketName, indexName, vectors):
+        with self.lock:
+            self.calls.append(vectors)
+        if self.fail_key in [dct["key"] for dct in vectors]:
+            raise ValueError("boom")
+
+
+class FakeQueryVectorsClient:
+    def query_vectors(self, queryVector, filter=None, **kwargs):
+        data = queryVector["float32"]
+        if data[0] < 0:
+            raise ValueError("boom")
+        return {"vectors": [{"key": f"doc-{data[0]}", "metadata": {"filter": filter}}]}
+
+
+class GroupedVector(Vector):
+    group: int = Field()
+
+
+def put_grouped_vectors(index: Index, client, n: int):
+    index.put_vectors_bulk(
+        client,
+        (
+            GroupedVector(key=f"doc-{i}", data=[1.0, float(i)], group=i % 3)
+            for i in range(n)
+        ),
+    )
+
 
 class TestIndex:
     def test_new_for_delete(self):
         index = Index.new_for_delete(bucket_name="", index_name="")
 
+    def test_put_vectors_bulk(self):
+        index = Index(
+            bucket_name="bucket",
+            index_name="index",
+            data_type="float32",
+            dimension=4,
+            distance_metric="cosine",
+        )
+        vectors = (Vector(key=f"doc-{i}", data=[0.1] * 4) for i in range(1234))
+
+        client = FakePutVectorsClient(fail_key="doc-1000")
+        result = index.put_vectors_bulk(client, vectors, batch_size=100, max_workers=4)
+        assert result.n_batches == 13
+        assert result.n_succeeded == 1134
+        assert result.n_failed == 100
+        assert len(result.failures) == 1
+        assert "doc-1000" in result.failures[0].keys
+        assert sorted(len(batch) for batch in client.calls) == [34] + [100] * 12
+        assert sorted(dct["key"] for batch in client.calls for dct in batch) == sorted(
+            f"doc-{i}" for i in range(1234)
+        )
+
+    def test_query_vectors_many(self):
+        index = Index(
+            bucket_name="bucket",
+            index_name="index",
+            data_type="float32",
+            dimension=1,
+            distance_metric="cosine",
+        )
+        client = FakeQueryVectorsClient()
+        data_list = [[float(i)] for i in range(20)]
+        data_list[5] = [-1.0]
+        results = index.query_vectors_many(client, data_list, max_workers=4)
+        assert len(results) == 20
+        assert isinstance(results[5], ValueError)
+        for i, res in enumerate(results):
+            if i != 5:
+                assert isinstance(res, QueryVectorsOutput)
+                assert res.boto3_raw_data["vectors"][0]["key"] == f"doc-{float(i)}"
+
+        with pytest.raises(ValueError):
+            index.query_vectors_many(client, data_list, return_exceptions=False)
+
+        filters = [None, MetaKey(name="a").eq(1)]
+        results = index.query_vectors_many(client, [[1.0], [2.0]], filter=filters)
+        assert results[0].boto3_raw_data["vectors"][0]["metadata"]["filter"] is None
+        assert results[1].boto3_raw_data["vectors"][0]["metadata"]["filter"] == {
+            "a": {"$eq": 1}
+        }
+        with pytest.raises(ValueError):
+            index.query_vectors_many(client, [[1.0]], filter=filters)
+        assert index.query_vectors_many(client, []) == []
+
+    def test_iter_vectors(self, emulator_index):
+        index, client = emulator_index
+        put_grouped_vectors(index, client, 250)
+        vectors = index.iter_vectors(client, Vector, page_size=100)
+        assert isinstance(next(vectors), Vector)
+        keys = [vector.key for vector in vectors]
+        assert len(keys) == 249
+
+        keys = [
+            vector.key
+            for vector in index.iter_vectors(client, Vector, max_items=30, trusted=True)
+        ]
+        assert len(keys) == 30
+
+    def test_delete_all_vectors(self, emulator_index):
+        index, client = emulator_index
+        put_grouped_vectors(index, client, 12345)
+        progress = []
+        n_deleted = index.delete_all_vectors(
+            client,
+            segment_count=4,
+            progress_callback=progress.append,
+        )
+        assert n_deleted == 12345
+        assert list(index.iter_vectors(client, Vector)) == []
+        assert progress[-1] == 12345
+        assert progress == sorted(progress)
+
+        index = make_index(client, name="index-2")
+        put_grouped_vectors(index, client, 1000)
+        assert index.delete_all_vectors(client, page_size=100, max_items=250) == 250
+        assert len(list(index.iter_vectors(client, Vector))) == 750
+
+    def test_filter_vectors(self, emulator_index):
+        index, client = emulator_index
+        put_grouped_vectors(index, client, 300)
+        group = MetaKey(name="group")
+
+        vectors = list(index.iter_vectors(client, GroupedVector, filter=group.eq(1)))
+        assert len(vectors) == 100
+        assert {vector.group for vector in vectors} == {1}
+        vectors = list(
+            index.scan_vector_objects(
+                client, GroupedVector, segment_count=4, filter=group.ne(1)
+            )
+        )
+        assert len(vectors) == 200
+
+        n_deleted = index.delete_all_vectors(client, page_size=50, filter=group.eq(0))
+        assert n_deleted == 100
+        assert {
+            vector.group
+            for vector in index.iter_vectors(
+                client, GroupedVector, return_metadata=True
+            )
+        } == {1, 2}
+
+    def test_query_vectors_cache(self):
+        index = Index(
+            bucket_name="bucket",
+            index_name="index",
+            data_type="float32",
+            dimension=1,
+            distance_metric="cosine",
+            query_cache=QueryCache(max_size=10, ttl=None),
+        )
+        assert "query_cache" not in index.model_dump()
+
+        class Client(FakeQueryVectorsClient, FakePutVectorsClient):
+            n_queries = 0
+
+            def query_vectors(self, **kwargs):
+                self.n_queries += 1
+                return super().query_vectors(**kwargs)
+
+            def delete_vectors(self, **kwargs):
+                pass
+
+        client = Client()
+        filter = MetaKey(name="category").eq("documents")
+        res1 = index.query_vectors(client, data=[1.0], filter=filter)
+        res2 = index.query_vectors(client, data=[1.0], filter=filter)
+        assert res1 is res2
+        assert client.n_queries == 1
+        index.query_vectors(client, data=[1.0], top_k=5, filter=filter)
+        index.query_vectors(client, data=[1.0], filter=filter, use_cache=False)
+        assert client.n_queries == 3
+        assert (index.query_cache.hits, index.query_cache.misses) == (1, 2)
+
+        index.put_vectors(client, [Vector(key="doc-1", data=[1.0])])
+        index.query_vectors(client, data=[1.0], filter=filter)
+        assert client.n_queries == 4
+
+        index.delete_vectors(client, keys=["doc-1"])
+        index.query_vectors(client, data=[1.0], filter=filter)
+        assert client.n_queries == 5
+
+        # a write that lands while a query is in flight: the (possibly
+        # stale) result of that query is not cached
+        class RacingClient(Client):
+            def query_vectors(self, **kwargs):
+                res = super().query_vectors(**kwargs)
+                if self.n_queries == 1:
+                    index.put_vectors(self, [Vector(key="doc-2", data=[1.0])])
+                return res
+
+        racing_client = RacingClient()
+        index.query_vectors(racing_client, data=[2.0])
+        index.query_vectors(racing_client, data=[2.0])
+        assert racing_client.n_queries == 2
+
+        # same bucket and index names in another region
+        client_1, client_2 = Client(), Client()
+        client_1.meta = types.SimpleNamespace(region_name="us-east-1")
+        client_2.meta = types.SimpleNamespace(region_name="eu-west-1")
+        index.query_vectors(client_1, data=[3.0])
+        index.query_vectors(client_2, data=[3.0])
+        assert (client_1.n_queries, client_2.n_queries) == (1, 1)
+
+    def test_get_vectors(self, emulator_index):
+        index, client = emulator_index
+        put_grouped_vectors(index, client, 5)
+        res = index.get_vectors(
+            client, keys=["doc-1", "doc-3", "missing"], return_metadata=True
+        )
+        vectors = res.as_vector_objects(GroupedVector)
+        assert [(v.key, v.group) for v in vectors] == [("doc-1", 1), ("doc-3", 0)]
+
+    def test_query_vectors_array_data(self, emulator_index):
+        np = pytest.importorskip("numpy")
+        index, client = emulator_index
+        put_grouped_vectors(index, client, 5)
+        query_vectors = client.query_vectors
+        calls = []
+
+        def spy(**kwargs):
+            calls.append(kwargs)
+            return query_vectors(**kwargs)
+
+        client.query_vectors = spy
+        res = index.query_vectors(
+            client, data=np.array([1.0, 3.0], dtype=np.float32), top_k=1
+        )
+        # numpy data is sent in the list[float] wire format
+        assert calls[0]["queryVector"] == {"float32": [1.0, 3.0]}
+        assert type(calls[0]["queryVector"]["float32"][0]) is float
+        assert res.boto3_raw_data["vectors"][0]["key"] == "doc-3"
+
+    def test_upsert_vectors(self, emulator_index):
+        from s3vectorm.catalog import HashCatalog
+
+        def make_vectors(n: int, changed: set[int] = frozenset()):
+            return [
+                GroupedVector(
+                    key=f"doc-{i}",
+                    data=[1.0, float(i)],
+                    group=(i % 3) + (10 if i in changed else 0),
+                )
+                for i in range(n)
+            ]
+
+        index, client = emulator_index
+        with pytest.raises(ValueError):
+            index.upsert_vectors(client, make_vectors(1))
+
+        # local catalog
+        catalog = HashCatalog()
+        result = index.upsert_vectors(client, make_vectors(250), catalog=catalog)
+        assert (result.n_succeeded, result.n_skipped) == (250, 0)
+        assert len(catalog) == 250
+        result = index.upsert_vectors(
+            client, make_vectors(260, changed={3, 200}), catalog=catalog, batch_size=5
+        )
+        assert (result.n_succeeded, result.n_skipped, result.n_batches) == (
+            12,
+            248,
+            3,
+        )
+        assert result.n_total == 260
+        res = index.get_vectors(client, keys=["doc-3"], return_metadata=True)
+        assert res.as_vector_objects(GroupedVector)[0].group == 10
+
+        # hash stored in the index metadata
+        index = make_index(client, name="index-2")
+        result = index.upsert_vectors(client, make_vectors(150), hash_key="hash")
+        assert (result.n_succeeded, result.n_skipped) == (150, 0)
+        res = index.get_vectors(client, keys=["doc-0"], return_metadata=True)
+        stored = res.boto3_raw_data["vectors"][0]["metadata"]
+        assert stored["hash"] == make_vectors(1)[0].content_hash()
+        result = index.upsert_vectors(
+            client, make_vectors(150, changed={7}), hash_key="hash"
+        )
+        assert (result.n_succeeded, result.n_skipped) == (1, 149)
+
 
 if __name__ == "__main__":
     from s3vectorm.tests import run_cov_test
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
-from s3vectorm.metadata import MetaKey, BaseMetadata
+import pytest
+
+from s3vectorm.metadata import MetaKey, BaseMetadata, Param, PreparedFilter
 
 
 class Vector1Meta(BaseMetadata):
@@ -175,6 +177,130 @@ def test_edge_cases():
     assert VectorMeta.e.eq(False).to_doc() == {"e": {"$eq": False}}
 
 
+def test_to_canonical_doc():
+    a, b, c = VectorMeta.a, VectorMeta.b, VectorMeta.c
+    assert a.eq(1).to_canonical_doc() == {"a": {"$eq": 1}}
+
+    # flatten
+    query = a.gt(1) & b.gt(2) & c.gt(3)
+    assert query.to_canonical_doc() == {
+        "$and": [{"a": {"$gt": 1}}, {"b": {"$gt": 2}}, {"c": {"$gt": 3}}]
+    }
+    assert (c.gt(3) & (b.gt(2) & a.gt(1))).to_canonical_doc() == (
+        query.to_canonical_doc()
+    )
+
+    # merge $eq / $in in $or, $ne / $nin in $and
+    query = a.eq(1) | b.eq(1) | a.eq(2) | a.in_([2, 3])
+    assert query.to_canonical_doc() == {
+        "$or": [{"a": {"$in": [1, 2, 3]}}, {"b": {"$eq": 1}}]
+    }
+    query = a.ne("x") & a.nin(["y"]) & b.eq(1) & b.eq(2)
+    assert query.to_canonical_doc() == {
+        "$and": [{"a": {"$nin": ["x", "y"]}}, {"b": {"$eq": 1}}, {"b": {"$eq": 2}}]
+    }
+
+    # remove duplicates, collapse single term
+    query = (a.eq(1) | a.eq(1)) & (b.gt(1) | b.gt(1))
+    assert query.to_canonical_doc() == {"$and": [{"a": {"$eq": 1}}, {"b": {"$gt": 1}}]}
+    assert (a.eq(1) & a.eq(1)).to_canonical_doc() == {"a": {"$eq": 1}}
+
+    # a collapsed inner chain is spliced into the outer chain
+    query = (a.gt(1) | a.gt(1)) | b.gt(1)
+    assert query.to_canonical_doc() == {"$or": [{"a": {"$gt": 1}}, {"b": {"$gt": 1}}]}
+
+    # nested chains of the other operator are kept
+    query = (a.eq(1) & b.eq(1)) | (a.eq(2) & b.eq(2)) | c.eq(3)
+    assert query.to_canonical_doc() == {
+        "$or": [
+            {"$and": [{"a": {"$eq": 1}}, {"b": {"$eq": 1}}]},
+            {"$and": [{"a": {"$eq": 2}}, {"b": {"$eq": 2}}]},
+            {"c": {"$eq": 3}},
+        ]
+    }
+
+    # a $in operand that is not a list is not merged
+    query = a.in_("xy") | a.eq(1) | a.eq(2)
+    assert query.to_canonical_doc() == {
+        "$or": [{"a": {"$in": "xy"}}, {"a": {"$in": [1, 2]}}]
+    }
+
+    # cached
+    assert query.to_canonical_doc() is query.to_canonical_doc()
+
+
+def test_to_canonical_doc_deep_chain():
+    query = VectorMeta.a.eq(0)
+    for i in range(1, 5000):
+        query = query | VectorMeta.a.eq(i)
+    assert query.to_canonical_doc() == {"a": {"$in": list(range(5000))}}
+
+
+def test_to_canonical_doc_is_equivalent():
+    import random
+
+    from s3vectorm.predicate import compile_filter
+
+    a, b = VectorMeta.a, VectorMeta.b
+    queries = [
+        (a.eq(1) | a.eq(2) | b.eq(1)) & (a.ne(2) & a.nin([3])),
+        (a.eq(1) & a.eq(1)) | (b.ne(1) & b.ne(2)) | a.in_([2, 3]),
+        a.eq(True) | a.eq(1) | b.exists(False),
+    ]
+    rng = random.Random(0)
+    values = [1, 2, 3, True, [1, 3], [2]]
+    rows = []
+    for _ in range(200):
+        row = {}
+        for field in "ab":
+            if rng.random() < 0.8:
+                row[field] = rng.choice(values)
+        rows.append(row)
+    for query in queries:
+        expected = compile_filter(query.to_doc())
+        actual = compile_filter(query.to_canonical_doc())
+        assert [expected(row) for row in rows] == [actual(row) for row in rows]
+
+
+def test_prepared_filter():
+    a, b, c = VectorMeta.a, VectorMeta.b, VectorMeta.c
+    template = VectorMeta.prepare(
+        a.eq(Param("a")) & b.in_(Param("b")) & c.gt(10) & a.ne("x") & a.ne("y")
+    )
+    assert template.param_names == {"a", "b"}
+    doc = template.bind(a="t-1", b=["faq", "manual"])
+    assert doc == {
+        "$and": [
+            {"a": {"$eq": "t-1"}},
+            {"a": {"$nin": ["x", "y"]}},
+            {"b": {"$in": ["faq", "manual"]}},
+            {"c": {"$gt": 10}},
+        ]
+    }
+    expected = (
+        a.eq("t-2") & b.in_(["faq"]) & c.gt(10) & a.ne("x") & a.ne("y")
+    ).to_canonical_doc()
+    assert template.bind(a="t-2", b=["faq"]) == expected
+    # the parts without placeholder are shared
+    assert template.bind(a="t-2", b=["faq"])["$and"][1] is doc["$and"][1]
+
+    # placeholders are never merged
+    template = (a.eq(Param("x")) | a.eq(Param("y")) | a.eq(1)).prepare()
+    assert template.bind(x=2, y=3) == {
+        "$or": [{"a": {"$eq": 1}}, {"a": {"$eq": 2}}, {"a": {"$eq": 3}}]
+    }
+    assert a.in_([1, Param("x")]).prepare().bind(x=2) == {"a": {"$in": [1, 2]}}
+
+    # no placeholder
+    template = PreparedFilter(a.eq(1))
+    assert template.bind() == {"a": {"$eq": 1}}
+
+    with pytest.raises(TypeError, match="missing"):
+        VectorMeta.prepare(a.eq(Param("a"))).bind()
+    with pytest.raises(TypeError, match="unexpected"):
+        VectorMeta.prepare(a.eq(Param("a"))).bind(a=1, b=2)
+
+
 if __name__ == "__main__":
     from s3vectorm.tests import run_cov_test
 
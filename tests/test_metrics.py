@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+
+import json
+import asyncio
+import threading
+import http.server
+
+import boto3
+import pytest
+import botocore.config
+import botocore.exceptions
+
+from s3vectorm.bucket import Bucket
+from s3vectorm.index import Index
+from s3vectorm.aio import AsyncIndex
+from s3vectorm.vector import Vector
+from s3vectorm.metrics import (
+    Histogram,
+    MetricsRegistry,
+    estimate_request_size,
+)
+
+
+def make_index(**kwargs) -> Index:
+    return Index(
+        bucket_name="bucket",
+        index_name="index",
+        data_type="float32",
+        dimension=3,
+        distance_metric="cosine",
+        **kwargs,
+    )
+
+
+class FakeClient:
+    def __init__(self):
+        self.n_put = 0
+
+    def put_vectors(self, **kwargs):
+        self.n_put += 1
+        if self.n_put == 2:
+            raise botocore.exceptions.ClientError(
+                error_response={
+                    "Error": {"Code": "ThrottlingException", "Message": ""},
+                    "ResponseMetadata": {"RetryAttempts": 4},
+                },
+                operation_name="PutVectors",
+            )
+        return {
+            "ResponseMetadata": {
+                "HTTPHeaders": {"content-length": "2"},
+                "RetryAttempts": 1,
+            }
+        }
+
+    def query_vectors(self, **kwargs):
+        return {
+            "vectors": [{"key": "doc-1"}, {"key": "doc-2"}],
+            "ResponseMetadata": {"HTTPHeaders": {"content-length": "120"}},
+        }
+
+
+def test_histogram():
+    histogram = Histogram(buckets=[1, 2, 5])
+    assert histogram.quantile(0.5) == 0.0
+    for value in [0.5, 1.5, 1.5, 3, 10]:
+        histogram.observe(value)
+    assert histogram.count == 5
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.mean == pytest.approx(3.3)
+    assert histogram.quantile(0.0) == 1
+    assert histogram.quantile(0.5) == 2
+    assert histogram.quantile(0.8) == 5
+    assert histogram.quantile(1.0) == 10
+    dct = histogram.to_dict()
+    assert dct["min"] == 0.5
+    assert dct["max"] == 10
+    assert dct["buckets"] == {"1": 1, "2": 2, "5": 1, "+Inf": 1}
+
+
+def test_estimate_request_size():
+    small = estimate_request_size({"queryVector": {"float32": [0.1] * 3}})
+    large = estimate_request_size({"queryVector": {"float32": [0.1] * 300}})
+    assert large > small * 50
+    assert estimate_request_size({"keys": ["a", "b"]}) == len('{"keys": ["a", "b"]}')
+
+
+def test_index_metrics():
+    events = []
+    index = make_index(metrics=MetricsRegistry(callbacks=[events.append]))
+    client = FakeClient()
+    vectors = [Vector(key=f"doc-{i}", data=[0.1, 0.2, 0.3]) for i in range(3)]
+
+    index.put_vectors(client, vectors)
+    with pytest.raises(botocore.exceptions.ClientError):
+        index.put_vectors(client, vectors[:1])
+    index.query_vectors(client, data=[0.1, 0.2, 0.3])
+
+    assert [event.operation for event in events] == [
+        "put_vectors",
+        "put_vectors",
+        "query_vectors",
+    ]
+    assert [event.succeeded for event in events] == [True, False, True]
+    assert events[1].throttled is True
+
+    put_stats = index.metrics.get_stats("put_vectors")
+    assert put_stats.count == 2
+    assert put_stats.n_errors == 1
+    assert put_stats.n_throttled == 1
+    assert put_stats.n_retries == 5
+    assert put_stats.n_vectors == 4
+    assert put_stats.request_bytes > 0
+    assert put_stats.response_bytes == 2
+    assert put_stats.latency.count == 2
+
+    query_stats = index.metrics.get_stats("query_vectors")
+    assert query_stats.n_vectors == 2
+    assert query_stats.response_bytes == 120
+
+    # the returned stats is a snapshot
+    put_stats.latency.observe(1.0)
+    assert index.metrics.get_stats("put_vectors").latency.count == 2
+
+    assert sorted(index.metrics.operations) == ["put_vectors", "query_vectors"]
+    assert index.metrics.to_dict()["put_vectors"]["n_throttled"] == 1
+    assert index.metrics.get_stats("delete_vectors").count == 0
+    index.metrics.reset()
+    assert index.metrics.to_dict() == {}
+
+    # metrics are not part of the serialized index
+    assert "metrics" not in index.model_dump()
+
+
+class ThrottlingHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answer the first ``n_throttles`` requests with a throttling error, then
+    with an empty success response.
+    """
+
+    n_throttles = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["content-length"]))
+        if self.server.n_requests < self.n_throttles:
+            status, body = 429, {"message": "slow down"}
+            headers = {"x-amzn-ErrorType": "ThrottlingException"}
+        else:
+            status, body, headers = 200, {}, {}
+        self.server.n_requests += 1
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def throttling_client():
+    def make(n_throttles: int, max_attempts: int):
+        handler = type("Handler", (ThrottlingHandler,), {"n_throttles": n_throttles})
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server.n_requests = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return boto3.client(
+            "s3vectors",
+            region_name="us-east-1",
+            endpoint_url=f"http://127.0.0.1:{server.server_port}",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+            config=botocore.config.Config(
+                retries={"mode": "standard", "max_attempts": max_attempts},
+            ),
+        )
+
+    servers = []
+    yield make
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_throttled_attempts(throttling_client, monkeypatch):
+    monkeypatch.setattr(  # no retry backoff
+        "botocore.retries.standard.ExponentialBackoff.delay_amount",
+        lambda self, context: 0,
+    )
+    index = make_index(metrics=MetricsRegistry())
+
+    # two throttled attempts, then botocore's retry succeeds
+    client = throttling_client(n_throttles=2, max_attempts=5)
+    index.delete_vectors(client, keys=["doc-1"])
+    index.delete_vectors(client, keys=["doc-2"])
+    stats = index.metrics.get_stats("delete_vectors")
+    assert stats.count == 2
+    assert stats.n_errors == 0
+    assert stats.n_throttled == 0
+    assert stats.n_throttled_attempts == 2
+    assert stats.n_retries == 2
+
+    # the retries are exhausted, the call fails with the throttling error,
+    # after the initial attempt and 2 retries
+    client = throttling_client(n_throttles=10, max_attempts=2)
+    with pytest.raises(botocore.exceptions.ClientError):
+        index.delete_vectors(client, keys=["doc-1"])
+    stats = index.metrics.get_stats("delete_vectors")
+    assert stats.n_throttled == 1
+    assert stats.n_throttled_attempts == 2 + 3
+
+    # instrumenting a client is idempotent, a client without a botocore
+    # event system is left alone
+    assert index.metrics.instrument_client(client) is True
+    assert index.metrics.instrument_client(FakeClient()) is False
+    assert index.metrics.instrument_client(None) is False
+
+
+def test_index_metrics_with_emulator():
+    pytest.importorskip("numpy")
+    from s3vectorm.emulator import LocalS3VectorsClient
+
+    client = LocalS3VectorsClient()
+    client.create_vector_bucket(vectorBucketName="bucket")
+    index = make_index(metrics=MetricsRegistry())
+    index.create(client)
+    index.put_vectors(
+        client,
+        [Vector(key=f"doc-{i}", data=[0.1, 0.2, i]) for i in range(10)],
+    )
+    pages = list(index.list_vectors(client, page_size=4))
+    index.delete_vectors(client, keys=["doc-1", "doc-2"])
+
+    stats = index.metrics.to_dict()
+    assert stats["create_index"]["count"] == 1
+    assert stats["put_vectors"]["n_vectors"] == 10
+    assert stats["list_vectors"]["count"] == len(pages) == 3
+    assert stats["list_vectors"]["n_vectors"] == 10
+    assert stats["delete_vectors"]["n_vectors"] == 2
+
+    metrics = MetricsRegistry()
+    index = Index.get(client, "bucket", index_name="index", metrics=metrics)
+    assert index.metrics is metrics
+    assert Index.get(client, "bucket", index_name="missing", metrics=metrics) is None
+    assert metrics.get_stats("get_index").count == 2
+    assert metrics.get_stats("get_index").n_errors == 1
+
+
+def test_bucket_metrics_with_emulator():
+    pytest.importorskip("numpy")
+    from s3vectorm.emulator import LocalS3VectorsClient
+
+    client = LocalS3VectorsClient()
+    bucket = Bucket(name="bucket", metrics=MetricsRegistry())
+    bucket.create(client)
+    assert bucket.create(client) is None  # already exists
+    index = make_index()
+    index.create(client)
+    pages = list(bucket.list_index(client))
+    index.delete(client)
+    bucket.delete(client)
+
+    stats = bucket.metrics.to_dict()
+    assert stats["create_vector_bucket"]["count"] == 2
+    assert stats["create_vector_bucket"]["n_errors"] == 1
+    assert stats["list_indexes"]["count"] == len(pages) == 1
+    assert stats["delete_vector_bucket"]["count"] == 1
+
+    # metrics are not part of the serialized bucket
+    assert bucket.model_dump() == {"name": "bucket"}
+
+
+class FakeAsyncPaginator:
+    async def _iter(self):
+        yield {"vectors": [{"key": "doc-1"}, {"key": "doc-2"}]}
+        raise botocore.exceptions.ClientError(
+            error_response={"Error": {"Code": "SlowDown", "Message": ""}},
+            operation_name="ListVectors",
+        )
+
+    def paginate(self, **kwargs):
+        return self._iter()
+
+
+class FakeAsyncClient:
+    async def delete_vectors(self, **kwargs):
+        await asyncio.sleep(0)
+        return {}
+
+    def get_paginator(self, name):
+        return FakeAsyncPaginator()
+
+
+def test_async_index_metrics():
+    async def main():
+        index = AsyncIndex(**make_index().model_dump(), metrics=MetricsRegistry())
+        client = FakeAsyncClient()
+        await index.delete_vectors(client, keys=["doc-1"])
+        pages = []
+        with pytest.raises(botocore.exceptions.ClientError):
+            async for page in index.list_vectors(client):
+                pages.append(page)
+        assert len(pages) == 1
+        return index.metrics
+
+    metrics = asyncio.run(main())
+    assert metrics.get_stats("delete_vectors").n_vectors == 1
+    list_stats = metrics.get_stats("list_vectors")
+    assert list_stats.count == 2
+    assert list_stats.n_vectors == 2
+    assert list_stats.n_throttled == 1
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.metrics",
+        preview=False,
+    )
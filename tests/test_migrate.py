@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from s3vectorm.emulator import LocalS3VectorsClient
+
+from conftest import make_index, fill, dump_index, FlakyClient
+
+
+def make_vector_dcts(n: int) -> list[dict]:
+    return [
+        {
+            "key": f"doc-{i}",
+            "data": {"float32": [float(i), 1.0, 2.0]},
+            "metadata": {"group": i % 3, "old_name": str(i)},
+        }
+        for i in range(n)
+    ]
+
+
+def test_copy_to():
+    client = LocalS3VectorsClient()
+    source = make_index(client, "source", dimension=3)
+    fill(source, client, make_vector_dcts(300))
+
+    # another client, another distance metric
+    target_client = LocalS3VectorsClient()
+    target = make_index(
+        target_client, "target", dimension=3, distance_metric="euclidean"
+    )
+    result = source.copy_to(
+        client, target, target_client, segment_count=4, page_size=40, batch_size=30
+    )
+    assert (result.n_succeeded, result.n_failed, result.n_skipped) == (300, 0, 0)
+    assert dump_index(target, target_client) == dump_index(source, client)
+
+    # transforms
+    def transform(dct):
+        if dct["metadata"]["group"] == 0:
+            return None
+        metadata = dict(dct["metadata"])
+        metadata["new_name"] = metadata.pop("old_name")
+        return {**dct, "metadata": metadata}
+
+    def batch_transform(dcts):
+        data = np.array([dct["data"]["float32"] for dct in dcts])
+        projected = data[:, :2] * 2
+        return [
+            {**dct, "data": {"float32": row.tolist()}}
+            for dct, row in zip(dcts, projected)
+        ]
+
+    projected = make_index(client, "projected", dimension=2)
+    result = source.copy_to(
+        client, projected, transform=transform, batch_transform=batch_transform
+    )
+    assert result.n_succeeded == 200
+    vectors = dump_index(projected, client)
+    assert vectors["doc-4"]["data"]["float32"] == [8.0, 2.0]
+    assert vectors["doc-4"]["metadata"] == {"group": 1, "new_name": "4"}
+    assert "doc-3" not in vectors
+
+    with pytest.raises(ValueError):
+        source.copy_to(client, projected)
+
+
+def test_copy_to_resume(tmp_path):
+    client = LocalS3VectorsClient()
+    source = make_index(client, "source", dimension=3)
+    fill(source, client, make_vector_dcts(300))
+
+    target_client = FlakyClient("put_vectors", fail_keys={"doc-150"})
+    target = make_index(target_client, "target", dimension=3)
+    checkpoint_path = tmp_path / "copy.json"
+    result = source.copy_to(
+        client,
+        target,
+        target_client,
+        checkpoint_path=checkpoint_path,
+        segment_count=1,
+        page_size=50,
+        batch_size=25,
+        max_workers=1,
+    )
+    assert (result.n_succeeded, result.n_failed) == (275, 25)
+    state = json.loads(checkpoint_path.read_text())
+    assert state["complete"] is False
+    # the segment stopped before the page of the failed batch
+    assert state["segments"]["0"]["done"] is False
+
+    result = source.copy_to(
+        client, target, target_client, checkpoint_path=checkpoint_path
+    )
+    assert result.n_failed == 0
+    assert result.n_skipped == 275
+    # the failed page and the pages after it are copied again
+    assert 0 < result.n_succeeded < 300
+    assert json.loads(checkpoint_path.read_text())["complete"] is True
+    assert dump_index(target, target_client) == dump_index(source, client)
+
+    # a finished copy is not run again
+    result = source.copy_to(
+        client, target, target_client, checkpoint_path=checkpoint_path
+    )
+    assert result.n_batches == 0
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.migrate",
+        preview=False,
+    )
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from s3vectorm.vector import Vector
+from s3vectorm.emulator import LocalS3VectorsClient
+
+from conftest import make_index
+
+
+class SlowPutClient(LocalS3VectorsClient):
+    """
+    A ``put_vectors`` call waits until an embedding runs during the call.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.n_puts_in_flight = 0
+        self.lock = threading.Lock()
+        self.overlapped = threading.Event()
+
+    def put_vectors(self, **kwargs):
+        with self.lock:
+            self.n_puts_in_flight += 1
+        try:
+            self.overlapped.wait(timeout=5)
+            return super().put_vectors(**kwargs)
+        finally:
+            with self.lock:
+                self.n_puts_in_flight -= 1
+
+
+def to_vector(row: int, embedding: list[float]) -> Vector:
+    return Vector(key=f"doc-{row}", data=embedding)
+
+
+def test_ingest():
+    client = SlowPutClient()
+    index = make_index(client)
+    n_embeds_in_flight = 0
+    max_embeds_in_flight = 0
+    lock = threading.Lock()
+
+    def embed(rows: list[int]) -> list[list[float]]:
+        nonlocal n_embeds_in_flight, max_embeds_in_flight
+        with lock:
+            n_embeds_in_flight += 1
+            max_embeds_in_flight = max(max_embeds_in_flight, n_embeds_in_flight)
+        with client.lock:
+            if client.n_puts_in_flight:
+                client.overlapped.set()
+        try:
+            if 40 <= rows[0] < 50:
+                raise RuntimeError("model overloaded")
+            return [[1.0, float(row)] for row in rows]
+        finally:
+            with lock:
+                n_embeds_in_flight -= 1
+
+    result = index.ingest(
+        client,
+        rows=iter(range(200)),
+        embed=embed,
+        to_vector=to_vector,
+        embed_batch_size=10,
+        embed_workers=2,
+        put_batch_size=20,
+        put_workers=2,
+    )
+    # the embedding went on while vectors were uploaded
+    assert client.overlapped.is_set()
+    assert max_embeds_in_flight <= 2
+    assert (result.n_rows, result.n_embed_failed) == (200, 10)
+    assert result.embed_failures[0].rows == list(range(40, 50))
+    assert result.put_result.n_succeeded == 190
+    assert result.ok is False
+    res = index.get_vectors(client, keys=["doc-7", "doc-45"], return_data=True)
+    assert [dct["key"] for dct in res.boto3_raw_data["vectors"]] == ["doc-7"]
+
+
+def test_ingest_bad_rows():
+    client = LocalS3VectorsClient()
+    index = make_index(client)
+
+    # a short embed result fails the whole batch, the other batches go on
+    def embed(rows: list[int]) -> list[list[float]]:
+        embeddings = [[1.0, float(row)] for row in rows]
+        return embeddings[:-1] if rows[0] == 0 else embeddings
+
+    result = index.ingest(
+        client, rows=range(6), embed=embed, to_vector=to_vector, embed_batch_size=3
+    )
+    assert (result.n_rows, result.n_embed_failed) == (6, 3)
+    assert result.embed_failures[0].rows == [0, 1, 2]
+    assert isinstance(result.embed_failures[0].error, ValueError)
+    assert result.put_result.n_succeeded == 3
+
+    # a failing to_vector fails its row only
+    def bad_to_vector(row: int, embedding: list[float]) -> Vector:
+        if row == 4:
+            raise KeyError("id")
+        return to_vector(row, embedding)
+
+    result = index.ingest(
+        client,
+        rows=range(6),
+        embed=lambda rows: [[1.0, float(row)] for row in rows],
+        to_vector=bad_to_vector,
+        embed_batch_size=3,
+    )
+    assert (result.n_rows, result.n_embed_failed) == (6, 1)
+    assert result.embed_failures[0].rows == [4]
+    assert isinstance(result.embed_failures[0].error, KeyError)
+    assert result.put_result.n_succeeded == 5
+    assert result.ok is False
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.pipeline",
+        preview=False,
+    )
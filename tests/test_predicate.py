@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from s3vectorm.metadata import MetaKey
+from s3vectorm.predicate import compile_filter, filter_mask
+
+category = MetaKey(name="category")
+year = MetaKey(name="year")
+score = MetaKey(name="score")
+draft = MetaKey(name="draft")
+tags = MetaKey(name="tags")
+
+ROWS = [
+    {"category": "news", "year": 2024, "score": 0.5, "draft": False, "tags": ["a"]},
+    {"category": "blog", "year": 2025, "score": 1.5, "draft": True, "tags": ["a", "b"]},
+    {"category": "news", "year": 2023, "score": 2.5, "draft": False, "tags": []},
+    {"year": 2020, "score": 1.0, "draft": True},
+]
+
+CASES = [
+    (category.eq("news"), [0, 2]),
+    (category.ne("news"), [1, 3]),
+    (category.in_(["blog", "video"]), [1]),
+    (category.nin(["blog", "video"]), [0, 2, 3]),
+    (category.exists(True), [0, 1, 2]),
+    (category.exists(False), [3]),
+    (year.gt(2023), [0, 1]),
+    (year.gte(2024), [0, 1]),
+    (year.lt(2024), [2, 3]),
+    (year.lte(2023), [2, 3]),
+    (score.gt(1), [1, 2]),
+    (year.in_([2020, 2024]), [0, 3]),
+    (year.nin([2020, 2024]), [1, 2]),
+    (year.eq("2024"), []),
+    (draft.eq(True), [1, 3]),
+    (draft.eq(1), []),
+    (draft.gt(0), []),
+    (tags.eq("a"), [0, 1]),
+    (tags.ne("a"), [2, 3]),
+    (tags.in_(["b", "c"]), [1]),
+    (tags.nin(["b", "c"]), [0, 2, 3]),
+    (category.eq("news") & year.gte(2024), [0]),
+    (category.eq("blog") | year.lt(2021), [1, 3]),
+    ((category.eq("news") | draft.eq(True)) & score.lt(2), [0, 1, 3]),
+    ({"category": "news", "year": {"$lte": 2023}}, [2]),
+    ({"$or": [{"category": "blog"}, {"missing": {"$exists": True}}]}, [1]),
+]
+
+
+@pytest.mark.parametrize("filter,expected", CASES)
+def test_compile_filter(filter, expected):
+    predicate = compile_filter(filter)
+    assert [i for i, row in enumerate(ROWS) if predicate(row)] == expected
+
+
+@pytest.mark.parametrize("filter,expected", CASES)
+def test_filter_mask(filter, expected):
+    np = pytest.importorskip("numpy")
+    from s3vectorm.columnar import to_column
+
+    fields = ["category", "year", "score", "draft", "tags"]
+    # year / score / draft become numeric columns, the others object columns
+    columns = {field: to_column([row.get(field) for row in ROWS]) for field in fields}
+    assert columns["year"].dtype.kind == "i"
+    assert columns["draft"].dtype.kind == "b"
+    mask = filter_mask(filter, columns)
+    assert np.flatnonzero(mask).tolist() == expected
+
+
+def test_invalid_filter():
+    with pytest.raises(ValueError):
+        compile_filter({"year": {"$like": 2024}})
+    with pytest.raises(ValueError):
+        compile_filter(year.in_(2024))
+    with pytest.raises(ValueError):
+        compile_filter(year.gt("2024"))
+    with pytest.raises(ValueError):
+        compile_filter({"$and": {"year": 2024}})
+    with pytest.raises(ValueError):
+        filter_mask(year.eq(2024), {})
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.predicate",
+        preview=False,
+    )
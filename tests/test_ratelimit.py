@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+import pytest
+import botocore.exceptions
+
+from s3vectorm.index import Index
+from s3vectorm.vector import Vector
+from s3vectorm.ratelimit import AdaptiveRateLimiter, is_throttling_error
+
+
+def client_error(code: str) -> botocore.exceptions.ClientError:
+    return botocore.exceptions.ClientError(
+        error_response={"Error": {"Code": code, "Message": ""}},
+        operation_name="PutVectors",
+    )
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_limiter(fake_time: FakeTime, **kwargs) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(clock=fake_time.clock, sleep=fake_time.sleep, **kwargs)
+
+
+def test_validation():
+    with pytest.raises(ValueError):
+        AdaptiveRateLimiter(initial_rate=0)
+    with pytest.raises(ValueError):
+        AdaptiveRateLimiter(multiplicative_decrease=1)
+    with pytest.raises(ValueError):
+        AdaptiveRateLimiter(min_concurrency=4, max_concurrency=2)
+
+
+def test_is_throttling_error():
+    assert is_throttling_error(client_error("ThrottlingException")) is True
+    assert is_throttling_error(client_error("ValidationException")) is False
+    assert is_throttling_error(ValueError("boom")) is False
+
+
+def test_token_bucket():
+    fake_time = FakeTime()
+    limiter = make_limiter(fake_time, initial_rate=10)
+    for _ in range(11):
+        limiter.acquire()
+    # the first call uses the initial token, the next ones wait 0.1 second each
+    assert fake_time.now == pytest.approx(1.0)
+
+    # idle time refills at most one second worth of tokens
+    fake_time.now += 100
+    for _ in range(10):
+        limiter.acquire()
+    assert fake_time.now == pytest.approx(101.0)
+    limiter.acquire()
+    assert fake_time.now == pytest.approx(101.1)
+
+
+def test_aimd():
+    fake_time = FakeTime()
+    limiter = make_limiter(
+        fake_time,
+        initial_rate=10,
+        min_rate=1,
+        max_rate=12,
+        max_concurrency=8,
+        min_concurrency=2,
+        cooldown=1.0,
+    )
+    assert limiter.rate == 10
+    assert limiter.concurrency == 8
+
+    limiter.on_throttle()
+    assert limiter.rate == 5
+    assert limiter.concurrency == 4
+    # within the cooldown, the other throttled calls in flight are ignored
+    limiter.on_throttle()
+    assert limiter.rate == 5
+    assert limiter.n_throttled == 2
+
+    fake_time.now += 1
+    limiter.on_throttle()
+    fake_time.now += 1
+    limiter.on_throttle()
+    assert limiter.rate == 1.25
+    assert limiter.concurrency == 2  # min_concurrency
+
+    # additive increase, about +1 call per second per second
+    for _ in range(200):
+        limiter.on_success()
+    assert limiter.rate == 12  # max_rate
+    assert limiter.concurrency == 8
+
+
+def test_latency_target():
+    fake_time = FakeTime()
+    limiter = make_limiter(fake_time, initial_rate=10, latency_target=1.0)
+    limiter.on_success(latency=0.5)
+    assert limiter.rate > 10
+    limiter.on_success(latency=2.0)
+    assert limiter.rate < 10
+
+
+def test_call():
+    fake_time = FakeTime()
+    limiter = make_limiter(fake_time, initial_rate=100, max_retries=2)
+
+    errors = [client_error("ThrottlingException"), client_error("SlowDown")]
+
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return {"ResponseMetadata": {"RetryAttempts": 0}}
+
+    assert limiter.call(flaky) == {"ResponseMetadata": {"RetryAttempts": 0}}
+    assert limiter.n_throttled == 2
+    assert len(fake_time.sleeps) >= 2
+
+    # retries exhausted
+    def throttled():
+        raise client_error("ThrottlingException")
+
+    with pytest.raises(botocore.exceptions.ClientError):
+        limiter.call(throttled)
+    assert limiter.n_throttled == 5
+
+    # other errors are not retried
+    calls = []
+
+    def invalid():
+        calls.append(1)
+        raise client_error("ValidationException")
+
+    with pytest.raises(botocore.exceptions.ClientError):
+        limiter.call(invalid)
+    assert calls == [1]
+
+    # a response that botocore got after retries is a congestion signal
+    fake_time.now += 10
+    rate = limiter.rate
+    limiter.call(lambda: {"ResponseMetadata": {"RetryAttempts": 3}})
+    assert limiter.rate == rate / 2
+
+
+def test_slot():
+    limiter = AdaptiveRateLimiter(initial_rate=1000, max_rate=1000, max_concurrency=2)
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal in_flight, max_in_flight
+        with limiter.slot():
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max_in_flight == 2
+
+
+class ThrottlingClient:
+    def __init__(self):
+        self.n_calls = 0
+        self.keys = set()
+        self.lock = threading.Lock()
+
+    def put_vectors(self, vectors, **kwargs):
+        with self.lock:
+            self.n_calls += 1
+            if self.n_calls % 3 == 0:
+                raise client_error("ThrottlingException")
+            self.keys.update(dct["key"] for dct in vectors)
+        return {}
+
+    def delete_vectors(self, keys, **kwargs):
+        with self.lock:
+            self.n_calls += 1
+            if self.n_calls % 3 == 0:
+                raise client_error("TooManyRequestsException")
+            self.keys.difference_update(keys)
+        return {}
+
+
+def test_index_rate_limiter():
+    limiter = AdaptiveRateLimiter(
+        initial_rate=1000,
+        max_rate=1000,
+        base_delay=0.001,
+        max_delay=0.01,
+        cooldown=0,
+    )
+    index = Index(
+        bucket_name="bucket",
+        index_name="index",
+        data_type="float32",
+        dimension=3,
+        distance_metric="cosine",
+        rate_limiter=limiter,
+    )
+    assert "rate_limiter" not in index.model_dump()
+
+    client = ThrottlingClient()
+    result = index.put_vectors_bulk(
+        client,
+        (Vector(key=f"doc-{i}", data=[0.1, 0.2, 0.3]) for i in range(100)),
+        batch_size=10,
+        max_workers=4,
+    )
+    assert result.n_succeeded == 100
+    assert result.n_failed == 0
+    assert len(client.keys) == 100
+    assert limiter.n_throttled > 0
+    assert limiter.rate < 1000
+
+    index.delete_vectors(client, keys=[f"doc-{i}" for i in range(50)])
+    index.delete_vectors(client, keys=[f"doc-{i}" for i in range(50, 100)])
+    assert client.keys == set()
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.ratelimit",
+        preview=False,
+    )
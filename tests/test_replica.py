@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+import pickle
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from s3vectorm.index import Index
+from s3vectorm.emulator import LocalS3VectorsClient
+from s3vectorm.replica import LocalReplica
+
+from conftest import fill
+
+
+@pytest.fixture
+def index_config():
+    return {"dimension": 8}
+
+
+def put(index: Index, client: LocalS3VectorsClient, keys: range, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    dcts = [
+        {
+            "key": f"doc-{i}",
+            "data": {"float32": rng.normal(size=8).tolist()},
+            "metadata": {"group": i % 4, "tag": "even" if i % 2 == 0 else "odd"},
+        }
+        for i in keys
+    ]
+    fill(index, client, dcts)
+
+
+def query(index: Index, client: LocalS3VectorsClient, data, top_k, filter=None):
+    res = index.query_vectors(
+        client, data=data, top_k=top_k, filter=filter, return_distance=True
+    )
+    return [v.key for v in res.vectors], [v.distance for v in res.vectors]
+
+
+@pytest.mark.parametrize(
+    "index_config",
+    [
+        {"dimension": 8, "distance_metric": "cosine"},
+        {"dimension": 8, "distance_metric": "euclidean"},
+    ],
+)
+def test_search(tmp_path, emulator_index):
+    index, client = emulator_index
+    put(index, client, range(500))
+    replica = LocalReplica.build(index, client, tmp_path / "replica", segment_count=4)
+    assert len(replica) == 500
+
+    queries = np.random.default_rng(1).normal(size=(20, 8)).astype(np.float32)
+    keys, distances = replica.search(queries, top_k=5, chunk_size=64)
+    assert keys.shape == distances.shape == (20, 5)
+    filter = {"group": {"$in": [1, 2]}, "tag": "odd"}
+    filtered_keys, _ = replica.search(queries, top_k=5, filter=filter, chunk_size=64)
+    for i, data in enumerate(queries.tolist()):
+        expected_keys, expected_distances = query(index, client, data, 5)
+        assert keys[i].tolist() == expected_keys
+        np.testing.assert_allclose(distances[i], expected_distances, atol=1e-4)
+        assert filtered_keys[i].tolist() == query(index, client, data, 5, filter)[0]
+
+    # one query
+    keys, distances = replica.search(queries[0], top_k=3)
+    assert keys.shape == (3,)
+    batch = replica.query_vectors(queries[0], top_k=3, return_data=True)
+    assert batch.keys.tolist() == keys.tolist()
+    assert batch.data.shape == (3, 8)
+    assert set(batch.metadata) == {"group", "tag"}
+
+    # fewer matches than top_k
+    keys, _ = replica.search(queries, top_k=5, filter={"group": 99})
+    assert keys.shape == (20, 0)
+
+
+def test_refresh(tmp_path, emulator_index):
+    index, client = emulator_index
+    put(index, client, range(100))
+    replica = LocalReplica.build(index, client, tmp_path / "replica")
+
+    # nothing changed
+    result = replica.refresh(index, client)
+    assert (result.n_added, result.n_updated, result.n_deleted) == (0, 0, 0)
+
+    put(index, client, range(100, 110))
+    index.delete_vectors(client, keys=["doc-0", "doc-1"])
+    client.put_vectors(
+        vectorBucketName="bucket",
+        indexName="index",
+        vectors=[
+            {
+                "key": "doc-5",
+                "data": {"float32": [1.0] * 8},
+                "metadata": {"group": 9},
+            }
+        ],
+    )
+    result = replica.refresh(index, client)
+    assert (result.n_added, result.n_updated, result.n_deleted) == (10, 1, 2)
+    assert len(replica) == 108
+    assert replica.get_metadata("doc-5") == {"group": 9}
+    keys, _ = replica.search([1.0] * 8, top_k=1)
+    assert keys.tolist() == ["doc-5"]
+    keys, _ = replica.search(np.ones((1, 8)), top_k=200)
+    assert "doc-0" not in set(keys[0].tolist())
+    assert len(keys[0]) == 108
+
+    # refresh by keys, the data of doc-6 changed without a metadata change
+    old_metadata = replica.get_metadata("doc-6")
+    client.put_vectors(
+        vectorBucketName="bucket",
+        indexName="index",
+        vectors=[
+            {
+                "key": "doc-6",
+                "data": {"float32": [-1.0] * 8},
+                "metadata": old_metadata,
+            }
+        ],
+    )
+    index.delete_vectors(client, keys=["doc-7"])
+    result = replica.refresh(index, client, keys=["doc-6", "doc-7", "doc-404"])
+    assert (result.n_added, result.n_updated, result.n_deleted) == (0, 1, 1)
+    keys, _ = replica.search([-1.0] * 8, top_k=1)
+    assert keys.tolist() == ["doc-6"]
+
+    # another process sees the same state
+    other = pickle.loads(pickle.dumps(replica))
+    assert isinstance(other.data, np.memmap)
+    assert len(other) == len(replica) == 107
+    assert other.search([-1.0] * 8, top_k=1)[0].tolist() == ["doc-6"]
+
+    # the refreshed snapshot imports the current state
+    target = Index(**{**index.model_dump(), "index_name": "target"})
+    target.create(client)
+    assert target.import_snapshot(client, tmp_path / "replica").n_succeeded == 107
+
+
+@pytest.mark.parametrize(
+    "index_config", [{"dimension": 8, "distance_metric": "euclidean"}]
+)
+def test_compact(tmp_path, emulator_index):
+    index, client = emulator_index
+    put(index, client, range(100))
+    path = tmp_path / "replica"
+    replica = LocalReplica.build(index, client, path)
+    queries = np.random.default_rng(1).normal(size=(5, 8)).astype(np.float32)
+
+    # a refresh only computes the norms of the appended rows
+    replica._squared_norms[0] = -1.0
+    put(index, client, range(0, 120, 2), seed=1)
+    result = replica.refresh(index, client, keys=[f"doc-{i}" for i in range(0, 120, 2)])
+    assert (result.n_added, result.n_updated, result.compacted) == (10, 50, False)
+    assert replica._squared_norms[0] == -1.0
+    assert len(replica._squared_norms) == 160
+    replica._squared_norms[0] = np.dot(replica.data[0], replica.data[0])
+    np.testing.assert_allclose(
+        replica._squared_norms, LocalReplica(path)._squared_norms
+    )
+    assert replica.deleted_ratio == 50 / 160
+    expected_keys, expected_distances = replica.search(queries, top_k=10)
+    size = (path / "vectors.f32").stat().st_size
+
+    replica.compact()
+    assert len(replica) == len(replica.keys) == 110
+    assert replica.deleted_ratio == 0.0
+    assert (path / "vectors.f32").stat().st_size == size * 110 // 160
+    assert not (path / "deleted.jsonl").exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["replica"]
+    keys, distances = replica.search(queries, top_k=10)
+    assert keys.tolist() == expected_keys.tolist()
+    np.testing.assert_allclose(distances, expected_distances)
+    assert replica.get_metadata("doc-3") == {"group": 3, "tag": "odd"}
+    other = LocalReplica(path)
+    np.testing.assert_allclose(replica._squared_norms, other._squared_norms)
+    assert other.search(queries, top_k=10)[0].tolist() == expected_keys.tolist()
+
+    # a refresh compacts the replica when too many rows are deleted
+    index.delete_vectors(client, keys=[f"doc-{i}" for i in range(60)])
+    result = replica.refresh(index, client, max_deleted_ratio=None)
+    assert (result.n_deleted, result.compacted) == (60, False)
+    index.delete_vectors(client, keys=["doc-60"])
+    result = replica.refresh(index, client)
+    assert (result.n_deleted, result.compacted) == (1, True)
+    assert len(replica) == len(replica.keys) == 49
+
+    # the compacted snapshot imports the current state
+    target = Index(**{**index.model_dump(), "index_name": "target"})
+    target.create(client)
+    assert target.import_snapshot(client, path).n_succeeded == 49
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.replica",
+        preview=False,
+    )
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+from s3vectorm.index import Index
+from s3vectorm.vector import Vector
+from s3vectorm.scan import iter_segment_pages
+
+
+class FakeListVectorsPaginator:
+    def __init__(self, client):
+        self.client = client
+
+    def paginate(
+        self,
+        vectorBucketName,
+        indexName,
+        segmentCount=1,
+        segmentIndex=0,
+        returnData=False,
+        returnMetadata=False,
+        PaginationConfig=None,
+    ):
+        page_size = PaginationConfig["PageSize"]
+        keys = [
+            key
+            for i, key in enumerate(self.client.keys)
+            if i % segmentCount == segmentIndex
+        ]
+        first = int(PaginationConfig.get("StartingToken", 0))
+        for start in range(first, len(keys), page_size):
+            if self.client.fail_segment == segmentIndex:
+                raise ValueError("boom")
+            with self.client.lock:
+                self.client.n_calls += 1
+            chunk = keys[start : start + page_size]
+            res = {"vectors": [{"key": key} for key in chunk]}
+            if start + page_size < len(keys):
+                res["nextToken"] = str(start + page_size)
+            yield res
+
+
+class FakeListVectorsClient:
+    def __init__(self, n: int, fail_segment: int | None = None):
+        self.keys = [f"doc-{i}" for i in range(n)]
+        self.fail_segment = fail_segment
+        self.n_calls = 0
+        self.lock = threading.Lock()
+
+    def get_paginator(self, name):
+        assert name == "list_vectors"
+        return FakeListVectorsPaginator(self)
+
+
+index = Index(
+    bucket_name="bucket",
+    index_name="index",
+    data_type="float32",
+    dimension=4,
+    distance_metric="cosine",
+)
+
+
+def test_iter_segment_pages():
+    client = FakeListVectorsClient(n=1000)
+    pages = list(iter_segment_pages(index, client, segment_count=4, page_size=30))
+    keys = [dct["key"] for p in pages for dct in p.page.boto3_raw_data["vectors"]]
+    assert sorted(keys) == sorted(client.keys)
+    assert {p.segment_index for p in pages} == {0, 1, 2, 3}
+    # the last page of every segment has no next token
+    assert sum(1 for p in pages if p.next_token is None) == 4
+
+    # single segment
+    pages = list(iter_segment_pages(index, client, segment_count=1, page_size=300))
+    assert len(pages) == 4
+
+
+def test_iter_segment_pages_error():
+    client = FakeListVectorsClient(n=1000, fail_segment=2)
+    with pytest.raises(ValueError):
+        list(iter_segment_pages(index, client, segment_count=4, page_size=30))
+
+    with pytest.raises(ValueError):
+        list(iter_segment_pages(index, client, segment_count=17))
+
+
+def test_iter_segment_pages_early_stop():
+    client = FakeListVectorsClient(n=10000)
+    gen = iter_segment_pages(index, client, segment_count=4, page_size=10, queue_size=2)
+    next(gen)
+    gen.close()
+    # workers stop shortly after the consumer stops
+    assert client.n_calls < 100
+
+
+def test_scan_vectors():
+    client = FakeListVectorsClient(n=500)
+    keys = [
+        dct["key"]
+        for page in index.scan_vectors(client, segment_count=3, page_size=50)
+        for dct in page.boto3_raw_data["vectors"]
+    ]
+    assert sorted(keys) == sorted(client.keys)
+
+    vectors = list(index.scan_vector_objects(client, Vector, segment_count=3))
+    assert sorted(v.key for v in vectors) == sorted(client.keys)
+
+
+def test_iter_segment_pages_starting_tokens():
+    client = FakeListVectorsClient(n=100)
+    pages = list(
+        iter_segment_pages(
+            index, client, segment_count=2, page_size=20, starting_tokens={1: "20"}
+        )
+    )
+    assert {page.segment_index for page in pages} == {1}
+    keys = [dct["key"] for page in pages for dct in page.page.boto3_raw_data["vectors"]]
+    assert keys == client.keys[41::2]
+    assert pages[-1].next_token is None
+    assert pages[0].next_token == "40"
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.scan",
+        preview=False,
+    )
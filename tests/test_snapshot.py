@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from s3vectorm.index import Index
+from s3vectorm import snapshot
+from s3vectorm.snapshot import (
+    read_manifest,
+    iter_snapshot_vectors,
+    KEYS_FILE,
+    VECTORS_FILE,
+    DELETED_FILE,
+)
+
+from conftest import make_index, fill, dump_index, FlakyClient
+
+
+@pytest.fixture
+def index_config():
+    return {"dimension": 3}
+
+
+def make_vector_dcts(n: int) -> list[dict]:
+    dcts = []
+    for i in range(n):
+        metadata = {"group": i % 3}
+        if i % 2:
+            metadata["tags"] = ["odd", str(i)]
+        if i == n - 1:
+            metadata["last"] = True
+        dcts.append(
+            {
+                "key": f"doc-{i}",
+                "data": {"float32": [float(i), 0.5, -1.0]},
+                "metadata": metadata,
+            }
+        )
+    return dcts
+
+
+def test_export_and_import(tmp_path, monkeypatch, emulator_index, index_config):
+    # the padding of a metadata key that first appears late spans many writes
+    monkeypatch.setattr(snapshot, "_NULL_ROWS_PER_WRITE", 7)
+    index, client = emulator_index
+    fill(index, client, make_vector_dcts(250))
+
+    path = tmp_path / "snapshot"
+    manifest = index.export_snapshot(client, path, segment_count=4, page_size=20)
+    assert manifest["complete"] is True
+    assert manifest["n_vectors"] == 250
+    assert read_manifest(path) == manifest
+    assert set(manifest["columns"]) == {"group", "tags", "last"}
+
+    matrix = np.fromfile(path / VECTORS_FILE, dtype="<f4").reshape(-1, 3)
+    keys = [json.loads(line) for line in open(path / KEYS_FILE)]
+    assert matrix.shape == (250, 3)
+    assert len(set(keys)) == 250
+    row = keys.index("doc-42")
+    assert matrix[row].tolist() == [42.0, 0.5, -1.0]
+
+    # a finished export is not run again
+    assert index.export_snapshot(client, path) == manifest
+
+    target = make_index(client, name="target", **index_config)
+    result = target.import_snapshot(client, path, batch_size=30, max_workers=4)
+    assert (result.n_succeeded, result.n_failed, result.n_skipped) == (250, 0, 0)
+    assert dump_index(target, client) == dump_index(index, client)
+
+    # dimension mismatch
+    other = Index(**{**target.model_dump(), "dimension": 4})
+    with pytest.raises(ValueError):
+        other.import_snapshot(client, path)
+
+
+def test_resume_export(tmp_path, index_config):
+    client = FlakyClient("list_vectors", fail_at=6)
+    index = make_index(client, **index_config)
+    fill(index, client, make_vector_dcts(250))
+    path = tmp_path / "snapshot"
+
+    with pytest.raises(ConnectionError):
+        index.export_snapshot(client, path, segment_count=2, page_size=20)
+    manifest = read_manifest(path)
+    assert manifest["complete"] is False
+    assert 0 < manifest["n_vectors"] < 250
+    with pytest.raises(ValueError):
+        next(iter_snapshot_vectors(path))
+
+    # simulate a crash after writing some rows but before the checkpoint
+    with open(path / KEYS_FILE, "ab") as f:
+        f.write(b'"garbage"\n')
+
+    manifest = index.export_snapshot(client, path, segment_count=8)
+    assert manifest["complete"] is True
+    assert manifest["segment_count"] == 2  # the original segment count
+    assert manifest["n_vectors"] == 250
+    keys = [dct["key"] for dct in iter_snapshot_vectors(path)]
+    assert sorted(keys) == sorted(f"doc-{i}" for i in range(250))
+
+    # start over
+    manifest = index.export_snapshot(client, path, segment_count=1, resume=False)
+    assert (manifest["segment_count"], manifest["n_vectors"]) == (1, 250)
+
+
+def test_resume_import(tmp_path, emulator_index, index_config):
+    index, client = emulator_index
+    fill(index, client, make_vector_dcts(250))
+    path = tmp_path / "snapshot"
+    index.export_snapshot(client, path, segment_count=1)
+
+    flaky_client = FlakyClient("put_vectors", fail_at=3)
+    target = make_index(flaky_client, **index_config)
+    checkpoint_path = tmp_path / "import.json"
+    result = target.import_snapshot(
+        flaky_client,
+        path,
+        checkpoint_path=checkpoint_path,
+        batch_size=50,
+        max_workers=1,
+    )
+    assert (result.n_succeeded, result.n_failed) == (200, 50)
+    # the 3rd batch failed, the leading finished batches are the first two
+    assert json.loads(checkpoint_path.read_text()) == {"n_imported": 100}
+
+    result = target.import_snapshot(
+        flaky_client,
+        path,
+        checkpoint_path=checkpoint_path,
+        batch_size=50,
+        max_workers=1,
+    )
+    assert (result.n_succeeded, result.n_failed, result.n_skipped) == (150, 0, 100)
+    assert json.loads(checkpoint_path.read_text()) == {"n_imported": 250}
+    assert len(dump_index(target, flaky_client)) == 250
+
+
+def test_resume_import_with_deleted_rows(tmp_path, emulator_index, index_config):
+    index, client = emulator_index
+    fill(index, client, make_vector_dcts(250))
+    path = tmp_path / "snapshot"
+    index.export_snapshot(client, path, segment_count=1)
+    deleted = "".join(f"{row}\n" for row in range(90, 110))
+    (path / DELETED_FILE).write_text(deleted)
+    manifest = read_manifest(path)
+    manifest["file_sizes"][DELETED_FILE] = len(deleted)
+    (path / "manifest.json").write_text(json.dumps(manifest))
+
+    target = make_index(client, name="target", **index_config)
+    checkpoint_path = tmp_path / "import.json"
+    checkpoint_path.write_text(json.dumps({"n_imported": 100}))
+    result = target.import_snapshot(
+        client, path, checkpoint_path=checkpoint_path, batch_size=40
+    )
+    # 100 rows were imported, 10 of them deleted: 90 vectors
+    assert (result.n_succeeded, result.n_skipped) == (140, 90)
+    assert json.loads(checkpoint_path.read_text()) == {"n_imported": 250}
+    assert len(dump_index(target, client)) == 140
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.snapshot",
+        preview=False,
+    )
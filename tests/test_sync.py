@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import typing as T
+
+import pytest
+from pydantic import Field
+
+from s3vectorm.vector import Vector
+from s3vectorm.catalog import HashCatalog
+
+pytest.importorskip("numpy")
+
+from conftest import list_keys
+
+
+class Chunk(Vector):
+    version: int = Field()
+
+
+def make_chunks(keys: T.Iterable[int], changed: set[int] = frozenset()) -> list[Chunk]:
+    return [
+        Chunk(key=f"doc-{i}", data=[1.0, float(i)], version=2 if i in changed else 1)
+        for i in keys
+    ]
+
+
+def test_sync_with_hash_key(emulator_index):
+    index, client = emulator_index
+    result = index.sync_vectors(client, make_chunks(range(100)), hash_key="hash")
+    assert (result.n_existing, result.n_added, result.n_stale) == (0, 100, 0)
+    assert result.put_result.n_succeeded == 100
+    assert result.ok
+
+    # keys 0 - 9 are removed, 100 - 104 are added, 20 and 30 are changed
+    desired = make_chunks(range(10, 105), changed={20, 30})
+    plan = index.sync_vectors(client, desired, hash_key="hash", dry_run=True)
+    assert plan.dry_run is True
+    assert (plan.n_added, plan.n_changed, plan.n_unchanged, plan.n_stale) == (
+        5,
+        2,
+        88,
+        10,
+    )
+    assert sorted(plan.changed_keys) == ["doc-20", "doc-30"]
+    assert sorted(plan.stale_keys) == sorted(f"doc-{i}" for i in range(10))
+    assert plan.put_result.n_batches == 0
+    assert len(list_keys(index, client)) == 100  # nothing written
+
+    result = index.sync_vectors(
+        client, desired, hash_key="hash", batch_size=3, max_workers=2
+    )
+    assert (result.n_added, result.n_changed, result.n_unchanged, result.n_stale) == (
+        5,
+        2,
+        88,
+        10,
+    )
+    assert result.put_result.n_succeeded == 7
+    assert result.put_result.n_skipped == 88
+    assert result.delete_result.n_succeeded == 10
+    assert result.added_keys == []  # only filled in a dry run
+    assert list_keys(index, client) == {f"doc-{i}" for i in range(10, 105)}
+
+    result = index.sync_vectors(client, desired, hash_key="hash")
+    assert (result.n_unchanged, result.put_result.n_batches) == (95, 0)
+
+
+def test_sync_with_pairs_and_catalog(emulator_index):
+    index, client = emulator_index
+    catalog = HashCatalog()
+    loaded = []
+
+    def load_vectors(keys: list[str]) -> list[Chunk]:
+        loaded.extend(keys)
+        return [Chunk(key=key, data=[1.0, 2.0], version=versions[key]) for key in keys]
+
+    versions = {f"doc-{i}": 1 for i in range(20)}
+
+    def pairs() -> list[tuple[str, str]]:
+        return [(key, str(version)) for key, version in versions.items()]
+
+    result = index.sync_vectors(
+        client, pairs(), catalog=catalog, load_vectors=load_vectors
+    )
+    assert result.n_added == 20
+    assert len(loaded) == 20
+    assert len(catalog) == 20
+
+    loaded.clear()
+    versions["doc-3"] = 2
+    del versions["doc-4"]
+    result = index.sync_vectors(
+        client, pairs(), catalog=catalog, load_vectors=load_vectors
+    )
+    assert (result.n_changed, result.n_unchanged, result.n_stale) == (1, 18, 1)
+    assert loaded == ["doc-3"]
+    assert catalog.get_many(["doc-3", "doc-4"]) == {"doc-3": "2"}
+    res = index.get_vectors(client, keys=["doc-3"], return_metadata=True)
+    assert res.as_vector_objects(Chunk)[0].version == 2
+
+    with pytest.raises(ValueError):
+        index.sync_vectors(client, [("doc-99", "1")], catalog=catalog)
+
+
+def test_sync_without_hash(emulator_index):
+    index, client = emulator_index
+    index.put_vectors(client, make_chunks(range(5)))
+    result = index.sync_vectors(client, make_chunks(range(3)), delete_stale=False)
+    # the stored hashes are unknown, everything is sent again
+    assert (result.n_changed, result.n_unchanged, result.n_stale) == (3, 0, 2)
+    assert result.delete_result.n_batches == 0
+    assert len(list_keys(index, client)) == 5
+
+
+def test_sync_duplicate_keys(emulator_index):
+    index, client = emulator_index
+    desired = make_chunks(range(3)) + make_chunks([1], changed={1})
+    with pytest.raises(ValueError, match="doc-1"):
+        index.sync_vectors(client, desired, hash_key="hash", dry_run=True)
+    with pytest.raises(ValueError, match="doc-1"):
+        index.sync_vectors(client, [("doc-1", "a"), ("doc-1", "b")], dry_run=True)
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.sync",
+        preview=False,
+    )
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from s3vectorm.utils import write_json_atomic
+
+
+def test_write_json_atomic(tmp_path):
+    path = tmp_path / "state.json"
+    write_json_atomic(path, {"n": 1})
+    write_json_atomic(str(path), {"n": 2})
+    assert json.loads(path.read_text()) == {"n": 2}
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.utils",
+        preview=False,
+    )
@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
 
+import array
+
+import pytest
+from pydantic import Field, ValidationError
+
 from s3vectorm.vector import Vector
 
 
@@ -59,6 +64,105 @@ def test_pydantic_model_dump():
     assert dump == expected
 
 
+def test_array_data():
+    """Test Vector with array.array / memoryview data"""
+    data = array.array("f", [1.0, 2.0, 3.0])
+    vector = Vector(key="test-key", data=data)
+    assert vector.data is data
+    result = vector.to_put_vectors_dict("float32")
+    assert result["data"] == {"float32": [1.0, 2.0, 3.0]}
+    assert isinstance(result["data"]["float32"], list)
+    assert vector.model_dump()["data"] == [1.0, 2.0, 3.0]
+
+    view = memoryview(data)
+    vector = Vector(key="test-key", data=view)
+    assert vector.data is view
+    assert vector.to_put_vectors_dict("float32")["data"] == {"float32": [1.0, 2.0, 3.0]}
+
+    with pytest.raises(ValidationError):
+        Vector(key="test-key", data=["a", "b"])
+    with pytest.raises(ValidationError, match="floating point"):
+        Vector(key="test-key", data=array.array("i", [1, 2, 3]))
+    with pytest.raises(ValidationError, match="floating point"):
+        Vector(key="test-key", data=memoryview(b"abc"))
+
+
+def test_numpy_data():
+    """Test Vector with numpy.ndarray data"""
+    np = pytest.importorskip("numpy")
+
+    data = np.array([1.0, 2.0, 3.0], dtype=np.float32)
+    vector = Vector(key="test-key", data=data)
+    assert vector.data is data
+    result = vector.to_put_vectors_dict("float32")
+    assert result == {
+        "key": "test-key",
+        "data": {"float32": [1.0, 2.0, 3.0]},
+        "metadata": {},
+    }
+    assert type(result["data"]["float32"][0]) is float
+    assert (
+        vector.model_dump_json()
+        == '{"key":"test-key","data":[1.0,2.0,3.0],"distance":null}'
+    )
+
+    # a row of a matrix is a view, not a copy
+    matrix = np.ones((4, 3), dtype=np.float32)
+    vector = Vector(key="test-key", data=matrix[1])
+    assert np.shares_memory(vector.data, matrix)
+
+    with pytest.raises(ValidationError):
+        Vector(key="test-key", data=matrix)
+    # equality compares the data by value
+    a = Vector(key="a", data=np.array([1, 2], "f"))
+    assert a == Vector(key="a", data=np.array([1, 2], "f"))
+    assert a == Vector(key="a", data=[1.0, 2.0])
+    assert a == Vector(key="a", data=array.array("f", [1.0, 2.0]))
+    assert a != Vector(key="a", data=np.array([1, 3], "f"))
+    assert a != Vector(key="b", data=np.array([1, 2], "f"))
+    assert a != HashedVector(key="a", data=np.array([1, 2], "f"), category="x")
+
+    with pytest.raises(ValidationError, match="floating point"):
+        Vector(key="test-key", data=np.arange(3))
+    with pytest.raises(ValidationError, match="floating point"):
+        Vector(key="test-key", data=np.array(["a", "b"]))
+
+
+class HashedVector(Vector):
+    category: str = Field()
+    hash: str | None = Field(default=None)
+
+
+def test_content_hash():
+    """Test Vector.content_hash"""
+    vector = HashedVector(key="doc-1", data=[0.1, 0.2], category="news")
+    content_hash = vector.content_hash()
+    assert len(content_hash) == 32
+    # the key, the distance and the container type of the data are not content
+    same = [
+        HashedVector(key="doc-2", data=[0.1, 0.2], category="news"),
+        HashedVector(
+            key="doc-1",
+            data=array.array("f", [0.1, 0.2]),
+            distance=0.5,
+            category="news",
+        ),
+    ]
+    assert all(v.content_hash() == content_hash for v in same)
+    different = [
+        HashedVector(key="doc-1", data=[0.1, 0.3], category="news"),
+        HashedVector(key="doc-1", data=[0.1, 0.2], category="blog"),
+        HashedVector(key="doc-1", category="news"),
+        HashedVector(key="doc-1", data=[0.1, 0.2], category="news", hash="x"),
+    ]
+    assert all(v.content_hash() != content_hash for v in different)
+
+    vector = HashedVector(key="doc-1", data=[0.1, 0.2], category="news", hash="x")
+    assert vector.content_hash(exclude=["hash"]) == HashedVector(
+        key="doc-1", data=[0.1, 0.2], category="news"
+    ).content_hash(exclude=["hash"])
+
+
 if __name__ == "__main__":
     from s3vectorm.tests import run_cov_test
 
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from s3vectorm.vector import Vector
+from s3vectorm.emulator import LocalS3VectorsClient
+
+from conftest import make_index, list_keys
+
+
+class CountingClient(LocalS3VectorsClient):
+    def __init__(self):
+        super().__init__()
+        self.calls: list[tuple[str, int]] = []
+
+    def put_vectors(self, **kwargs):
+        self.calls.append(("put_vectors", len(kwargs["vectors"])))
+        return super().put_vectors(**kwargs)
+
+    def delete_vectors(self, **kwargs):
+        self.calls.append(("delete_vectors", len(kwargs["keys"])))
+        return super().delete_vectors(**kwargs)
+
+
+def test_merge_and_close():
+    client = CountingClient()
+    index = make_index(client)
+    index.put_vectors(client, [Vector(key="old", data=[1.0, 1.0])])
+    client.calls.clear()
+
+    with index.buffered_writer(client, flush_interval=60) as writer:
+        writer.put_many(Vector(key=f"doc-{i}", data=[1.0, float(i)]) for i in range(10))
+        writer.put(Vector(key="doc-1", data=[2.0, 2.0]))  # last write wins
+        writer.delete("doc-2")  # put then delete, only the delete is sent
+        writer.put(Vector(key="old", data=[3.0, 3.0]))
+        writer.delete("old")
+        writer.delete("doc-3")
+        writer.put(Vector(key="doc-3", data=[4.0, 4.0]))  # delete then put
+        assert len(writer) == 11
+        assert client.calls == []  # nothing is sent before a threshold
+
+    assert writer.n_merged == 5
+    assert client.calls == [("put_vectors", 9), ("delete_vectors", 2)]
+    assert (writer.put_result.n_succeeded, writer.delete_result.n_succeeded) == (9, 2)
+    assert list_keys(index, client) == {f"doc-{i}" for i in range(10)} - {"doc-2"}
+    res = index.get_vectors(client, keys=["doc-1"], return_data=True)
+    assert res.boto3_raw_data["vectors"][0]["data"]["float32"] == [2.0, 2.0]
+
+    with pytest.raises(RuntimeError):
+        writer.put(Vector(key="doc-99", data=[1.0, 1.0]))
+    writer.close()  # closing again does nothing
+
+
+def test_thresholds():
+    client = CountingClient()
+    index = make_index(client)
+
+    # size threshold, with several producer threads
+    writer = index.buffered_writer(
+        client, max_vectors=50, flush_interval=60, max_pending=60
+    )
+
+    def produce(offset: int):
+        for i in range(100):
+            writer.put(Vector(key=f"doc-{offset + i}", data=[1.0, 2.0]))
+
+    threads = [threading.Thread(target=produce, args=(i * 100,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.flush()
+    assert len(writer) == 0
+    assert len(list_keys(index, client)) == 400
+    assert len(client.calls) >= 6
+    assert all(n <= 50 for _, n in client.calls)  # batches of max_vectors
+    writer.close()
+
+    # time threshold
+    client.calls.clear()
+    with index.buffered_writer(client, flush_interval=0.05) as writer:
+        writer.put(Vector(key="doc-timed", data=[1.0, 2.0]))
+        deadline = time.monotonic() + 5
+        while not client.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.calls == [("put_vectors", 1)]
+
+    # byte threshold
+    client.calls.clear()
+    with index.buffered_writer(
+        client, max_payload_bytes=1000, flush_interval=60
+    ) as writer:
+        for i in range(20):
+            writer.put(Vector(key=f"doc-{i}", data=[1.0, 2.0]))
+        deadline = time.monotonic() + 5
+        while not client.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(client.calls) >= 1  # sent without a flush
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "s3vectorm.writer",
+        preview=False,
+    )
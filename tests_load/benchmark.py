@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+"""
+A minimal, dependency free benchmark harness for the load tests.
+
+Every benchmark is timed with :mod:`timeit` (garbage collection disabled,
+best of several rounds), and the results are written to a JSON file, so the
+numbers of two releases can be compared with::
+
+    python tests_load/benchmark.py baseline.json current.json
+
+Environment variables:
+
+- ``S3VECTORM_BENCHMARK_OUTPUT``: path of the JSON result file, default to
+  ``tmp/benchmark/<timestamp>.json`` in the project root.
+- ``S3VECTORM_BENCHMARK_QUICK``: if set to ``1``, run one short round per
+  benchmark, for smoke testing the suite in CI.
+"""
+
+import typing as T
+import os
+import sys
+import json
+import timeit
+import platform
+import statistics
+import dataclasses
+from pathlib import Path
+from datetime import datetime, timezone
+
+QUICK = os.environ.get("S3VECTORM_BENCHMARK_QUICK") == "1"
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    """
+    The timing of one benchmark, all times are in seconds per call.
+    """
+
+    name: str
+    params: dict[str, T.Any]
+    number: int
+    repeat: int
+    min: float
+    median: float
+    mean: float
+
+    @property
+    def id(self) -> str:
+        params = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}[{params}]" if params else self.name
+
+
+class BenchmarkSuite:
+    """
+    Run benchmarks and collect their results.
+    """
+
+    def __init__(self):
+        self.results: list[BenchmarkResult] = []
+
+    def run(
+        self,
+        name: str,
+        func: T.Callable[[], T.Any],
+        repeat: int = 5,
+        **params,
+    ) -> BenchmarkResult:
+        """
+        Time ``func``. The number of calls per round is chosen so that a
+        round takes at least 0.2 second.
+
+        :param name: The name of the benchmark
+        :param func: The function to time, called without arguments
+        :param repeat: Number of rounds
+        :param params: The parameters of this run, e.g. ``dimension=1024``
+        """
+        timer = timeit.Timer(func)
+        if QUICK:
+            number, repeat = 1, 1
+        else:
+            number, _ = timer.autorange()
+        times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+        result = BenchmarkResult(
+            name=name,
+            params=params,
+            number=number,
+            repeat=repeat,
+            min=min(times),
+            median=statistics.median(times),
+            mean=statistics.fmean(times),
+        )
+        self.results.append(result)
+        print(f"{result.id:<70} {result.min * 1_000_000:>12.1f} us")
+        return result
+
+    def to_dict(self) -> dict[str, T.Any]:
+        from s3vectorm._version import __version__
+
+        try:
+            import numpy
+
+            numpy_version = numpy.__version__
+        except ImportError:  # pragma: no cover
+            numpy_version = None
+
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "environment": {
+                "s3vectorm": __version__,
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "numpy": numpy_version,
+                "quick": QUICK,
+            },
+            "results": [
+                {"id": result.id, **dataclasses.asdict(result)}
+                for result in self.results
+            ],
+        }
+
+    def dump(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=4))
+
+
+def compare(
+    baseline: dict[str, T.Any],
+    current: dict[str, T.Any],
+    threshold: float = 0.1,
+) -> list[tuple[str, float, float, float, bool]]:
+    """
+    Compare the ``min`` time of the benchmarks in both result files.
+
+    :returns: ``(id, baseline, current, ratio, is_regression)`` rows, a
+        regression is a benchmark more than ``threshold`` slower.
+    """
+    before = {result["id"]: result["min"] for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        if result["id"] in before:
+            ratio = result["min"] / before[result["id"]]
+            rows.append(
+                (
+                    result["id"],
+                    before[result["id"]],
+                    result["min"],
+                    ratio,
+                    ratio > 1 + threshold,
+                )
+            )
+    return rows
+
+
+def main(args: list[str]) -> int:
+    if len(args) != 2:
+        print("usage: python tests_load/benchmark.py baseline.json current.json")
+        return 2
+    baseline, current = [json.loads(Path(arg).read_text()) for arg in args]
+    rows = compare(baseline, current)
+    for id, before, after, ratio, is_regression in rows:
+        flag = "REGRESSION" if is_regression else ""
+        print(
+            f"{id:<70} {before * 1_000_000:>12.1f} us {after * 1_000_000:>12.1f} us "
+            f"{ratio:>6.2f}x {flag}"
+        )
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
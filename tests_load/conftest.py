@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+import os
+from pathlib import Path
+from datetime import datetime
+
+import pytest
+
+from s3vectorm.paths import path_enum
+
+from benchmark import BenchmarkSuite
+
+_suite = BenchmarkSuite()
+
+
+@pytest.fixture(scope="session")
+def bench() -> BenchmarkSuite:
+    return _suite
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _suite.results:
+        return
+    path = os.environ.get("S3VECTORM_BENCHMARK_OUTPUT")
+    if path is None:
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = path_enum.dir_tmp / "benchmark" / f"{timestamp}.json"
+    _suite.dump(Path(path))
+    print(f"\nbenchmark results: {path}")
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""
+End-to-end benchmark of the ``Index`` API against the local emulator client.
+
+The emulator has no network latency, so these numbers measure the
+client-side overhead of the library (request building, response decoding)
+plus the emulator's exact k-NN search.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pydantic import Field
+
+from s3vectorm.bucket import Bucket
+from s3vectorm.index import Index
+from s3vectorm.vector import Vector
+from s3vectorm.metadata import MetaKey
+from s3vectorm.emulator import LocalS3VectorsClient
+
+DIMENSION = 256
+N_VECTORS = 10_000
+
+
+class DocChunk(Vector):
+    document_id: str = Field()
+    category: str = Field()
+
+
+def make_vectors(n: int, seed: int = 0) -> list[DocChunk]:
+    data = np.random.default_rng(seed).random((n, DIMENSION), dtype=np.float32)
+    return [
+        DocChunk(
+            key=f"doc-{i}",
+            data=data[i],
+            document_id=f"doc-{i // 10}",
+            category=f"category-{i % 10}",
+        )
+        for i in range(n)
+    ]
+
+
+def make_index(client: LocalS3VectorsClient, index_name: str) -> Index:
+    index = Index(
+        bucket_name="bench",
+        index_name=index_name,
+        data_type="float32",
+        dimension=DIMENSION,
+        distance_metric="cosine",
+    )
+    index.create(client)
+    return index
+
+
+@pytest.fixture(scope="module")
+def client_and_index():
+    client = LocalS3VectorsClient()
+    Bucket(name="bench").create(client)
+    index = make_index(client, "documents")
+    index.put_vectors_bulk(client, make_vectors(N_VECTORS))
+    return client, index
+
+
+def test_put_vectors(bench):
+    client = LocalS3VectorsClient()
+    Bucket(name="bench").create(client)
+    index = make_index(client, "put")
+    vectors = make_vectors(500, seed=1)
+    bench.run(
+        "Index.put_vectors",
+        lambda: index.put_vectors(client, vectors),
+        n_vectors=500,
+        dimension=DIMENSION,
+    )
+
+
+@pytest.mark.parametrize("top_k", [10, 100])
+@pytest.mark.parametrize("filtered", [False, True])
+def test_query_vectors(bench, client_and_index, top_k, filtered):
+    client, index = client_and_index
+    query = np.random.default_rng(2).random(DIMENSION, dtype=np.float32).tolist()
+    filter = MetaKey(name="category").eq("category-1") if filtered else None
+    bench.run(
+        "Index.query_vectors",
+        lambda: index.query_vectors(
+            client,
+            data=query,
+            top_k=top_k,
+            filter=filter,
+            return_metadata=True,
+            return_distance=True,
+        ).as_vector_objects(DocChunk),
+        n_vectors=N_VECTORS,
+        dimension=DIMENSION,
+        top_k=top_k,
+        filtered=filtered,
+    )
+
+
+@pytest.mark.parametrize("return_data", [False, True])
+def test_list_vectors(bench, client_and_index, return_data):
+    client, index = client_and_index
+    bench.run(
+        "Index.iter_vectors",
+        lambda: sum(
+            1
+            for _ in index.iter_vectors(
+                client,
+                DocChunk,
+                return_data=return_data,
+                return_metadata=True,
+                page_size=1000,
+                trusted=True,
+            )
+        ),
+        repeat=3,
+        n_vectors=N_VECTORS,
+        dimension=DIMENSION,
+        return_data=return_data,
+    )
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_unit_test
+
+    run_unit_test(__file__)
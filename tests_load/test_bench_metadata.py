@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of building and rendering metadata filters.
+"""
+
+import functools
+
+import pytest
+
+from s3vectorm.metadata import MetaKey, BaseMetadata, Param
+
+
+class DocMeta(BaseMetadata):
+    tenant_id = MetaKey()
+    doc_type = MetaKey()
+    acl = MetaKey()
+
+
+def make_deep_filter(depth: int):
+    """
+    ``acl == 0 | acl == 1 | ... | acl == depth - 1``, a left-deep binary tree.
+    """
+    return functools.reduce(
+        lambda left, right: left | right,
+        [DocMeta.acl.eq(f"group-{i}") for i in range(depth)],
+    )
+
+
+@pytest.mark.parametrize("depth", [10, 100, 500])
+def test_to_doc(bench, depth):
+    query = make_deep_filter(depth)
+    bench.run("CompoundExpr.to_doc", query.to_doc, depth=depth)
+
+
+@pytest.mark.parametrize("depth", [10, 100, 500])
+def test_to_canonical_doc(bench, depth):
+    # a new expression per call, the canonical document is cached
+    bench.run(
+        "CompoundExpr.to_canonical_doc",
+        lambda: make_deep_filter(depth).to_canonical_doc(),
+        depth=depth,
+    )
+
+
+def test_build_filter(bench):
+    bench.run(
+        "build_filter",
+        lambda: (
+            DocMeta.tenant_id.eq("t-1") & DocMeta.doc_type.in_(["faq", "manual"])
+        ).to_canonical_doc(),
+    )
+
+
+def test_prepared_filter_bind(bench):
+    template = DocMeta.prepare(
+        DocMeta.tenant_id.eq(Param("tenant_id"))
+        & DocMeta.doc_type.in_(Param("doc_types"))
+    )
+    bench.run(
+        "PreparedFilter.bind",
+        lambda: template.bind(tenant_id="t-1", doc_types=["faq", "manual"]),
+    )
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_unit_test
+
+    run_unit_test(__file__)
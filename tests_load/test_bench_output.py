@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of decoding ``query_vectors`` responses into vector objects.
+"""
+
+import pytest
+from pydantic import Field
+
+from s3vectorm.vector import Vector
+from s3vectorm.index import QueryVectorsOutput
+
+
+class DocChunk(Vector):
+    document_id: str = Field()
+    chunk_seq: int = Field()
+    owner_id: str = Field()
+
+
+def make_output(top_k: int, dimension: int) -> QueryVectorsOutput:
+    boto3_raw_data = {
+        "vectors": [
+            {
+                "key": f"doc-{i}#1",
+                "data": {"float32": [0.1] * dimension},
+                "distance": 0.5,
+                "metadata": {
+                    "document_id": f"doc-{i}",
+                    "chunk_seq": 1,
+                    "owner_id": "user-1",
+                },
+            }
+            for i in range(top_k)
+        ]
+    }
+    return QueryVectorsOutput(boto3_raw_data=boto3_raw_data, data_type="float32")
+
+
+@pytest.mark.parametrize("top_k", [10, 100])
+@pytest.mark.parametrize("dimension", [256, 1024])
+@pytest.mark.parametrize("trusted", [False, True])
+def test_as_vector_objects(bench, top_k, dimension, trusted):
+    out = make_output(top_k, dimension)
+    bench.run(
+        "as_vector_objects",
+        lambda: out.as_vector_objects(DocChunk, trusted=trusted),
+        top_k=top_k,
+        dimension=dimension,
+        trusted=trusted,
+    )
+
+
+@pytest.mark.parametrize("top_k", [10, 100])
+@pytest.mark.parametrize("dimension", [256, 1024])
+def test_as_vector_batch(bench, top_k, dimension):
+    pytest.importorskip("numpy")
+    out = make_output(top_k, dimension)
+    bench.run(
+        "as_vector_batch",
+        out.as_vector_batch,
+        top_k=top_k,
+        dimension=dimension,
+    )
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_unit_test
+
+    run_unit_test(__file__)
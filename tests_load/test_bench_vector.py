@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of converting vectors to the ``put_vectors`` wire format.
+"""
+
+import random
+
+import pytest
+from pydantic import Field
+
+from s3vectorm.vector import Vector
+
+
+class DocChunk(Vector):
+    document_id: str = Field()
+    chunk_seq: int = Field()
+
+
+@pytest.mark.parametrize("dimension", [256, 1024])
+def test_to_put_vectors_dict(bench, dimension):
+    rng = random.Random(dimension)
+    data = [rng.random() for _ in range(dimension)]
+    vector = DocChunk(key="doc-1#1", data=data, document_id="doc-1", chunk_seq=1)
+    bench.run(
+        "Vector.to_put_vectors_dict",
+        lambda: vector.to_put_vectors_dict("float32"),
+        dimension=dimension,
+        data="list",
+    )
+
+
+@pytest.mark.parametrize("dimension", [256, 1024])
+def test_to_put_vectors_dict_numpy(bench, dimension):
+    np = pytest.importorskip("numpy")
+    data = np.random.default_rng(dimension).random(dimension, dtype=np.float32)
+    vector = DocChunk(key="doc-1#1", data=data, document_id="doc-1", chunk_seq=1)
+    bench.run(
+        "Vector.to_put_vectors_dict",
+        lambda: vector.to_put_vectors_dict("float32"),
+        dimension=dimension,
+        data="numpy",
+    )
+
+
+if __name__ == "__main__":
+    from s3vectorm.tests import run_unit_test
+
+    run_unit_test(__file__)